@@ -1,5 +1,4 @@
 import streamlit as st
-import st_pages
 from components.popups import *
 
 st.set_page_config(
@@ -118,6 +117,91 @@ with col5:
         """,
         unsafe_allow_html=True
     )
+st.write("   \n")
+col6, col7, col8, col9 = st.columns(4)
+
+with col6:
+    st.markdown(
+        """
+        <a class="card-link" href="Uitkomsten_per_cohort" target="_self">
+            <div class="card" style="background-color:#FDF2F8;">
+                <h3>5️⃣ Uitkomsten per cohort</h3>
+                <p>
+                    Welk deel van een leerfase slaagt, doubleert
+                    of stroomt af binnen 1 tot 5 jaar.
+                </p>
+            </div>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
+
+with col7:
+    st.markdown(
+        """
+        <a class="card-link" href="Kansrijk_bevorderen" target="_self">
+            <div class="card" style="background-color:#F0FDFA;">
+                <h3>6️⃣ Kansrijk bevorderen</h3>
+                <p>
+                    Bevorderde leerlingen met tekortpunten vergeleken
+                    met vergelijkbare doublanten.
+                </p>
+            </div>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
+
+with col8:
+    st.markdown(
+        """
+        <a class="card-link" href="Herkomst" target="_self">
+            <div class="card" style="background-color:#FEFCE8;">
+                <h3>7️⃣ Herkomst</h3>
+                <p>
+                    Waar de leerlingen van een leerfase
+                    vandaan kwamen, tot drie jaar terug.
+                </p>
+            </div>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
+
+with col9:
+    st.markdown(
+        """
+        <a class="card-link" href="Wat_als_bevorderingsnorm" target="_self">
+            <div class="card" style="background-color:#F5F3FF;">
+                <h3>8️⃣ Wat als: bevorderingsnorm</h3>
+                <p>
+                    Simulatie van doublure, afstroom en slagen
+                    bij een maximum aantal tekortpunten.
+                </p>
+            </div>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
+st.write("   \n")
+# One card in this row, as wide as the cards above it
+col10 = st.columns(4)[0]
+
+with col10:
+    st.markdown(
+        """
+        <a class="card-link" href="Tijd_tot_diploma" target="_self">
+            <div class="card" style="background-color:#EFF6FF;">
+                <h3>9️⃣ Tijd tot diploma</h3>
+                <p>
+                    Hoe lang het duurt tot slagen of vertrek,
+                    ook bij doublures en afstroom.
+                </p>
+            </div>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
 st.write("  \n    \n  \n  \n  \n  \n  \n  \n   \n")
 st.write("  \n    \n  \n  \n  \n  \n  \n  \n   \n")
 st.write("  \n    \n  \n  \n  \n  \n  \n  \n   \n")
@@ -126,4 +210,4 @@ st.button(
     on_click=release_notes
 )
 st.showSidebarNavigation = False
-st_pages.hide_pages(["1_Analyse_per_leerfase", "3_Analyse_eenjaar_vooruit", "4_Analyse_gesplitst"])#st.sidebar.success("Select een optie")
\ No newline at end of file
+#st.sidebar.success("Select een optie")
\ No newline at end of file
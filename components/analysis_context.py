@@ -0,0 +1,242 @@
+import hashlib
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from components import metrics
+from components.data_store import current_snapshot, partition_token
+from components.progressive import completed
+from components.single_flight import run_once, shared_future
+
+ANALYSIS_CONTEXT_KEY = 'analysis_context'
+SELECTION_FIELDS = ['schooljaar_start', 'schooljaar_eind', 'leerfase_start', 'leerfase_vergelijk',
+                    'tekortpunten_buckets', 'schooljaar_start_vergelijk', 'schooljaar_eind_vergelijk',
+                    'tekortpunten_buckets_vergelijk']
+# The fields that define the analysed cohort on page 2
+COHORT_FIELDS = ['schooljaar_start', 'schooljaar_eind', 'leerfase_start', 'tekortpunten_buckets']
+# The fields that define the comparison group on page 2
+VERGELIJK_FIELDS = ['schooljaar_start_vergelijk', 'schooljaar_eind_vergelijk', 'leerfase_vergelijk',
+                    'tekortpunten_buckets_vergelijk']
+# Pairs of selection fields that span the starting school years of a group
+SCHOOLJAAR_FIELDS = [('schooljaar_start', 'schooljaar_eind'),
+                     ('schooljaar_start_vergelijk', 'schooljaar_eind_vergelijk')]
+# Results kept per session, the oldest are dropped first
+MAX_RESULTS = 32
+
+_results_lock = threading.Lock()
+# The results of all live sessions, for the metrics (dropped with their session)
+_session_results = weakref.WeakValueDictionary()
+
+
+def _results_size():
+    with _results_lock:
+        all_results = [list(results.values()) for results in list(_session_results.values())]
+    return sum(len(values) for values in all_results), sum(metrics.size_of(v) for values in all_results for v in values)
+
+
+metrics.register_size('analysis_results', _results_size)
+
+
+def _context():
+    if ANALYSIS_CONTEXT_KEY not in st.session_state:
+        results = OrderedDict()
+        with _results_lock:
+            _session_results[id(results)] = results
+        st.session_state[ANALYSIS_CONTEXT_KEY] = {'selection': {}, 'results': results}
+    return st.session_state[ANALYSIS_CONTEXT_KEY]
+
+
+def get_selection():
+    """
+    The active cohort selection of this session, as set by the last page the user filtered on.
+
+    Returns:
+        dict: Values for (a subset of) SELECTION_FIELDS; empty before any page set a selection.
+    """
+    return dict(_context()['selection'])
+
+
+def set_selection(**selection):
+    """
+    Stores the cohort selection of the current page, so other pages open with the same filters.
+
+    Args:
+        **selection: Values for SELECTION_FIELDS, e.g. schooljaar_start=2022, leerfase_start='h4'.
+    """
+    unknown = set(selection) - set(SELECTION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown selection fields: {', '.join(sorted(unknown))}")
+    _context()['selection'].update(selection)
+
+
+def selection_index(options, field, default):
+    """
+    Index of the selected value of a field in the options of a selectbox.
+
+    Args:
+        options (list): The options of the selectbox.
+        field (str): One of SELECTION_FIELDS.
+        default (int): Index to use when the field is not set or not in the options.
+
+    Returns:
+        int: The index for st.selectbox.
+    """
+    value = _context()['selection'].get(field)
+    return options.index(value) if value in options else default
+
+
+def selection_default(options, field, default):
+    """
+    Selected values of a field that are in the options of a multiselect, or the default.
+    """
+    values = _context()['selection'].get(field)
+    if values is None:
+        return default
+    return [value for value in values if value in options]
+
+
+def _content_digest(value):
+    try:
+        hashes = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        labels = value.columns if isinstance(value, pd.DataFrame) else value.name
+        data = hashes.tobytes() + repr(labels).encode()
+    except TypeError:
+        # Unhashable cells, such as lists of Leerlingnummers
+        data = pickle.dumps(value)
+    return hashlib.sha256(data).hexdigest()
+
+
+def _dataset_name(value, snapshot):
+    # Name of the loaded dataset or derived table that value is, None for any other value
+    if value is snapshot['df']:
+        return 'df'
+    for name, table in list(snapshot['derived'].items()):
+        if value is table:
+            return name
+    return None
+
+
+def _argument_token(value, snapshot):
+    """A hashable stand-in for one argument of an analysis."""
+    # The loaded dataset and its derived tables are identified by name, their content by the snapshot
+    name = _dataset_name(value, snapshot)
+    if name is not None:
+        return ('dataset', name)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return (type(value).__name__, value.shape, _content_digest(value))
+    if isinstance(value, np.ndarray):
+        return ('ndarray', value.shape, hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = tuple(_argument_token(item, snapshot) for item in value)
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, dict):
+        return tuple(sorted((key, _argument_token(item, snapshot)) for key, item in value.items()))
+    return value
+
+
+def _result_key(name, depends_on, args=(), kwargs=None):
+    snapshot = current_snapshot()
+    selection = _context()['selection']
+    kwargs = kwargs or {}
+    arguments = (_argument_token(list(args), snapshot), _argument_token(kwargs, snapshot))
+    key = (name,) + tuple(_hashable(selection.get(field)) for field in depends_on) + arguments
+
+    with_partitions = False
+    for start_field, eind_field in SCHOOLJAAR_FIELDS:
+        if start_field in depends_on and eind_field in depends_on:
+            key += partition_token(snapshot, selection[start_field], selection[eind_field])
+            with_partitions = True
+    reads_dataset = any(_dataset_name(value, snapshot) is not None for value in list(args) + list(kwargs.values()))
+    if reads_dataset and not with_partitions:
+        # Reads the dataset without a school year range: any reload changes the result
+        key += (('version', snapshot['version']),)
+    return key
+
+
+def _store(results, key, value):
+    # Also called from the analysis threads (see cached_future)
+    with _results_lock:
+        results[key] = value
+        results.move_to_end(key)
+        while len(results) > MAX_RESULTS:
+            results.popitem(last=False)
+            metrics.count('analysis_results', 'eviction')
+
+
+def _flight_key(compute, key):
+    # Process-wide: the same analysis for the same selection and data in another session
+    return (compute.__module__, compute.__qualname__) + key
+
+
+def _lookup(results, key):
+    with _results_lock:
+        if key not in results:
+            metrics.count('analysis_results', 'miss')
+            return False, None
+        metrics.count('analysis_results', 'hit')
+        results.move_to_end(key)
+        return True, results[key]
+
+
+def cached_result(name, compute, *args, depends_on=COHORT_FIELDS, **kwargs):
+    """
+    Result of an analysis for the active selection, computed at most once per session and shared
+    between pages. The key holds the name, the selection fields in depends_on and a digest of the
+    arguments, so calls with other arguments never share a result. The loaded dataset and its
+    derived tables are keyed by name instead of content.
+
+    When the result depends on the school years, its key also holds the partition hashes of the
+    years it reads, so a reloaded dataset only recomputes results whose school years changed.
+    When another session is computing the same result, this waits for it instead of computing it
+    again (see components/single_flight.py).
+
+    Args:
+        name (str): Name of the analysis (e.g. 'three_year_vergelijk').
+        compute (callable): The analysis function.
+        *args, **kwargs: Arguments for compute.
+        depends_on (list): The selection fields the result depends on.
+
+    Returns:
+        The stored or freshly computed result.
+    """
+    key = _result_key(name, depends_on, args, kwargs)
+    results = _context()['results']
+    found, value = _lookup(results, key)
+    if not found:
+        value = run_once(_flight_key(compute, key), compute, *args, **kwargs)
+        _store(results, key, value)
+    return value
+
+
+def cached_future(name, compute, *args, depends_on=COHORT_FIELDS, **kwargs):
+    """
+    Same as cached_result, but a missing result is computed on the analysis thread pool, so the
+    page can draw other results meanwhile (see components/progressive.py). compute must not call
+    Streamlit.
+
+    Returns:
+        concurrent.futures.Future: Done at once when the result was stored; the result is stored
+                                   in the session when the computation finishes.
+    """
+    key = _result_key(name, depends_on, args, kwargs)
+    results = _context()['results']
+    found, value = _lookup(results, key)
+    if found:
+        return completed(value)
+
+    def remember(done):
+        if done.exception() is None:
+            _store(results, key, done.result())
+
+    future = shared_future(_flight_key(compute, key), compute, *args, **kwargs)
+    future.add_done_callback(remember)
+    return future
+
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
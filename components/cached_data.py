@@ -0,0 +1,166 @@
+import streamlit as st
+
+from components.transition_cube import DATA_FILE_PATH
+from components.data_store import current_snapshot, derived
+from components.metrics import serve_metrics_from_env
+
+DATASET_VERSION_KEY = 'dataset_version'
+
+
+def load_snapshot(file_path=DATA_FILE_PATH):
+    """
+    The loaded dataset, shared by all sessions and reloaded in the background when the file changes
+    (see components/data_store.py). Tells the user when the data changed since their last run.
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        dict: Output of current_snapshot.
+    """
+    serve_metrics_from_env()
+    try:
+        snapshot = current_snapshot(file_path)
+    except FileNotFoundError:
+        st.error(f"Error: Data file not found at {file_path}. Please ensure 'updated_df.xlsx' is next to Start.py.")
+        st.stop()
+    except Exception as e:
+        st.error(f"Error loading or processing data: {e}")
+        st.stop()
+
+    seen_version = st.session_state.get(DATASET_VERSION_KEY)
+    if seen_version is not None and seen_version != snapshot['version']:
+        st.toast("Er is nieuwe data geladen, de resultaten zijn bijgewerkt.")
+    st.session_state[DATASET_VERSION_KEY] = snapshot['version']
+    return snapshot
+
+
+def _load_derived(name, file_path):
+    snapshot = load_snapshot(file_path)
+    try:
+        return derived(snapshot, name)
+    except Exception as e:
+        st.error(f"Error loading or processing data: {e}")
+        st.stop()
+
+
+def load_dataset(file_path=DATA_FILE_PATH):
+    """
+    The prepared dataset (see read_dataset), read once per server process and shared across sessions.
+    Treat it as read-only.
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        pd.DataFrame: Output of read_dataset.
+    """
+    return load_snapshot(file_path)['df']
+
+
+def load_transition_cube(file_path=DATA_FILE_PATH):
+    """
+    The transition cube of the loaded dataset, built once per dataset version (shared across sessions).
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        pd.DataFrame: Output of build_transition_cube, looking WATERFALL_YEARS (5) years ahead.
+    """
+    return _load_derived('cube', file_path)
+
+
+def load_tekortpunten_index(file_path=DATA_FILE_PATH):
+    """
+    Cumulative-count index of one-year progression per exact tekortpunten value (see build_tekortpunten_index).
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        dict: Output of build_tekortpunten_index.
+    """
+    return _load_derived('tekortpunten_index', file_path)
+
+
+def load_quality_report(file_path=DATA_FILE_PATH):
+    """
+    Data-quality checks, run once per dataset version (see build_quality_report).
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        dict: Output of build_quality_report.
+    """
+    return _load_derived('quality_report', file_path)
+
+
+def load_outcome_waterfall(file_path=DATA_FILE_PATH):
+    """
+    Cumulative outcomes of every instroom cohort within 1..5 years (see build_outcome_waterfall).
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        pd.DataFrame: Output of build_outcome_waterfall.
+    """
+    return _load_derived('outcome_waterfall', file_path)
+
+
+def load_matching_index(file_path=DATA_FILE_PATH):
+    """
+    Promotion decisions with matching features and outcomes, built once per dataset version
+    (see build_matching_index).
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        pd.DataFrame: Output of build_matching_index.
+    """
+    return _load_derived('matching_index', file_path)
+
+
+def load_student_index(file_path=DATA_FILE_PATH):
+    """
+    Dense Leerlingnummer index into the student-sorted cube, built once per dataset version
+    (see build_student_index).
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        dict: Output of build_student_index.
+    """
+    return _load_derived('student_index', file_path)
+
+
+def load_label_reconciliation(file_path=DATA_FILE_PATH):
+    """
+    Source 'Doorstroom' label against the computed classification, compared once per dataset version
+    (see build_label_reconciliation).
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        dict: Output of build_label_reconciliation.
+    """
+    return _load_derived('label_reconciliation', file_path)
+
+
+def load_flow_engine(file_path=DATA_FILE_PATH):
+    """
+    The dataset prepared for the flow query engine in DOORSTROOM_ENGINE, once per dataset version
+    (see components/engines.py).
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        tuple: Output of prepare_dataset, for engines.one_year_flow_table and engines.three_year_flow_counts.
+    """
+    return _load_derived('flow_engine', file_path)
@@ -0,0 +1,111 @@
+import pandas as pd
+import numpy as np
+
+from components.doorstroom_functions import _get_leerfase_numeric_value
+from components.transition_cube import STATUS_LABELS
+
+QUALITY_CHECKS = {
+    'gap': "Ontbrekend schooljaar",
+    'duplicate': "Dubbele rij leerling/schooljaar",
+    'unrecognized_leerfase': "Onbekende leerfase",
+    'vorig_schooljaar_mismatch': "Leerfase vorig schooljaar klopt niet",
+}
+
+
+def _strip_doublure(leerfase):
+    return leerfase.str.replace('_doublure', '', regex=False)
+
+
+def build_quality_report(cube):
+    """
+    Runs all data-quality checks once, vectorized over the whole dataset.
+
+    Checks:
+        - gap: the student's next row is more than one school year later, so the three-year
+          paths stop there (see analyze_three_year_leerfase_transitions).
+        - duplicate: more than one row for the same Leerlingnummer and Schooljaar.
+        - unrecognized_leerfase: a 'Leerfase (afk)' that _get_leerfase_numeric_value maps to NaN
+          and that is not one of the STATUS_LABELS (e.g. th1/th2).
+        - vorig_schooljaar_mismatch: 'Leerfase (afk) vorig schooljaar' differs (ignoring '_doublure')
+          from the student's row in the previous school year.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+
+    Returns:
+        dict: With keys
+              - 'flags' (pd.DataFrame): one boolean column per check, aligned with the cube rows,
+              - 'issues' (pd.DataFrame): the flagged rows with their check ('Controle') and details,
+              - 'unrecognized_codes' (pd.Series): row counts per unrecognized leerfase code.
+    """
+    flags = pd.DataFrame(index=cube.index)
+
+    flags['gap'] = cube['next_schooljaar_1'].notna() & (cube['next_schooljaar_1'] > cube['Schooljaar'] + 1)
+    flags['duplicate'] = cube.duplicated(subset=['Leerlingnummer', 'Schooljaar'], keep=False)
+
+    leerfase_codes = cube['Leerfase (afk)'].dropna().unique()
+    unrecognized_codes = [
+        code for code in leerfase_codes
+        if code not in STATUS_LABELS and np.isnan(_get_leerfase_numeric_value(code))
+    ]
+    flags['unrecognized_leerfase'] = cube['Leerfase (afk)'].isin(unrecognized_codes)
+
+    grouped = cube.groupby('Leerlingnummer')
+    previous_leerfase = grouped['Leerfase (afk)'].shift(1)
+    previous_schooljaar = grouped['Schooljaar'].shift(1)
+    has_previous_year = previous_schooljaar == cube['Schooljaar'] - 1
+    flags['vorig_schooljaar_mismatch'] = (
+        has_previous_year &
+        cube['Leerfase (afk) vorig schooljaar'].notna() &
+        (_strip_doublure(cube['Leerfase (afk) vorig schooljaar']) != _strip_doublure(previous_leerfase))
+    ).fillna(False).astype(bool)
+
+    details = pd.DataFrame({
+        'gap': 'Volgende rij in ' + cube['next_schooljaar_1'].astype('Int64').astype(str),
+        'duplicate': 'Leerfase ' + cube['Leerfase (afk)'].astype(str),
+        'unrecognized_leerfase': 'Leerfase ' + cube['Leerfase (afk)'].astype(str),
+        'vorig_schooljaar_mismatch': ('Vorig schooljaar ' + cube['Leerfase (afk) vorig schooljaar'].astype(str) +
+                                      ', vorige rij ' + previous_leerfase.astype(str)),
+    })
+
+    stacked = flags.stack()
+    flagged = stacked[stacked].index
+    issues = cube.loc[flagged.get_level_values(0), ['Leerlingnummer', 'Schooljaar', 'Leerfase (afk)']].copy()
+    issues['Controle'] = flagged.get_level_values(1).map(QUALITY_CHECKS)
+    issues['Toelichting'] = details.to_numpy()[
+        flagged.get_level_values(0), details.columns.get_indexer(flagged.get_level_values(1))
+    ]
+
+    return {
+        'flags': flags,
+        'issues': issues.sort_values(['Leerlingnummer', 'Schooljaar']).reset_index(drop=True),
+        'unrecognized_codes': cube.loc[flags['unrecognized_leerfase'], 'Leerfase (afk)'].value_counts(),
+    }
+
+
+def quality_summary(report):
+    """
+    Number of flagged rows per check.
+
+    Args:
+        report (dict): Output of build_quality_report.
+
+    Returns:
+        pd.Series: Counts indexed by the check description.
+    """
+    return report['flags'].sum().rename(index=QUALITY_CHECKS).rename('Aantal rijen')
+
+
+def issues_for_students(report, leerlingnummers):
+    """
+    The data-quality issues of a selection of students.
+
+    Args:
+        report (dict): Output of build_quality_report.
+        leerlingnummers (list): The Leerlingnummers to look up.
+
+    Returns:
+        pd.DataFrame: The matching rows of report['issues'].
+    """
+    issues = report['issues']
+    return issues[issues['Leerlingnummer'].isin(leerlingnummers)]
@@ -0,0 +1,218 @@
+"""
+The dataset in memory, reloaded in the background when the data file changes.
+
+A daemon thread polls the modification time and size of the data file. A change is only read once
+it stayed the same for one poll interval, so a file that is still being copied is never read. The
+new file is read and its transition cube and derived tables (those the old snapshot had built) are
+computed in the background; only then the new snapshot replaces the old one in one assignment. A
+running page keeps the snapshot it already holds, so nobody sees a half-loaded dataset or waits for
+a reload. When reading fails the old snapshot stays in place.
+
+Every snapshot holds a hash per Schooljaar. Cached analysis results include the hashes of the
+school years they read (see partition_token), so a new file only invalidates the results whose
+school years changed.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from components import metrics
+from components.transition_cube import DATA_FILE_PATH, YEARS_AHEAD, read_dataset, build_transition_cube
+from components.tekortpunten import build_tekortpunten_index
+from components.data_quality import build_quality_report
+from components.outcomes import WATERFALL_YEARS, build_outcome_waterfall
+from components.kansrijk import build_matching_index
+from components.student_index import build_student_index
+from components.label_reconciliation import build_label_reconciliation
+from components.engines import prepare_dataset
+
+POLL_SECONDS = 5
+
+# Tables derived from a snapshot, built on first use and warmed before a swap
+DERIVED = {
+    # Far enough ahead for the outcome waterfall and the matching index, which both derive from it
+    'cube': lambda snapshot: build_transition_cube(snapshot['df'], years_ahead=WATERFALL_YEARS),
+    'tekortpunten_index': lambda snapshot: build_tekortpunten_index(derived(snapshot, 'cube')),
+    'quality_report': lambda snapshot: build_quality_report(derived(snapshot, 'cube')),
+    'outcome_waterfall': lambda snapshot: build_outcome_waterfall(derived(snapshot, 'cube')),
+    'matching_index': lambda snapshot: build_matching_index(derived(snapshot, 'cube')),
+    'student_index': lambda snapshot: build_student_index(derived(snapshot, 'cube')),
+    'label_reconciliation': lambda snapshot: build_label_reconciliation(derived(snapshot, 'cube')),
+    # The dataset for the engine in DOORSTROOM_ENGINE (see components/engines.py)
+    'flow_engine': lambda snapshot: prepare_dataset(snapshot['df'], cube=derived(snapshot, 'cube')),
+}
+
+logger = logging.getLogger(__name__)
+
+_snapshots = {}
+_watchers = {}
+_load_lock = threading.Lock()
+
+
+def file_signature(file_path):
+    """(modification time in ns, size) of the file, or None when it does not exist."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def partition_hashes(df):
+    """
+    A content hash per Schooljaar, independent of the row order in the file.
+
+    Args:
+        df (pd.DataFrame): The prepared dataset (see read_dataset).
+
+    Returns:
+        dict: Schooljaar -> hex digest.
+    """
+    ordered = df.sort_values(['Schooljaar', 'Leerlingnummer'], kind='stable')
+    row_hashes = pd.util.hash_pandas_object(ordered, index=False).to_numpy()
+    schooljaren = ordered['Schooljaar'].to_numpy()
+
+    hashes = {}
+    for schooljaar in pd.unique(schooljaren):
+        digest = hashlib.sha256(row_hashes[schooljaren == schooljaar].tobytes())
+        hashes[int(schooljaar)] = digest.hexdigest()
+    return hashes
+
+
+def _build_snapshot(file_path, signature, version):
+    with metrics.timed('read_dataset'):
+        df = read_dataset(file_path)
+    return {
+        'version': version,
+        'signature': signature,
+        'loaded_at': time.time(),
+        'df': df,
+        'partitions': partition_hashes(df),
+        'derived': {},
+        'lock': threading.RLock(),
+    }
+
+
+def derived(snapshot, name):
+    """
+    A table derived from a snapshot (one of DERIVED), built once per snapshot.
+
+    Args:
+        snapshot (dict): Output of current_snapshot.
+        name (str): Key in DERIVED.
+
+    Returns:
+        The derived table.
+    """
+    with snapshot['lock']:
+        metrics.count('dataset_tables', 'hit' if name in snapshot['derived'] else 'miss')
+        if name not in snapshot['derived']:
+            with metrics.timed(f'derived {name}'):
+                snapshot['derived'][name] = DERIVED[name](snapshot)
+        return snapshot['derived'][name]
+
+
+def current_snapshot(file_path=DATA_FILE_PATH):
+    """
+    The loaded dataset. The first call reads the file and starts watching it for changes.
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        dict: 'version' (increases with every reload), 'signature', 'loaded_at', 'df' (see read_dataset),
+              'partitions' (see partition_hashes) and the tables built so far in 'derived'.
+
+    Raises:
+        FileNotFoundError: The file does not exist (on the first load).
+    """
+    path = os.path.abspath(file_path)
+    snapshot = _snapshots.get(path)
+    if snapshot is not None:
+        return snapshot
+
+    with _load_lock:
+        if path not in _snapshots:
+            _snapshots[path] = _build_snapshot(path, file_signature(path), version=1)
+            _start_watcher(path)
+    return _snapshots[path]
+
+
+def reload(file_path=DATA_FILE_PATH):
+    """
+    Reads the file again and swaps it in once the tables in use are rebuilt.
+
+    Returns:
+        dict: The new snapshot.
+    """
+    path = os.path.abspath(file_path)
+    old = current_snapshot(path)
+    new = _build_snapshot(path, file_signature(path), version=old['version'] + 1)
+    for name in list(old['derived']):
+        derived(new, name)
+    # A single assignment, so readers get either the old or the new snapshot
+    _snapshots[path] = new
+    logger.info("Reloaded %s (version %d)", path, new['version'])
+    return new
+
+
+def _watch(path, poll_seconds):
+    seen = None
+    failed = None
+    while True:
+        time.sleep(poll_seconds)
+        signature = file_signature(path)
+        if signature is None or signature == _snapshots[path]['signature'] or signature == failed:
+            seen = None
+            continue
+        if signature != seen:
+            # Changed since the last poll: wait until the file is no longer being written
+            seen = signature
+            continue
+        try:
+            reload(path)
+        except Exception:
+            logger.exception("Reloading %s failed, keeping the loaded data", path)
+            failed = signature
+        seen = None
+
+
+def _start_watcher(path, poll_seconds=POLL_SECONDS):
+    if path in _watchers:
+        return
+    watcher = threading.Thread(target=_watch, args=(path, poll_seconds), name='data-store-watcher', daemon=True)
+    _watchers[path] = watcher
+    watcher.start()
+
+
+def _dataset_size():
+    tables = []
+    for snapshot in list(_snapshots.values()):
+        tables.append(snapshot['df'])
+        tables.extend(list(snapshot['derived'].values()))
+    return len(tables), sum(metrics.size_of(table) for table in tables)
+
+
+metrics.register_size('dataset', _dataset_size)
+
+
+def partition_token(snapshot, schooljaar_start, schooljaar_eind, years_ahead=YEARS_AHEAD):
+    """
+    The partition hashes an analysis of starting years schooljaar_start..schooljaar_eind reads,
+    including the years_ahead years after them. Equal tokens mean equal input data.
+
+    Args:
+        snapshot (dict): Output of current_snapshot.
+        schooljaar_start (int): The first starting school year.
+        schooljaar_eind (int): The last starting school year.
+        years_ahead (int): Number of school years the analysis looks ahead.
+
+    Returns:
+        tuple: The hash per school year (None for a year without data).
+    """
+    years = range(int(schooljaar_start), int(schooljaar_eind) + years_ahead + 1)
+    return tuple(snapshot['partitions'].get(schooljaar) for schooljaar in years)
@@ -0,0 +1,105 @@
+import streamlit as st
+import io
+import math
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def table_page(df, page_number, page_size):
+    """
+    Returns one page of a table, so only the visible rows are sent to the browser.
+
+    Args:
+        df (pd.DataFrame): The full table.
+        page_number (int): 1-based page number.
+        page_size (int): Rows per page.
+
+    Returns:
+        pd.DataFrame: The rows of the requested page.
+    """
+    start = (page_number - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def _flatten_lists(df):
+    # Lists of Leerlingnummers become one readable cell in CSV
+    df = df.copy()
+    for column in df.columns:
+        if df[column].map(lambda value: isinstance(value, list)).any():
+            df[column] = df[column].map(
+                lambda value: '; '.join(str(v) for v in value) if isinstance(value, list) else value
+            )
+    return df
+
+
+def csv_bytes(df):
+    """
+    Serializes the table to CSV, with every list of Leerlingnummers in one cell.
+
+    Args:
+        df (pd.DataFrame): The table to export.
+
+    Returns:
+        bytes: UTF-8 encoded CSV.
+    """
+    return _flatten_lists(df).to_csv(index=False).encode('utf-8')
+
+
+def parquet_bytes(df):
+    """
+    Serializes the table to Parquet (needs pyarrow). Lists of Leerlingnummers are kept as list columns.
+
+    Args:
+        df (pd.DataFrame): The table to export.
+
+    Returns:
+        bytes: The Parquet file.
+    """
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def paginated_dataframe(df, key, file_name='details'):
+    """
+    Shows a table one page at a time, with CSV/Parquet downloads that are only built when clicked.
+
+    Args:
+        df (pd.DataFrame): The full table (kept server-side).
+        key (str): Unique widget key prefix for this table.
+        file_name (str): Base name of the downloaded files.
+    """
+    col_size, col_page, col_info = st.columns([1, 1, 2])
+    with col_size:
+        page_size = st.selectbox("Rijen per pagina:", options=PAGE_SIZES, key=f"{key}_page_size")
+    n_pages = max(1, math.ceil(len(df) / page_size))
+    with col_page:
+        page_number = st.number_input("Pagina:", min_value=1, max_value=n_pages, value=1, step=1,
+                                      key=f"{key}_page")
+    with col_info:
+        first_row = min(len(df), (page_number - 1) * page_size + 1)
+        last_row = min(len(df), page_number * page_size)
+        st.caption(f"Rij {first_row}-{last_row} van {len(df)} (pagina {page_number} van {n_pages})")
+
+    st.dataframe(table_page(df, page_number, page_size))
+
+    # Callables are only executed when the button is clicked, not on every rerun
+    col_csv, col_parquet = st.columns(2)
+    with col_csv:
+        st.download_button(
+            "Download CSV",
+            data=lambda: csv_bytes(df),
+            file_name=f"{file_name}.csv",
+            mime="text/csv",
+            on_click='ignore',
+            key=f"{key}_csv",
+        )
+    with col_parquet:
+        st.download_button(
+            "Download Parquet",
+            data=lambda: parquet_bytes(df),
+            file_name=f"{file_name}.parquet",
+            mime="application/vnd.apache.parquet",
+            on_click='ignore',
+            key=f"{key}_parquet",
+        )
@@ -1,12 +1,31 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 import numpy as np
 import os
+from components.leerfase_ordering import (
+    LEERFASE_LOOKUP,
+    LEERFASE_ORDERING,
+    leerfase_numeric_value,
+    numeric_values,
+)
+
+AFSTROOM_STATUSES = ['VO verlater', 'Afstroom', 'Afgewezen']
+# The category of classify_progression that a source 'Doorstroom' label stands for; other labels
+# (and missing ones) are classified from the leerfases
+SOURCE_LABEL_CATEGORIES = {
+    'Doorstroom': 'Doorstroom',
+    'Opstroom': 'Doorstroom',
+    'Geslaagd': 'Doorstroom',
+    'Doublure': 'Doublure',
+    'Afstroom': 'Afstroom',
+    'VO verlater': 'Afstroom',
+    'Afgewezen': 'Afstroom',
+}
 
 def _get_leerfase_numeric_value(leerfase_str):
     """
     Assigns a numerical value to each 'Leerfase (afk)' for comparison.
+    The rules are configured in components/leerfase_ordering.toml.
 
     Args:
         leerfase_str (str): The 'Leerfase (afk)' string.
@@ -14,64 +33,96 @@ def _get_leerfase_numeric_value(leerfase_str):
     Returns:
         float: A numerical representation of the leerfase, or np.nan if not recognized.
     """
-    if pd.isna(leerfase_str):
-        return np.nan
+    return leerfase_numeric_value(leerfase_str, LEERFASE_ORDERING)
 
-    leerfase_str = str(leerfase_str).strip()
+def classify_progression(current_leerfase, next_leerfase, leerfase_vergelijk=None):
+    """
+    Categorizes one-year transitions into 'Doorstroom', 'Afstroom', 'Doublure', 'Other' or
+    'No Data (Dropout/Missing)', vectorized over all rows.
 
-    # Handle terminal statuses
-    if leerfase_str == 'Geslaagd':
-        return 100.0  # High value for successful completion
-    elif leerfase_str in ['VO verlater', 'Afstroom', 'Afgewezen']:
-        return 0.0    # Low value for non-progression/failure
+    Priority: a missing next leerfase, then 'To <leerfase_vergelijk>', then doublure of the same
+    leerfase, then the terminal statuses (Geslaagd is Doorstroom, VO verlater/Afstroom/Afgewezen is
+    Afstroom), and finally a higher or lower value in the leerfase ordering.
 
-    # Handle 'doublure' by stripping it for the core comparison logic
-    original_leerfase = leerfase_str
-    if '_doublure' in leerfase_str:
-        leerfase_str = leerfase_str.replace('_doublure', '')
+    Args:
+        current_leerfase (pd.Series): The 'Leerfase (afk)' in the starting year.
+        next_leerfase (pd.Series): The 'Leerfase (afk)' in the next school year (NaN if missing).
+        leerfase_vergelijk (str, optional): Transitions to this leerfase get their own 'To <leerfase>' category.
 
-    # Handle 'v', 'h', 't' levels
-    if leerfase_str.startswith('t') and leerfase_str[1:].isdigit():
-        return 10 + int(leerfase_str[1:])
-    elif leerfase_str.startswith('hv') and leerfase_str[2:].isdigit():
-        return 15 + int(leerfase_str[2:])
-    elif leerfase_str.startswith('h') and leerfase_str[1:].isdigit():
-        return 20 + int(leerfase_str[1:])
-    elif leerfase_str.startswith('v') and leerfase_str[1:].isdigit():
-        return 30 + int(leerfase_str[1:])
+    Returns:
+        np.ndarray: The category per row.
+    """
+    current_clean = current_leerfase.str.replace('_doublure', '', regex=False)
+    next_clean = next_leerfase.str.replace('_doublure', '', regex=False)
+
+    # One index lookup per column in the table compiled when the ordering rules were loaded
+    current_numeric = numeric_values(current_leerfase, LEERFASE_LOOKUP, LEERFASE_ORDERING)
+    next_numeric = numeric_values(next_clean, LEERFASE_LOOKUP, LEERFASE_ORDERING)
+
+    conditions = [
+        next_leerfase.isna().to_numpy(),
+        (next_leerfase == leerfase_vergelijk).to_numpy(dtype=bool) if leerfase_vergelijk else np.zeros(len(next_leerfase), dtype=bool),
+        (next_leerfase.str.contains('_doublure', regex=False, na=False) & (next_clean == current_clean)).to_numpy(dtype=bool),
+        (next_clean == 'Geslaagd').to_numpy(dtype=bool),
+        next_clean.isin(AFSTROOM_STATUSES).to_numpy(dtype=bool),
+        np.isnan(current_numeric) | np.isnan(next_numeric),
+        next_numeric > current_numeric,
+        next_numeric < current_numeric,
+    ]
+    choices = ['No Data (Dropout/Missing)', f'To {leerfase_vergelijk}', 'Doublure', 'Doorstroom', 'Afstroom',
+               'Other', 'Doorstroom', 'Afstroom']
+    return np.select(conditions, choices, default='Other')
+
+def source_progression(source_label):
+    """
+    The source 'Doorstroom' label as a classify_progression category (see SOURCE_LABEL_CATEGORIES).
 
-    return np.nan # Return NaN for unknown patterns
-def analyze_next_leerfase(df, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None, leerfase_vergelijk=None):
+    Args:
+        source_label (pd.Series): The 'Doorstroom' column.
+
+    Returns:
+        pd.Series: The category per row, NaN where the label has none.
     """
-    Analyzes one-year student progression from a specific 'Leerfase (afk)'
-    within a school year range, categorizing into 'Doublure', 'Doorstroom',
-    'Afstroom', or 'Other', and calculating percentages, counts, and listing student IDs.
+    return source_label.map(SOURCE_LABEL_CATEGORIES)
+
+def reconciled_progression(current_leerfase, next_leerfase, source_label, leerfase_vergelijk=None):
+    """
+    Categorizes one-year transitions like classify_progression, but takes the trusted source label
+    where there is one: only the rows without it are classified from their leerfases. Transitions to
+    leerfase_vergelijk keep their 'To <leerfase_vergelijk>' category, the source has no label for it.
 
     Args:
-        df (pd.DataFrame): The input DataFrame, sorted by 'Leerlingnummer' and 'Schooljaar'.
-                           Must contain 'Leerlingnummer', 'Schooljaar', 'Leerfase (afk)',
-                           'Leerfase (afk) vorig schooljaar', and 'Tekortpunten_Bucket' columns.
-        schooljaar_start (int): The starting school year (inclusive) for the analysis.
-        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
-        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
-        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
-                                                   Defaults to None (all buckets).
-        leerfase_vergelijk (str, optional): A specific 'Leerfase (afk)' to compare against.
-                                            If provided, will specifically track progression to this phase.
+        current_leerfase (pd.Series): The 'Leerfase (afk)' in the starting year.
+        next_leerfase (pd.Series): The 'Leerfase (afk)' in the next school year (NaN if missing).
+        source_label (pd.Series): The 'Doorstroom' label of the starting year.
+        leerfase_vergelijk (str, optional): Transitions to this leerfase get their own 'To <leerfase>' category.
 
     Returns:
-        tuple: A tuple containing two pd.Series and one dict:
-               - progression_percentages (pd.Series): Percentages of progression categories.
-               - progression_counts (pd.Series): Absolute counts of progression categories.
-               - progression_students_by_category (dict): Dictionary where keys are categories and values are lists of Leerlingnummers.
-               Returns (pd.Series([], dtype=float), pd.Series([], dtype=int), {}) if no students match the criteria.
+        np.ndarray: The category per row.
+    """
+    progression = source_progression(source_label).to_numpy(dtype=object)
+    infer = pd.isna(progression)
+    if leerfase_vergelijk:
+        infer |= (next_leerfase == leerfase_vergelijk).to_numpy(dtype=bool)
+    if infer.any():
+        progression[infer] = classify_progression(current_leerfase[infer], next_leerfase[infer], leerfase_vergelijk)
+    return progression
+
+def _one_year_transitions(df, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None,
+                          leerfase_vergelijk=None, use_source_label=False):
+    """
+    The categorized one-year transitions behind analyze_next_leerfase and analyze_next_leerfase_per_category.
+
+    Returns:
+        pd.DataFrame: The starting rows with a consecutive next school year, with 'next_leerfase' and
+                      'Progression' added; empty if no students match the criteria.
     """
     # 1. Filter students who were in the leerfase_start within the specified year range.
     initial_phase_students_df = df[
         (df['Schooljaar'] >= schooljaar_start) &
         (df['Schooljaar'] <= schooljaar_eind) &
         (df['Leerfase (afk)'] == leerfase_start)
-    ].copy()
+    ]
 
     # Apply tekortpunten_bucket_filter if provided
     if tekortpunten_bucket_filter is not None and len(tekortpunten_bucket_filter) > 0:
@@ -81,9 +132,6 @@ def analyze_next_leerfase(df, schooljaar_start, schooljaar_eind, leerfase_start,
 
     relevant_leerlingnummers = initial_phase_students_df['Leerlingnummer'].unique()
 
-    if len(relevant_leerlingnummers) == 0:
-        return pd.Series([], dtype=float), pd.Series([], dtype=int), {}
-
     # 2. Get ALL records for these relevant students to track their next year's phase
     student_records = df[df['Leerlingnummer'].isin(relevant_leerlingnummers)].copy()
     student_records = student_records.sort_values(by=['Leerlingnummer', 'Schooljaar'])
@@ -101,117 +149,102 @@ def analyze_next_leerfase(df, schooljaar_start, schooljaar_eind, leerfase_start,
         (student_records['next_schooljaar'] == student_records['Schooljaar'] + 1)
     ].copy()
 
-    # Make sure Leerfase (afk) vorig schooljaar is valid before comparison for doublure
-    transitions_df['Leerfase (afk) vorig schooljaar_clean'] = transitions_df['Leerfase (afk) vorig schooljaar'].apply(lambda x: str(x).replace('_doublure', '') if pd.notna(x) else np.nan)
-
-    # Remove _doublure from leerfase_start for comparison
-    leerfase_start_clean = str(leerfase_start).replace('_doublure', '')
-
-    def categorize_progression(row):
-        current_phase = row['Leerfase (afk)']
-        next_phase = row['next_leerfase']
-
-        if pd.isna(next_phase):
-            return 'No Data (Dropout/Missing)' # Handle cases where next phase is missing
-
-        # Specific comparison for leerfase_vergelijk if provided
-        if leerfase_vergelijk and next_phase == leerfase_vergelijk:
-            return f'To {leerfase_vergelijk}'
-
-        # Priority 1: Doublure detection
-        if '_doublure' in str(next_phase) and str(next_phase).replace('_doublure', '') == leerfase_start_clean:
-            return 'Doublure'
-
-        # Clean next_phase for numeric comparison
-        next_phase_clean = str(next_phase).replace('_doublure', '')
+    if transitions_df.empty:
+        return transitions_df
+
+    # Ordering rules come from components/leerfase_ordering.toml and are compiled once per leerfase code
+    if use_source_label:
+        transitions_df['Progression'] = reconciled_progression(transitions_df['Leerfase (afk)'], transitions_df['next_leerfase'],
+                                                               transitions_df['Doorstroom'], leerfase_vergelijk)
+    else:
+        transitions_df['Progression'] = classify_progression(transitions_df['Leerfase (afk)'], transitions_df['next_leerfase'],
+                                                             leerfase_vergelijk)
+    return transitions_df
+
+def analyze_next_leerfase(df, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None, leerfase_vergelijk=None,
+                          use_source_label=False):
+    """
+    Analyzes one-year student progression from a specific 'Leerfase (afk)'
+    within a school year range, categorizing into 'Doublure', 'Doorstroom',
+    'Afstroom', or 'Other', and calculating counts and percentages.
 
-        # Priority 2: Terminal statuses
-        if next_phase_clean == 'Geslaagd':
-            return 'Doorstroom' # Geslaagd is always a positive progression
-        elif next_phase_clean in ['VO verlater', 'Afstroom', 'Afgewezen']:
-            return 'Afstroom' # These are definitive negative outcomes
+    Args:
+        df (pd.DataFrame): The input DataFrame, sorted by 'Leerlingnummer' and 'Schooljaar'.
+                           Must contain 'Leerlingnummer', 'Schooljaar', 'Leerfase (afk)' and
+                           'Tekortpunten_Bucket' columns ('Doorstroom' too with use_source_label).
+        schooljaar_start (int): The starting school year (inclusive) for the analysis.
+        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
+        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
+        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
+                                                   Defaults to None (all buckets).
+        leerfase_vergelijk (str, optional): A specific 'Leerfase (afk)' to compare against.
+                                            If provided, will specifically track progression to this phase.
+        use_source_label (bool): Take the source 'Doorstroom' label where it maps to a category
+                                 (see reconciled_progression) instead of classifying every transition.
 
-        # Priority 3: Numeric comparison for v/h/t levels
-        current_numeric = _get_leerfase_numeric_value(current_phase)
-        next_numeric = _get_leerfase_numeric_value(next_phase_clean)
+    Returns:
+        pd.DataFrame: 'Aantallen' and 'Percentage' per progression category (see _progression_table).
+                      Returns (pd.Series([], dtype=float), pd.Series([], dtype=int), {}) if no students match the criteria.
+    """
+    transitions_df = _one_year_transitions(df, schooljaar_start, schooljaar_eind, leerfase_start,
+                                           tekortpunten_bucket_filter, leerfase_vergelijk, use_source_label)
+    if transitions_df.empty:
+        return pd.Series([], dtype=float), pd.Series([], dtype=int), {}
 
-        if pd.isna(current_numeric) or pd.isna(next_numeric):
-            return 'Other' # Cannot compare if numeric values are unknown
+    return _progression_table(transitions_df, leerfase_vergelijk)
 
-        if next_numeric > current_numeric:
-            return 'Doorstroom'
-        elif next_numeric < current_numeric:
-            return 'Afstroom'
-        elif next_numeric == current_numeric:
-            # If numeric values are the same but not a _doublure and not a terminal status,
-            # it implies staying in the same level without explicitly being a doublure, which is 'Other'
-            return 'Other'
+def analyze_next_leerfase_per_category(df, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None,
+                                       leerfase_vergelijk=None, use_source_label=False):
+    """
+    Same analysis as analyze_next_leerfase, as separate percentages and counts and with the
+    students per category (pages 3 and 8).
 
-        return 'Other' # Default for any uncaught cases
+    Args:
+        Same as analyze_next_leerfase.
 
+    Returns:
+        tuple: A tuple containing two pd.Series and one dict:
+               - progression_percentages (pd.Series): Percentages of progression categories.
+               - progression_counts (pd.Series): Absolute counts of progression categories.
+               - progression_students_by_category (dict): Dictionary where keys are categories and values are lists of Leerlingnummers.
+               Returns (pd.Series([], dtype=float), pd.Series([], dtype=int), {}) if no students match the criteria.
+    """
+    transitions_df = _one_year_transitions(df, schooljaar_start, schooljaar_eind, leerfase_start,
+                                           tekortpunten_bucket_filter, leerfase_vergelijk, use_source_label)
     if transitions_df.empty:
         return pd.Series([], dtype=float), pd.Series([], dtype=int), {}
 
-    transitions_df['Progression'] = transitions_df.apply(categorize_progression, axis=1)
-
-    # Calculate percentages and counts
-    total_students = len(transitions_df)
-    if total_students == 0:
-        return pd.Series([], dtype=float), pd.Series([], dtype=int), {}
-
     progression_counts = transitions_df['Progression'].value_counts()
-    progression_percentages = (progression_counts / total_students) * 100
+    progression_percentages = (progression_counts / len(transitions_df)) * 100
 
     # Create dictionary of Leerlingnummers by progression category
     progression_students_by_category = transitions_df.groupby('Progression')['Leerlingnummer'].unique().apply(list).to_dict()
 
     # Ensure all categories are present, even if 0% or 0 count
-    all_categories = ['Doorstroom', 'Afstroom', 'Doublure', 'Other', 'No Data (Dropout/Missing)']
-    if leerfase_vergelijk:
-        all_categories.append(f'To {leerfase_vergelijk}')
-
-    for category in all_categories:
+    for category in _progression_categories(leerfase_vergelijk):
         if category not in progression_percentages.index:
             progression_percentages[category] = 0.0
         if category not in progression_counts.index:
             progression_counts[category] = 0
         if category not in progression_students_by_category:
             progression_students_by_category[category] = []
-    #progression_counts=pd.DataFrame(progression_counts)
-    #progression_counts.rename(columns={'count': 'aantallen'}, inplace=True))
-    result = pd.concat([progression_counts, progression_percentages], axis=1)
-    result.columns = ['Aantallen','Percentage']
-    result["Percentage"]=result["Percentage"].round(0).astype(int)
-    result["Percentage"] = result["Percentage"].astype(str) + "%"
-    return result.sort_index()#, progression_counts.sort_index(), progression_students_by_category
 
-def analyze_three_year_leerfase_transitions(df, schooljaar_start, schooljaar_eind, leerfase_start,
-                                            leerlingnummer_filter=None, tekortpunten_bucket_filter=None):
-    """
-    Analyzes 'Leerfase (afk)' transitions for students over three consecutive school years.
-    Shows up to three transitions, even if fewer are available consecutively.
+    return progression_percentages.sort_index(), progression_counts.sort_index(), progression_students_by_category
 
-    Args:
-        df (pd.DataFrame): The input DataFrame, expected to be sorted by 'Leerlingnummer' and 'Schooljaar'.
-                           It must contain 'Leerlingnummer', 'Schooljaar', and 'Leerfase (afk)' columns.
-        schooljaar_start (int): The starting school year (inclusive) for the analysis.
-        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
-        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
-        leerlingnummer_filter (int or list, optional): A single 'Leerlingnummer' or a list of 'Leerlingnummer's
-                                                       to filter the analysis. Defaults to None (all students).
-        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
-                                                   Defaults to None (all buckets).
+def _three_year_starting_rows(df, schooljaar_start, schooljaar_eind, leerfase_start, leerlingnummer_filter=None,
+                              tekortpunten_bucket_filter=None):
+    """
+    The starting rows of the three-year analyses, with 'next_leerfase_k' and 'next_schooljaar_k' for k = 1..3.
 
     Returns:
-        pd.Series: A Series with three-year transition strings as index and counts as values.
-                   (e.g., "v5 -> v6", "v5 -> v6 -> Geslaagd", or "v5 -> v5_doublure").
+        pd.DataFrame: The starting rows; empty if no students match the criteria.
     """
     # Filter students who were in the leerfase_start within the specified year range.
     initial_phase_students_df = df[
         (df['Schooljaar'] >= schooljaar_start) &
         (df['Schooljaar'] <= schooljaar_eind) &
         (df['Leerfase (afk)'] == leerfase_start)
-        ].copy()  # Use .copy() to avoid SettingWithCopyWarning
+        ]
 
     if leerlingnummer_filter is not None:
         if isinstance(leerlingnummer_filter, int):
@@ -228,21 +261,14 @@ def analyze_three_year_leerfase_transitions(df, schooljaar_start, schooljaar_ein
     # Get unique Leerlingnummer's from the filtered initial phase students
     relevant_leerlingnummers = initial_phase_students_df['Leerlingnummer'].unique()
 
-    if len(relevant_leerlingnummers) == 0:
-        # st.warning(f"No students found in '{leerfase_start}' between {schooljaar_start}-{schooljaar_eind} (or matching filter).")
-        return pd.Series([], dtype=int)
-
     # Get ALL records for these relevant students.
     student_records = df[df['Leerlingnummer'].isin(relevant_leerlingnummers)].copy()
     student_records = student_records.sort_values(by=['Leerlingnummer', 'Schooljaar'])
 
-    # Calculate the next two 'Leerfase (afk)' and 'Schooljaar' for each student
-    student_records['next_leerfase_1'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-1)
-    student_records['next_schooljaar_1'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-1)
-    student_records['next_leerfase_2'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-2)
-    student_records['next_schooljaar_2'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-2)
-    student_records['next_leerfase_3'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-3)
-    student_records['next_schooljaar_3'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-3)
+    # Calculate the next three 'Leerfase (afk)' and 'Schooljaar' for each student
+    for k in range(1, 4):
+        student_records[f'next_leerfase_{k}'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-k)
+        student_records[f'next_schooljaar_{k}'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-k)
 
     # Filter for starting points within the specified range
     transitions_df = student_records[
@@ -256,53 +282,162 @@ def analyze_three_year_leerfase_transitions(df, schooljaar_start, schooljaar_ein
         transitions_df = transitions_df[
             transitions_df['Tekortpunten_Bucket'].isin(tekortpunten_bucket_filter)
         ]
+    return transitions_df
 
-    if transitions_df.empty:
-        # st.warning(f"No starting points found from '{leerfase_start}' between {schooljaar_start}-{schooljaar_eind} (or matching filter).")
-        return pd.Series([], dtype=int)
+def analyze_three_year_leerfase_transitions(df, schooljaar_start, schooljaar_eind, leerfase_start,
+                                            leerlingnummer_filter=None, tekortpunten_bucket_filter=None, bucket_paths=True):
+    """
+    Analyzes 'Leerfase (afk)' transitions for students over three consecutive school years.
+    Shows up to three transitions, even if fewer are available consecutively.
 
-    # Initialize the transition string with the starting phase and its bucket
-    transitions_df['Transition'] = transitions_df['Leerfase (afk)'] + ' [' + transitions_df[
-        'Tekortpunten_Bucket'].astype(str) + ']'
-
-    # Conditionally add the first transition
-    transitions_df['Transition'] = np.where(
-        (transitions_df['next_schooljaar_1'] == transitions_df['Schooljaar'] + 1) & (
-            transitions_df['next_leerfase_1'].notna())&
-        (transitions_df['next_leerfase_1'] != "Doorstroom")
-        ,
-        transitions_df['Transition'] + ' -> ' + transitions_df['next_leerfase_1'],
-        transitions_df['Transition']
-    )
+    Args:
+        df (pd.DataFrame): The input DataFrame, expected to be sorted by 'Leerlingnummer' and 'Schooljaar'.
+                           It must contain 'Leerlingnummer', 'Schooljaar', and 'Leerfase (afk)' columns.
+        schooljaar_start (int): The starting school year (inclusive) for the analysis.
+        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
+        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
+        leerlingnummer_filter (int or list, optional): A single 'Leerlingnummer' or a list of 'Leerlingnummer's
+                                                       to filter the analysis. Defaults to None (all students).
+        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
+                                                   Defaults to None (all buckets).
+        bucket_paths (bool): Paths as on page 2, see _add_transition_paths; False gives the plain
+                             leerfase paths of the detail pages (3 and 9).
 
-    # Conditionally add the second transition
-    transitions_df['Transition'] = np.where(
-        (transitions_df['next_schooljaar_1'] == transitions_df['Schooljaar'] + 1) &
-        (transitions_df['next_schooljaar_2'] == transitions_df['Schooljaar'] + 2) &
-        (transitions_df['next_leerfase_2'].notna())&
-        (transitions_df['next_leerfase_2'] != "Doorstroom")
-        ,
-        transitions_df['Transition'] + ' -> ' + transitions_df['next_leerfase_2'],
-        transitions_df['Transition']
-    )
+    Returns:
+        pd.Series: A Series with three-year transition strings as index and counts as values.
+                   (e.g., "v5 [0-3] -> v6", "v5 [0-3] -> v6 -> Geslaagd", or with bucket_paths=False "v5 -> v6").
+    """
+    transitions_df = _three_year_starting_rows(df, schooljaar_start, schooljaar_eind, leerfase_start,
+                                               leerlingnummer_filter, tekortpunten_bucket_filter)
+    if transitions_df.empty:
+        return pd.Series([], dtype=int)
 
-    # Conditionally add the third transition
-    transitions_df['Transition'] = np.where(
-        (transitions_df['next_schooljaar_1'] == transitions_df['Schooljaar'] + 1) &
-        (transitions_df['next_schooljaar_2'] == transitions_df['Schooljaar'] + 2) &
-        (transitions_df['next_schooljaar_3'] == transitions_df['Schooljaar'] + 3) &
-        (transitions_df['next_leerfase_3'].notna())&
-        (transitions_df['next_leerfase_3'] != "Doorstroom")
-        ,
-        transitions_df['Transition'] + ' -> ' + transitions_df['next_leerfase_3'],
-        transitions_df['Transition']
-    )
+    transitions_df = _add_transition_paths(transitions_df, bucket_paths)
 
     # Aantal the occurrences of each unique transition
     transition_counts = transitions_df['Transition'].value_counts()
 
     return transition_counts
 
+def analyze_three_year_leerfase_transitions_with_leerlingnummers(df, schooljaar_start, schooljaar_eind, leerfase_start,
+                                                                 leerlingnummer_filter=None, tekortpunten_bucket_filter=None,
+                                                                 bucket_paths=True):
+    """
+    Same analysis as analyze_three_year_leerfase_transitions, returning each student's Leerlingnummer
+    along with their transition path.
+
+    Args:
+        Same as analyze_three_year_leerfase_transitions.
+
+    Returns:
+        pd.DataFrame: A DataFrame with 'Transition' strings, 'Aantal' of students, and a list of 'Leerlingnummer's
+                      for each transition path.
+    """
+    transitions_df = _three_year_starting_rows(df, schooljaar_start, schooljaar_eind, leerfase_start,
+                                               leerlingnummer_filter, tekortpunten_bucket_filter)
+    if transitions_df.empty:
+        return pd.DataFrame(columns=['Transition', 'Aantal', 'Leerlingnummers'])
+
+    transitions_df = _add_transition_paths(transitions_df, bucket_paths)
+
+    # Group by transition path to get counts and lists of Leerlingnummers
+    transition_summary = transitions_df.groupby('Transition').agg(
+        Aantal=('Leerlingnummer', 'size'),
+        Leerlingnummers=('Leerlingnummer', lambda x: list(x.unique()))
+    ).reset_index()
+
+    return transition_summary
+
+def _progression_categories(leerfase_vergelijk=None):
+    """The categories every one-year table shows, also when no transition has them."""
+    categories = ['Doorstroom', 'Afstroom', 'Doublure', 'Other', 'No Data (Dropout/Missing)']
+    if leerfase_vergelijk:
+        categories.append(f'To {leerfase_vergelijk}')
+    return categories
+
+
+def _progression_table(transitions_df, leerfase_vergelijk=None):
+    """
+    Summarizes categorized one-year transitions into the 'Aantallen' / 'Percentage' table.
+
+    Args:
+        transitions_df (pd.DataFrame): One-year transitions with a 'Progression' and a 'Leerlingnummer' column.
+        leerfase_vergelijk (str, optional): Adds the 'To <leerfase_vergelijk>' category when provided.
+
+    Returns:
+        pd.DataFrame: Counts and rounded percentage strings per progression category, sorted by category.
+    """
+    if len(transitions_df) == 0:
+        return pd.Series([], dtype=float), pd.Series([], dtype=int), {}
+
+    return _progression_counts_table(transitions_df['Progression'].value_counts(), leerfase_vergelijk)
+
+
+def _progression_counts_table(progression_counts, leerfase_vergelijk=None):
+    """
+    Same table as _progression_table, from the number of transitions per category
+    (e.g. aggregated by another query engine).
+
+    Args:
+        progression_counts (pd.Series): Counts indexed by progression category.
+        leerfase_vergelijk (str, optional): Adds the 'To <leerfase_vergelijk>' category when provided.
+
+    Returns:
+        pd.DataFrame: Counts and rounded percentage strings per progression category, sorted by category.
+    """
+    # Calculate percentages and counts
+    total_students = progression_counts.sum()
+    progression_percentages = (progression_counts / total_students) * 100
+
+    # Ensure all categories are present, even if 0% or 0 count
+    for category in _progression_categories(leerfase_vergelijk):
+        if category not in progression_percentages.index:
+            progression_percentages[category] = 0.0
+        if category not in progression_counts.index:
+            progression_counts[category] = 0
+    result = pd.concat([progression_counts, progression_percentages], axis=1)
+    result.columns = ['Aantallen','Percentage']
+    result["Percentage"]=result["Percentage"].round(0).astype(int)
+    result["Percentage"] = result["Percentage"].astype(str) + "%"
+    return result.sort_index()
+
+
+def _add_transition_paths(transitions_df, bucket_paths=True):
+    """
+    Builds the 'Transition' path string (up to three consecutive years ahead) for each starting row.
+
+    Args:
+        transitions_df (pd.DataFrame): Starting rows with 'Leerfase (afk)', 'Schooljaar', 'Tekortpunten_Bucket'
+                                       and the 'next_leerfase_k' / 'next_schooljaar_k' columns for k = 1..3.
+        bucket_paths (bool): Start the path with the leerfase and its bucket ('h4 [0-3]') and leave out the
+                             'Doorstroom' status label; False starts with the leerfase and keeps every step.
+
+    Returns:
+        pd.DataFrame: The same DataFrame with an added 'Transition' column.
+    """
+    if bucket_paths:
+        # Initialize the transition string with the starting phase and its bucket
+        transitions_df['Transition'] = transitions_df['Leerfase (afk)'] + ' [' + transitions_df[
+            'Tekortpunten_Bucket'].astype(str) + ']'
+        skipped = ['Doorstroom']
+    else:
+        transitions_df['Transition'] = transitions_df['Leerfase (afk)']
+        skipped = []
+
+    # Conditionally add each transition while the school years stay consecutive
+    consecutive = pd.Series(True, index=transitions_df.index)
+    for k in range(1, 4):
+        next_leerfase = transitions_df[f'next_leerfase_{k}']
+        consecutive = consecutive & (transitions_df[f'next_schooljaar_{k}'] == transitions_df['Schooljaar'] + k)
+        transitions_df['Transition'] = np.where(
+            consecutive & next_leerfase.notna() & ~next_leerfase.isin(skipped),
+            transitions_df['Transition'] + ' -> ' + next_leerfase,
+            transitions_df['Transition']
+        )
+
+    return transitions_df
+
+
 def counts_with_percentages(transition_counts: pd.Series) -> pd.DataFrame:
     """
     Zet een Series met aantallen om naar een DataFrame met aantallen + percentages
@@ -393,6 +528,9 @@ def plot_sankey_diagram(labels, source, target, value, title="Doorstroom leerlin
     Returns:
         go.Figure: A Plotly Figure object representing the Sankey diagram.
     """
+    # Imported here, so the command-line tools that never draw a diagram do not load plotly
+    import plotly.graph_objects as go
+
     fig = go.Figure(data=[
         go.Sankey(
             node=dict(
@@ -0,0 +1,272 @@
+"""
+Optional DuckDB backend for the flow queries (needs the 'duckdb' package).
+
+The dataset is registered once in an embedded, in-process DuckDB database; the one-year and
+three-year transitions are expressed with LEAD() window functions per student. The cohort filter
+is pushed down as a semi-join on the starting students, so the window only runs over their rows.
+Results match one_year_flow_table and three_year_flow_counts in components/transition_cube.py:
+
+    python -m components.duckdb_backend --check
+
+The app uses this backend with DOORSTROOM_ENGINE=duckdb (see components/engines.py). The connection is
+shared by all sessions; every query runs on its own cursor, so queries from the analysis threads
+do not share a connection.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from components.doorstroom_functions import (
+    AFSTROOM_STATUSES,
+    SOURCE_LABEL_CATEGORIES,
+    _get_leerfase_numeric_value,
+    _progression_counts_table,
+)
+from components import transition_cube
+from components.transition_cube import DATA_FILE_PATH, YEARS_AHEAD, read_dataset, build_transition_cube
+
+_COHORT_FILTER = """
+    Schooljaar BETWEEN $schooljaar_start AND $schooljaar_eind
+    AND "Leerfase (afk)" = $leerfase_start
+"""
+
+_BUCKET_FILTER = """
+    AND list_contains($tekortpunten_buckets, Tekortpunten_Bucket)
+"""
+
+
+def _lead_columns(years_ahead=YEARS_AHEAD):
+    columns = []
+    for k in range(1, years_ahead + 1):
+        columns.append(f'LEAD("Leerfase (afk)", {k}) OVER student AS next_leerfase_{k}')
+        columns.append(f'LEAD(Schooljaar, {k}) OVER student AS next_schooljaar_{k}')
+    return ',\n            '.join(columns)
+
+
+def _cohort_query(select, bucket_filter_on_students, bucket_filter_on_rows):
+    """Starting rows of the cohort with their LEAD() columns, followed by `select`."""
+    return f"""
+        WITH students AS (
+            SELECT DISTINCT Leerlingnummer FROM doorstroom
+            WHERE {_COHORT_FILTER} {_BUCKET_FILTER if bucket_filter_on_students else ''}
+        ),
+        paths AS (
+            SELECT d.*,
+            {_lead_columns()}
+            FROM doorstroom d
+            WHERE Leerlingnummer IN (SELECT Leerlingnummer FROM students)
+            WINDOW student AS (PARTITION BY Leerlingnummer ORDER BY Schooljaar)
+        ),
+        cohort AS (
+            SELECT * FROM paths
+            WHERE {_COHORT_FILTER} {_BUCKET_FILTER if bucket_filter_on_rows else ''}
+        )
+        {select}
+    """
+
+
+def connect(df, threads=None):
+    """
+    Registers the prepared dataset in a new in-memory DuckDB database.
+
+    Args:
+        df (pd.DataFrame): The prepared dataset (see read_dataset).
+        threads (int, optional): Number of DuckDB worker threads. Defaults to all cores.
+
+    Returns:
+        duckdb.DuckDBPyConnection: Connection with the tables 'doorstroom' and 'leerfase_levels'.
+    """
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("The DuckDB backend needs the optional 'duckdb' package: pip install duckdb") from e
+
+    con = duckdb.connect(database=':memory:')
+    if threads:
+        con.execute(f'SET threads TO {int(threads)}')
+
+    dataset = df[['Leerlingnummer', 'Schooljaar', 'Leerfase (afk)', 'Tekortpunten', 'Doorstroom']].copy()
+    # Same string as astype(str) in _add_transition_paths, also for a missing bucket
+    dataset['Tekortpunten_Bucket'] = df['Tekortpunten_Bucket'].astype(str)
+    con.register('dataset_view', dataset)
+    con.execute('CREATE TABLE doorstroom AS SELECT * FROM dataset_view')
+    con.unregister('dataset_view')
+
+    # The leerfase ordering, evaluated once per code (raw codes and codes without '_doublure')
+    codes = pd.Series(df['Leerfase (afk)'].dropna().unique())
+    codes = pd.unique(pd.concat([codes, codes.str.replace('_doublure', '', regex=False)]))
+    levels = pd.DataFrame({'Leerfase': codes, 'Niveau': [_get_leerfase_numeric_value(code) for code in codes]})
+    levels = levels[levels['Niveau'].notna()]
+    con.register('levels_view', levels)
+    con.execute('CREATE TABLE leerfase_levels AS SELECT * FROM levels_view')
+    con.unregister('levels_view')
+    return con
+
+
+def _query(con, query, parameters):
+    # A connection must not run queries from several threads at once, a cursor per query can
+    with con.cursor() as cursor:
+        return cursor.execute(query, parameters).df()
+
+
+def _parameters(schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter):
+    return {
+        'schooljaar_start': int(schooljaar_start),
+        'schooljaar_eind': int(schooljaar_eind),
+        'leerfase_start': leerfase_start,
+        'tekortpunten_buckets': [str(bucket) for bucket in tekortpunten_bucket_filter or []],
+    }
+
+
+def one_year_flow_table(con, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None,
+                        use_source_label=False):
+    """
+    Same table as transition_cube.one_year_flow_table, computed in DuckDB.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Output of connect.
+        schooljaar_start (int): The starting school year (inclusive) for the analysis.
+        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
+        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
+        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
+                                                   Defaults to None (all buckets).
+        use_source_label (bool): Take the source 'Doorstroom' label first (see reconciled_progression).
+
+    Returns:
+        pd.DataFrame: 'Aantallen' and 'Percentage' per progression category
+                      (empty with those columns if no students match the criteria).
+    """
+    afstroom = ', '.join(f"'{status}'" for status in AFSTROOM_STATUSES)
+    source_labels = ''
+    if use_source_label:
+        # The trusted source label first, as in reconciled_progression
+        source_labels = '\n                    '.join(f"WHEN \"Doorstroom\" = '{label}' THEN '{category}'"
+                                                   for label, category in SOURCE_LABEL_CATEGORIES.items())
+    # Same priority as classify_progression
+    select = f"""
+        , classified AS (
+            SELECT
+                CASE
+                    {source_labels}
+                    WHEN next_leerfase_1 IS NULL THEN 'No Data (Dropout/Missing)'
+                    WHEN contains(next_leerfase_1, '_doublure')
+                         AND next_clean = replace("Leerfase (afk)", '_doublure', '') THEN 'Doublure'
+                    WHEN next_clean = 'Geslaagd' THEN 'Doorstroom'
+                    WHEN next_clean IN ({afstroom}) THEN 'Afstroom'
+                    WHEN current_level.Niveau IS NULL OR next_level.Niveau IS NULL THEN 'Other'
+                    WHEN next_level.Niveau > current_level.Niveau THEN 'Doorstroom'
+                    WHEN next_level.Niveau < current_level.Niveau THEN 'Afstroom'
+                    ELSE 'Other'
+                END AS Progression
+            FROM (
+                SELECT *, replace(next_leerfase_1, '_doublure', '') AS next_clean
+                FROM cohort
+                WHERE next_schooljaar_1 = Schooljaar + 1
+            ) c
+            LEFT JOIN leerfase_levels current_level ON current_level.Leerfase = c."Leerfase (afk)"
+            LEFT JOIN leerfase_levels next_level ON next_level.Leerfase = c.next_clean
+        )
+        SELECT Progression, count(*) AS Aantallen FROM classified GROUP BY Progression
+    """
+    use_buckets = bool(tekortpunten_bucket_filter)
+    query = _cohort_query(select, bucket_filter_on_students=use_buckets, bucket_filter_on_rows=False)
+    parameters = _parameters(schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter)
+    if not use_buckets:
+        del parameters['tekortpunten_buckets']
+
+    counts = _query(con, query, parameters)
+    if counts.empty:
+        return pd.DataFrame(columns=['Aantallen', 'Percentage'])
+    progression_counts = counts.set_index('Progression')['Aantallen'].astype(np.int64).rename('count')
+    return _progression_counts_table(progression_counts)
+
+
+def three_year_flow_counts(con, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None):
+    """
+    Same counts as transition_cube.three_year_flow_counts, computed in DuckDB.
+
+    Args:
+        con (duckdb.DuckDBPyConnection): Output of connect.
+        schooljaar_start (int): The starting school year (inclusive) for the analysis.
+        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
+        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
+        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
+                                                   Defaults to None (all buckets).
+
+    Returns:
+        pd.Series: A Series with three-year transition strings as index and counts as values.
+    """
+    steps = []
+    for k in range(1, YEARS_AHEAD + 1):
+        consecutive = ' AND '.join(f'next_schooljaar_{j} = Schooljaar + {j}' for j in range(1, k + 1))
+        steps.append(f"""CASE WHEN {consecutive} AND next_leerfase_{k} IS NOT NULL
+                         AND next_leerfase_{k} <> 'Doorstroom'
+                         THEN ' -> ' || next_leerfase_{k} ELSE '' END""")
+    select = f"""
+        SELECT "Leerfase (afk)" || ' [' || Tekortpunten_Bucket || ']' || {' || '.join(steps)} AS Transition,
+               count(*) AS count
+        FROM cohort
+        GROUP BY Transition
+        ORDER BY count DESC, Transition
+    """
+    use_buckets = bool(tekortpunten_bucket_filter)
+    query = _cohort_query(select, bucket_filter_on_students=use_buckets, bucket_filter_on_rows=use_buckets)
+    parameters = _parameters(schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter)
+    if not use_buckets:
+        del parameters['tekortpunten_buckets']
+
+    counts = _query(con, query, parameters)
+    if counts.empty:
+        return pd.Series([], dtype=int)
+    return counts.set_index('Transition')['count'].astype(np.int64)
+
+
+def check_against_cube(df, schooljaren=None, tekortpunten_bucket_filter=None):
+    """
+    Compares both flow queries with the pandas transition cube for every leerfase and school year.
+
+    Returns:
+        list: (query, schooljaar, leerfase) for every mismatch; empty when the backends agree.
+    """
+    cube = build_transition_cube(df)
+    con = connect(df)
+    mismatches = []
+    for schooljaar in schooljaren or sorted(df['Schooljaar'].unique()):
+        for leerfase in sorted(df.loc[df['Schooljaar'] == schooljaar, 'Leerfase (afk)'].dropna().unique()):
+            arguments = (schooljaar, schooljaar, leerfase, tekortpunten_bucket_filter)
+            for use_source_label in [False, True]:
+                expected = transition_cube.one_year_flow_table(cube, *arguments, use_source_label=use_source_label)
+                result = one_year_flow_table(con, *arguments, use_source_label=use_source_label)
+                if not expected.astype(str).equals(result.astype(str)):
+                    mismatches.append(('one_year_bron' if use_source_label else 'one_year', schooljaar, leerfase))
+
+            expected = transition_cube.three_year_flow_counts(cube, schooljaar, schooljaar, leerfase,
+                                                              tekortpunten_bucket_filter=tekortpunten_bucket_filter)
+            result = three_year_flow_counts(con, *arguments)
+            if not expected.sort_index().to_dict() == result.sort_index().to_dict():
+                mismatches.append(('three_year', schooljaar, leerfase))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flow queries on DuckDB.")
+    parser.add_argument('--data', default=DATA_FILE_PATH)
+    parser.add_argument('--check', action='store_true', help="Compare every query with the pandas transition cube")
+    parser.add_argument('--schooljaar', type=int)
+    parser.add_argument('--leerfase')
+    args = parser.parse_args()
+
+    df = read_dataset(args.data)
+    if args.check:
+        mismatches = check_against_cube(df)
+        print(f"{len(mismatches)} mismatches" + ''.join(f"\n  {m}" for m in mismatches))
+        return
+
+    con = connect(df)
+    print(one_year_flow_table(con, args.schooljaar, args.schooljaar, args.leerfase).to_string())
+    print(three_year_flow_counts(con, args.schooljaar, args.schooljaar, args.leerfase).to_string())
+
+
+if __name__ == '__main__':
+    main()
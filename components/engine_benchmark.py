@@ -0,0 +1,156 @@
+"""
+Benchmark of the flow query engines on enlarged copies of the dataset:
+
+    python -m components.engine_benchmark --factors 1 10 50
+
+Every engine answers the same queries (one-year table and three-year path counts per school year
+and leerfase). Its results are compared with the per-query pandas pipelines in
+components/doorstroom_functions.py, and its speedup over them is reported. Engines whose optional
+package is not installed are skipped.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from components.doorstroom_functions import analyze_next_leerfase, analyze_three_year_leerfase_transitions
+from components.engines import ENGINES, prepare_dataset, one_year_flow_table, three_year_flow_counts
+from components.transition_cube import DATA_FILE_PATH, read_dataset
+
+REFERENCE = 'pandas (per query)'
+
+
+def synthetic_dataset(df, factor):
+    """
+    The dataset repeated `factor` times with new Leerlingnummers, so paths and group sizes stay realistic.
+
+    Args:
+        df (pd.DataFrame): The prepared dataset (see read_dataset).
+        factor (int): Number of copies.
+
+    Returns:
+        pd.DataFrame: factor * len(df) rows.
+    """
+    offset = int(df['Leerlingnummer'].max()) + 1
+    copies = [df.assign(Leerlingnummer=df['Leerlingnummer'] + copy * offset) for copy in range(factor)]
+    return pd.concat(copies, ignore_index=True)
+
+
+def benchmark_queries(df, n_schooljaren=3, n_leerfases=8, tekortpunten_bucket_filter=('0-3', '4-6')):
+    """
+    Queries over the most recent complete school years and their most common leerfases,
+    each without and with a tekortpunten filter.
+
+    Returns:
+        list: (schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter) tuples.
+    """
+    # The last school year only holds outcome labels, so it has no transitions
+    schooljaren = sorted(df['Schooljaar'].unique())[-n_schooljaren - 1:-1]
+    queries = []
+    for schooljaar in schooljaren:
+        leerfases = df.loc[df['Schooljaar'] == schooljaar, 'Leerfase (afk)'].value_counts().index[:n_leerfases]
+        for leerfase in leerfases:
+            queries.append((schooljaar, schooljaar, leerfase, None))
+            queries.append((schooljaar, schooljaar, leerfase, list(tekortpunten_bucket_filter)))
+    return queries
+
+
+def _run_reference(df, queries):
+    start = time.perf_counter()
+    sorted_df = df.sort_values(by=['Leerlingnummer', 'Schooljaar'])
+    prepare_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = []
+    for schooljaar_start, schooljaar_eind, leerfase, buckets in queries:
+        one_year = analyze_next_leerfase(sorted_df, schooljaar_start, schooljaar_eind, leerfase,
+                                         tekortpunten_bucket_filter=buckets)
+        three_year = analyze_three_year_leerfase_transitions(sorted_df, schooljaar_start, schooljaar_eind, leerfase,
+                                                             tekortpunten_bucket_filter=buckets)
+        results.append((one_year, three_year))
+    return prepare_seconds, time.perf_counter() - start, results
+
+
+def _run_engine(df, engine, queries):
+    start = time.perf_counter()
+    prepared = prepare_dataset(df, engine)
+    prepare_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = []
+    for schooljaar_start, schooljaar_eind, leerfase, buckets in queries:
+        results.append((
+            one_year_flow_table(prepared, schooljaar_start, schooljaar_eind, leerfase, buckets),
+            three_year_flow_counts(prepared, schooljaar_start, schooljaar_eind, leerfase, buckets),
+        ))
+    return prepare_seconds, time.perf_counter() - start, results
+
+
+def _same_table(result, expected):
+    # analyze_next_leerfase returns a tuple of empty Series when no student matches
+    if isinstance(expected, tuple) or len(expected) == 0:
+        return len(result) == 0
+    return result.astype(str).equals(expected.astype(str))
+
+
+def _same_results(results, reference):
+    return all(
+        _same_table(one_year, expected_one_year) and
+        three_year.sort_index().to_dict() == expected_three_year.sort_index().to_dict()
+        for (one_year, three_year), (expected_one_year, expected_three_year) in zip(results, reference)
+    )
+
+
+def benchmark(df, factors=(1, 10), engines=ENGINES):
+    """
+    Runs the benchmark queries on every engine for every dataset size.
+
+    Args:
+        df (pd.DataFrame): The prepared dataset (see read_dataset).
+        factors (list): Dataset sizes as multiples of df.
+        engines (list): Engines to compare with the per-query pandas pipelines.
+
+    Returns:
+        tuple: (results, skipped) with a DataFrame of timings per factor and engine, and the
+               engines that were skipped because their package is missing.
+    """
+    rows = []
+    skipped = []
+    for factor in factors:
+        data = synthetic_dataset(df, factor)
+        queries = benchmark_queries(data)
+        prepare_seconds, query_seconds, reference = _run_reference(data, queries)
+        rows.append((factor, len(data), REFERENCE, prepare_seconds, query_seconds, True))
+
+        for engine in engines:
+            if engine in skipped:
+                continue
+            try:
+                prepare_seconds, query_seconds, results = _run_engine(data, engine, queries)
+            except ImportError:
+                skipped.append(engine)
+                continue
+            rows.append((factor, len(data), engine, prepare_seconds, query_seconds, _same_results(results, reference)))
+
+    results = pd.DataFrame(rows, columns=['Factor', 'Rijen', 'Engine', 'Voorbereiden (s)', 'Queries (s)', 'Gelijk'])
+    reference_seconds = results[results['Engine'] == REFERENCE].set_index('Factor')['Queries (s)']
+    results['Versnelling'] = (results['Factor'].map(reference_seconds) / results['Queries (s)']).round(1)
+    results[['Voorbereiden (s)', 'Queries (s)']] = results[['Voorbereiden (s)', 'Queries (s)']].round(3)
+    return results, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the flow query engines on enlarged datasets.")
+    parser.add_argument('--data', default=DATA_FILE_PATH)
+    parser.add_argument('--factors', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--engines', nargs='+', default=ENGINES, choices=ENGINES)
+    args = parser.parse_args()
+
+    results, skipped = benchmark(read_dataset(args.data), args.factors, args.engines)
+    print(results.to_string(index=False))
+    if skipped:
+        print(f"Skipped (package not installed): {', '.join(skipped)}")
+
+
+if __name__ == '__main__':
+    main()
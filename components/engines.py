@@ -0,0 +1,84 @@
+"""
+Selects the engine behind the flow queries, configured with the DOORSTROOM_ENGINE environment variable:
+
+    pandas  the precomputed transition cube (default, components/transition_cube.py)
+    polars  Polars LazyFrames (components/polars_engine.py, needs 'polars')
+    duckdb  embedded DuckDB (components/duckdb_backend.py, needs 'duckdb')
+
+All engines return the same pandas results. The data store prepares the dataset once per version for
+the configured engine (see load_flow_engine in components/cached_data.py). Polars and DuckDB are
+optional extras: install them with 'pip install -r requirements-engines.txt'.
+"""
+import os
+
+ENGINE_ENV_VAR = 'DOORSTROOM_ENGINE'
+DEFAULT_ENGINE = 'pandas'
+ENGINES = ['pandas', 'polars', 'duckdb']
+
+
+def _engine_module(engine):
+    if engine == 'pandas':
+        from components import transition_cube as module
+    elif engine == 'polars':
+        from components import polars_engine as module
+    else:
+        from components import duckdb_backend as module
+    return module
+
+
+def selected_engine(engine=None):
+    """
+    The configured engine.
+
+    Args:
+        engine (str, optional): Overrides the DOORSTROOM_ENGINE environment variable.
+
+    Returns:
+        str: One of ENGINES.
+    """
+    engine = engine or os.environ.get(ENGINE_ENV_VAR, DEFAULT_ENGINE)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', choose from {', '.join(ENGINES)}")
+    return engine
+
+
+def prepare_dataset(df, engine=None, cube=None):
+    """
+    Prepares the dataset once for the selected engine.
+
+    Args:
+        df (pd.DataFrame): The prepared dataset (see read_dataset).
+        engine (str, optional): Overrides the configured engine.
+        cube (pd.DataFrame, optional): The transition cube of df, reused by the pandas engine instead of building it.
+
+    Returns:
+        tuple: (engine, data) where data is the transition cube, a Polars LazyFrame or a DuckDB connection.
+    """
+    engine = selected_engine(engine)
+    module = _engine_module(engine)
+    if engine == 'pandas':
+        return engine, cube if cube is not None else module.build_transition_cube(df)
+    if engine == 'polars':
+        return engine, module.lazy_dataset(df)
+    return engine, module.connect(df)
+
+
+def one_year_flow_table(prepared, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None,
+                        use_source_label=False):
+    """
+    One-year 'Aantallen' / 'Percentage' table on the prepared engine (see transition_cube.one_year_flow_table).
+    """
+    engine, data = prepared
+    return _engine_module(engine).one_year_flow_table(
+        data, schooljaar_start, schooljaar_eind, leerfase_start,
+        tekortpunten_bucket_filter=tekortpunten_bucket_filter, use_source_label=use_source_label)
+
+
+def three_year_flow_counts(prepared, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None):
+    """
+    Three-year path counts on the prepared engine (see transition_cube.three_year_flow_counts).
+    """
+    engine, data = prepared
+    return _engine_module(engine).three_year_flow_counts(
+        data, schooljaar_start, schooljaar_eind, leerfase_start,
+        tekortpunten_bucket_filter=tekortpunten_bucket_filter)
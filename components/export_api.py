@@ -0,0 +1,263 @@
+"""
+Static export and a small local HTTP/JSON endpoint for the one-year and three-year flow tables.
+
+Both read from the precomputed transition cube, so external dashboards can fetch flows without
+a Streamlit session. Run from the app directory:
+
+    python -m components.export_api export --output-dir exports --format json parquet
+    python -m components.export_api serve --port 8765
+
+Endpoints (all GET, JSON by default, '?format=parquet' for Parquet, Parquet needs pyarrow):
+    /flows/one-year      long table per Schooljaar, Leerfase (afk), Tekortpunten_Bucket and Progression
+    /flows/three-year    long table per Schooljaar, Leerfase (afk) and Transition
+    Add 'leerfase', 'schooljaar_start', 'schooljaar_eind' and optionally 'tekortpunten' (comma separated)
+    to get exactly the table shown on the pages for that selection.
+"""
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from components.transition_cube import (
+    DATA_FILE_PATH,
+    read_dataset,
+    build_transition_cube,
+    one_year_flow_table,
+    three_year_flow_counts,
+)
+from components.doorstroom_functions import counts_with_percentages
+
+CACHE_MAX_AGE = 3600
+FLOW_TABLES = ['one-year', 'three-year']
+
+
+def one_year_flows(cube):
+    """
+    All one-year flows in long format, one row per Schooljaar / Leerfase (afk) / bucket / category.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+
+    Returns:
+        pd.DataFrame: Columns 'Schooljaar', 'Leerfase (afk)', 'Tekortpunten_Bucket', 'Progression',
+                      'Aantallen' and 'Percentage' (share within the Schooljaar / Leerfase group).
+    """
+    keys = ['Schooljaar', 'Leerfase (afk)', 'Tekortpunten_Bucket', 'Progression']
+    flows = (
+        cube[cube['consecutive_1']]
+        .groupby(keys, observed=True)
+        .size()
+        .rename('Aantallen')
+        .reset_index()
+    )
+    totals = flows.groupby(['Schooljaar', 'Leerfase (afk)'])['Aantallen'].transform('sum')
+    flows['Percentage'] = (flows['Aantallen'] / totals * 100).round(1)
+    flows['Tekortpunten_Bucket'] = flows['Tekortpunten_Bucket'].astype(str)
+    return flows
+
+
+def three_year_flows(cube):
+    """
+    All three-year transition paths in long format, one row per Schooljaar / Leerfase (afk) / Transition.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+
+    Returns:
+        pd.DataFrame: Columns 'Schooljaar', 'Leerfase (afk)', 'Transition', 'Aantal' and 'Percentage'
+                      (share within the Schooljaar / Leerfase group).
+    """
+    flows = (
+        cube.dropna(subset=['Leerfase (afk)'])
+        .groupby(['Schooljaar', 'Leerfase (afk)', 'Transition'])
+        .size()
+        .rename('Aantal')
+        .reset_index()
+    )
+    totals = flows.groupby(['Schooljaar', 'Leerfase (afk)'])['Aantal'].transform('sum')
+    flows['Percentage'] = (flows['Aantal'] / totals * 100).round(1)
+    return flows
+
+
+def selected_flows(cube, table, leerfase, schooljaar_start, schooljaar_eind, tekortpunten_bucket_filter=None):
+    """
+    The flow table for one selection, identical to what the analysis pages show.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        table (str): 'one-year' or 'three-year'.
+        leerfase (str): The 'Leerfase (afk)' to start from.
+        schooljaar_start (int): The starting school year (inclusive).
+        schooljaar_eind (int): The ending school year (inclusive).
+        tekortpunten_bucket_filter (list, optional): 'Tekortpunten_Bucket' categories to filter.
+
+    Returns:
+        pd.DataFrame: The table with the category or transition as a regular column.
+    """
+    if table == 'one-year':
+        result = one_year_flow_table(cube, schooljaar_start, schooljaar_eind, leerfase, tekortpunten_bucket_filter)
+        return result.rename_axis('Progression').reset_index()
+
+    transition_counts = three_year_flow_counts(cube, schooljaar_start, schooljaar_eind, leerfase,
+                                               tekortpunten_bucket_filter=tekortpunten_bucket_filter)
+    if transition_counts.empty:
+        return pd.DataFrame(columns=['Transition', 'Aantal', 'Percentage'])
+    return counts_with_percentages(transition_counts).rename_axis('Transition').reset_index()
+
+
+def serialize_table(table_df, file_format='json'):
+    """
+    Serializes a flow table to bytes.
+
+    Args:
+        table_df (pd.DataFrame): The table to serialize.
+        file_format (str): 'json' (list of records) or 'parquet'.
+
+    Returns:
+        bytes: The serialized table.
+    """
+    if file_format == 'parquet':
+        buffer = io.BytesIO()
+        table_df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    if file_format == 'json':
+        return table_df.to_json(orient='records', force_ascii=False).encode('utf-8')
+    raise ValueError(f"Unknown format '{file_format}', expected 'json' or 'parquet'.")
+
+
+def etag_for(payload):
+    """Strong ETag for a serialized payload."""
+    return '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+
+def export_flow_tables(cube, output_dir, formats=('json',)):
+    """
+    Writes the full one-year and three-year flow tables as static files plus a manifest with ETags.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        output_dir (str): Directory to write to (created if missing).
+        formats (tuple): Any of 'json' and 'parquet'.
+
+    Returns:
+        dict: The manifest that was written to 'manifest.json' (file name -> etag and row count).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tables = {'one-year': one_year_flows(cube), 'three-year': three_year_flows(cube)}
+
+    manifest = {}
+    for name, table_df in tables.items():
+        for file_format in formats:
+            payload = serialize_table(table_df, file_format)
+            file_name = f"{name.replace('-', '_')}_flows.{file_format}"
+            with open(os.path.join(output_dir, file_name), 'wb') as f:
+                f.write(payload)
+            manifest[file_name] = {'etag': etag_for(payload), 'rows': len(table_df)}
+
+    with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def make_request_handler(cube):
+    """
+    Builds a request handler class that serves flow tables from the given cube.
+
+    Rendered payloads are cached per query, and clients that send a matching 'If-None-Match'
+    get a 304 without a body.
+    """
+    full_tables = {'one-year': one_year_flows, 'three-year': three_year_flows}
+
+    @functools.lru_cache(maxsize=512)
+    def render(table, file_format, leerfase, schooljaar_start, schooljaar_eind, tekortpunten):
+        if leerfase is None:
+            table_df = full_tables[table](cube)
+        else:
+            table_df = selected_flows(cube, table, leerfase, schooljaar_start, schooljaar_eind,
+                                      list(tekortpunten) if tekortpunten else None)
+        payload = serialize_table(table_df, file_format)
+        return payload, etag_for(payload)
+
+    class FlowRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            table = url.path.rstrip('/').rsplit('/', 1)[-1]
+            if not url.path.startswith('/flows/') or table not in FLOW_TABLES:
+                self.send_error(404, f"Unknown endpoint, use one of: {', '.join('/flows/' + t for t in FLOW_TABLES)}")
+                return
+
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            file_format = query.get('format', 'json')
+            leerfase = query.get('leerfase')
+            tekortpunten = tuple(b for b in query.get('tekortpunten', '').split(',') if b)
+            try:
+                schooljaar_start = int(query['schooljaar_start']) if leerfase else None
+                schooljaar_eind = int(query.get('schooljaar_eind', schooljaar_start)) if leerfase else None
+                payload, etag = render(table, file_format, leerfase, schooljaar_start, schooljaar_eind, tekortpunten)
+            except (KeyError, ValueError) as e:
+                self.send_error(400, f"Invalid query: {e}")
+                return
+
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', f'public, max-age={CACHE_MAX_AGE}')
+                self.end_headers()
+                return
+
+            content_type = 'application/vnd.apache.parquet' if file_format == 'parquet' else 'application/json; charset=utf-8'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', f'public, max-age={CACHE_MAX_AGE}')
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return FlowRequestHandler
+
+
+def serve_flow_tables(cube, host='127.0.0.1', port=8765):
+    """Serves the flow tables over HTTP until interrupted."""
+    server = ThreadingHTTPServer((host, port), make_request_handler(cube))
+    print(f"Serving flow tables on http://{host}:{port}/flows/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or serve the precomputed doorstroom flow tables.")
+    parser.add_argument('--data', default=DATA_FILE_PATH, help="Path to the dataset (default: %(default)s)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Write static JSON/Parquet files")
+    export_parser.add_argument('--output-dir', default='exports')
+    export_parser.add_argument('--format', nargs='+', default=['json'], choices=['json', 'parquet'])
+
+    serve_parser = subparsers.add_parser('serve', help="Serve the tables over HTTP")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+
+    args = parser.parse_args()
+    cube = build_transition_cube(read_dataset(args.data))
+
+    if args.command == 'export':
+        manifest = export_flow_tables(cube, args.output_dir, formats=tuple(args.format))
+        for file_name, info in manifest.items():
+            print(f"{file_name}: {info['rows']} rows, ETag {info['etag']}")
+    else:
+        serve_flow_tables(cube, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import pandas as pd
+import numpy as np
+
+from components.transition_cube import STATUS_LABELS
+
+FORECAST_YEARS = 5
+N_BOOTSTRAP = 1000
+
+
+def transition_schooljaren(cube):
+    """
+    The school years whose one-year transitions can estimate the matrix: the next school year still
+    has students in a class. A later year only leads to status labels (Doorstroom, Geslaagd, ...),
+    which would act as absorbing states.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+
+    Returns:
+        list: The school years, ascending.
+    """
+    in_class = cube['Leerfase (afk)'].notna() & ~cube['Leerfase (afk)'].isin(STATUS_LABELS)
+    class_years = set(cube.loc[in_class, 'Schooljaar'].tolist())
+    return [schooljaar for schooljaar in sorted(cube['Schooljaar'].unique().tolist()) if schooljaar + 1 in class_years]
+
+
+def transition_counts_matrix(cube, schooljaar_start, schooljaar_eind):
+    """
+    Counts one-year leerfase transitions in a school year window from the transition cube.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        schooljaar_start (int): First starting school year (inclusive) of the window.
+        schooljaar_eind (int): Last starting school year (inclusive) of the window.
+
+    Returns:
+        tuple: (states, counts)
+               - states (list): The leerfase labels, the row/column order of the matrix.
+               - counts (np.ndarray): counts[i, j] is the number of students going from states[i] to states[j].
+    """
+    states = sorted(cube['Leerfase (afk)'].dropna().unique().tolist())
+    state_index = pd.Index(states)
+
+    window = cube[
+        (cube['Schooljaar'] >= schooljaar_start) &
+        (cube['Schooljaar'] <= schooljaar_eind) &
+        cube['consecutive_1'] &
+        cube['Leerfase (afk)'].notna() &
+        cube['next_leerfase_1'].notna()
+    ]
+    source = state_index.get_indexer(window['Leerfase (afk)'])
+    target = state_index.get_indexer(window['next_leerfase_1'])
+
+    counts = np.zeros((len(states), len(states)), dtype=np.int64)
+    np.add.at(counts, (source, target), 1)
+    return states, counts
+
+
+def transition_matrix(counts):
+    """
+    Row-normalizes transition counts into probabilities.
+
+    Leerfases without observed outgoing transitions (Geslaagd, VO verlater, ...) are absorbing:
+    students stay there, so they keep being counted as having left through that state.
+
+    Args:
+        counts (np.ndarray): Transition counts with shape (..., n_states, n_states).
+
+    Returns:
+        np.ndarray: Transition probabilities with the same shape, every row summing to 1.
+    """
+    counts = np.asarray(counts, dtype=float)
+    row_totals = counts.sum(axis=-1, keepdims=True)
+    absorbing = np.broadcast_to(np.eye(counts.shape[-1]), counts.shape)
+    return np.where(row_totals > 0, counts / np.where(row_totals > 0, row_totals, 1), absorbing)
+
+
+def bootstrap_transition_matrices(counts, n_bootstrap=N_BOOTSTRAP, seed=None):
+    """
+    Resamples the observed transitions of every leerfase in one vectorized draw.
+
+    Each bootstrap matrix redraws the same number of transitions per starting leerfase from its
+    observed distribution (a multinomial per row), which is equivalent to resampling students.
+
+    Args:
+        counts (np.ndarray): Observed transition counts, shape (n_states, n_states).
+        n_bootstrap (int): Number of resamples.
+        seed (int, optional): Seed for reproducible results.
+
+    Returns:
+        np.ndarray: Bootstrap transition probabilities, shape (n_bootstrap, n_states, n_states).
+    """
+    rng = np.random.default_rng(seed)
+    row_totals = counts.sum(axis=1)
+    probabilities = transition_matrix(counts)
+    resampled = rng.multinomial(row_totals, probabilities, size=(n_bootstrap, len(row_totals)))
+    return transition_matrix(resampled)
+
+
+def cohort_sizes(cube, schooljaar):
+    """
+    Number of students per leerfase in one school year.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        schooljaar (int): The school year to count.
+
+    Returns:
+        pd.Series: Student counts indexed by 'Leerfase (afk)'.
+    """
+    return cube.loc[cube['Schooljaar'] == schooljaar, 'Leerfase (afk)'].value_counts()
+
+
+def forecast_cohorts(cube, schooljaar_start, schooljaar_eind, schooljaar_basis=None, years=FORECAST_YEARS,
+                     n_bootstrap=N_BOOTSTRAP, confidence=0.95, seed=None):
+    """
+    Projects the current cohort sizes per leerfase 1..years school years ahead with a Markov chain.
+
+    The transition matrix P is estimated from the one-year transitions in the chosen window, and the
+    counts in year k are the base counts times P^k. Bootstrap matrices give the interval; all
+    resamples and all horizons are computed at once with stacked matrix powers.
+    Only students present in the base year are projected, new instroom (e.g. in t1/hv1/v1) is not included.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        schooljaar_start (int): First school year (inclusive) used to estimate transitions.
+        schooljaar_eind (int): Last school year (inclusive) used to estimate transitions.
+        schooljaar_basis (int, optional): The school year whose counts are projected.
+                                          Defaults to the last school year in the data.
+        years (int): Number of school years to project ahead.
+        n_bootstrap (int): Number of bootstrap resamples for the interval (0 to skip).
+        confidence (float): Confidence level of the interval.
+        seed (int, optional): Seed for reproducible intervals.
+
+    Returns:
+        pd.DataFrame: One row per projected school year and leerfase with columns 'Schooljaar',
+                      'Jaren vooruit', 'Leerfase (afk)', 'Verwacht', 'Ondergrens' and 'Bovengrens'.
+    """
+    if schooljaar_basis is None:
+        schooljaar_basis = int(cube['Schooljaar'].max())
+
+    states, counts = transition_counts_matrix(cube, schooljaar_start, schooljaar_eind)
+    base_counts = cohort_sizes(cube, schooljaar_basis).reindex(states, fill_value=0).to_numpy(dtype=float)
+
+    horizons = np.arange(1, years + 1)
+    point_matrix = transition_matrix(counts)
+    point_powers = np.stack([np.linalg.matrix_power(point_matrix, k) for k in horizons])
+    expected = base_counts @ point_powers  # (years, n_states)
+
+    if n_bootstrap > 0:
+        boot_matrices = bootstrap_transition_matrices(counts, n_bootstrap=n_bootstrap, seed=seed)
+        boot_powers = np.stack([np.linalg.matrix_power(boot_matrices, k) for k in horizons], axis=1)
+        boot_projections = base_counts @ boot_powers  # (n_bootstrap, years, n_states)
+        alpha = (1 - confidence) / 2
+        lower, upper = np.quantile(boot_projections, [alpha, 1 - alpha], axis=0)
+    else:
+        lower, upper = expected, expected
+
+    return pd.DataFrame({
+        'Schooljaar': np.repeat(schooljaar_basis + horizons, len(states)),
+        'Jaren vooruit': np.repeat(horizons, len(states)),
+        'Leerfase (afk)': np.tile(states, years),
+        'Verwacht': expected.ravel(),
+        'Ondergrens': lower.ravel(),
+        'Bovengrens': upper.ravel(),
+    })
@@ -0,0 +1,62 @@
+from components.doorstroom_functions import counts_with_percentages
+from components.transition_cube import NIEUWE_INSTROOM
+
+# Order of the herkomst categories in the tables
+HERKOMST_ORDER = ['Doorstroom', 'Doublure', 'Afstroom', 'Opstroom', NIEUWE_INSTROOM, 'Other']
+
+
+def _arrivals(cube, schooljaar_start, schooljaar_eind, leerfase, tekortpunten_bucket_filter=None):
+    selection = (
+        (cube['Schooljaar'] >= schooljaar_start) &
+        (cube['Schooljaar'] <= schooljaar_eind) &
+        (cube['Leerfase (afk)'] == leerfase)
+    )
+    if tekortpunten_bucket_filter:
+        selection &= cube['Tekortpunten_Bucket'].isin(tekortpunten_bucket_filter)
+    return cube[selection]
+
+
+def inflow_tables(cube, schooljaar_start, schooljaar_eind, leerfase, tekortpunten_bucket_filter=None):
+    """
+    Where the students of a leerfase came from: the backward counterpart of the flow tables,
+    read from the herkomst columns of the transition cube.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        schooljaar_start (int): The first school year of the group.
+        schooljaar_eind (int): The last school year of the group.
+        leerfase (str): The leerfase the students are in.
+        tekortpunten_bucket_filter (list, optional): Tekortpunten buckets to include (all when empty).
+
+    Returns:
+        tuple: (per_leerfase, per_herkomst), both with 'Aantal' and 'Percentage' (see counts_with_percentages):
+               the number of students per previous leerfase ('Onbekend' for new students) and per
+               herkomst category (Doorstroom, Doublure, Afstroom, Opstroom, Nieuwe instroom).
+    """
+    arrivals = _arrivals(cube, schooljaar_start, schooljaar_eind, leerfase, tekortpunten_bucket_filter)
+
+    per_leerfase = arrivals['Vorige leerfase'].fillna('Onbekend').value_counts()
+    per_leerfase.index.name = 'Vorige leerfase'
+
+    per_herkomst = arrivals['Herkomst'].value_counts()
+    order = [herkomst for herkomst in HERKOMST_ORDER if herkomst in per_herkomst.index]
+    per_herkomst = per_herkomst.reindex(order + [h for h in per_herkomst.index if h not in order])
+    per_herkomst.index.name = 'Herkomst'
+
+    return counts_with_percentages(per_leerfase), counts_with_percentages(per_herkomst)
+
+
+def herkomst_path_counts(cube, schooljaar_start, schooljaar_eind, leerfase, tekortpunten_bucket_filter=None):
+    """
+    Counts the paths of up to three years that led to a leerfase, e.g. 'h3 -> h4 -> h5 [0-3]'.
+
+    Args:
+        Same as inflow_tables.
+
+    Returns:
+        pd.Series: Number of students per 'Herkomstpad', most frequent first.
+    """
+    arrivals = _arrivals(cube, schooljaar_start, schooljaar_eind, leerfase, tekortpunten_bucket_filter)
+    counts = arrivals['Herkomstpad'].value_counts()
+    counts.index.name = 'Herkomstpad'
+    return counts
@@ -0,0 +1,112 @@
+import pandas as pd
+
+from components.outcomes import OUTCOMES, WATERFALL_YEARS, _check_years_ahead, reached_outcomes
+from components.transition_cube import STATUS_LABELS
+
+# One-year progression that defines the group, for students that are not in an exam year
+GROUPS = {'Doorstroom': 'Bevorderd', 'Doublure': 'Doublure'}
+# Doublure is how the comparison group is defined, so it is no outcome here
+COMPARISON_OUTCOMES = [outcome for outcome in OUTCOMES if outcome != 'Doublure']
+
+
+def build_matching_index(cube, years=WATERFALL_YEARS):
+    """
+    One row per promotion decision (promoted or doublure) with the matching features and the
+    outcomes after 1..years school years, built once for all years and leerfases.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube, looking at least `years` years ahead.
+        years (int): Number of school years to follow after the decision.
+
+    Returns:
+        pd.DataFrame: 'Leerlingnummer', 'Schooljaar', 'Leerfase (afk)', 'Vorige leerfase', 'Tekortpunten',
+                      'Groep' ('Bevorderd' or 'Doublure'), and per k = 1..years a 'Gevolgd k' column
+                      (the data reaches k years after the decision) and an '<outcome> k' column per
+                      outcome in COMPARISON_OUTCOMES.
+    """
+    _check_years_ahead(cube, years)
+
+    decisions = cube[
+        cube['Progression'].isin(list(GROUPS)) &
+        ~cube['Leerfase (afk)'].isin(STATUS_LABELS) &
+        # Exam years end in Geslaagd or doublure, that is no promotion decision
+        ~cube['next_leerfase_1'].isin(STATUS_LABELS) &
+        cube['Tekortpunten'].notna()
+    ]
+    index = pd.DataFrame({
+        'Leerlingnummer': decisions['Leerlingnummer'],
+        'Schooljaar': decisions['Schooljaar'],
+        'Leerfase (afk)': decisions['Leerfase (afk)'],
+        'Vorige leerfase': decisions['Leerfase (afk) vorig schooljaar'].fillna('Onbekend'),
+        'Tekortpunten': decisions['Tekortpunten'].astype(int),
+        'Groep': decisions['Progression'].map(GROUPS),
+    })
+
+    last_schooljaar = cube['Schooljaar'].max()
+    for k, reached in reached_outcomes(cube, decisions, years):
+        index[f'Gevolgd {k}'] = decisions['Schooljaar'] + k <= last_schooljaar
+        for outcome in COMPARISON_OUTCOMES:
+            index[f'{outcome} {k}'] = reached[outcome]
+    return index.reset_index(drop=True)
+
+
+def matched_comparison(index, leerfase, schooljaar_start, schooljaar_eind, horizon=3, min_tekortpunten=0,
+                       tekortpunten_width=1):
+    """
+    Compares promoted students with doublanten of the same leerfase, matched on their previous
+    leerfase and their tekortpunten (stratified matching).
+
+    Students are grouped in strata of equal previous leerfase and tekortpunten (in steps of
+    tekortpunten_width). Only strata with students in both groups are kept, and the doublure
+    rates are weighted by the number of promoted students per stratum. The difference is then
+    the effect of promoting compared to similar students who repeated the year.
+
+    Args:
+        index (pd.DataFrame): Output of build_matching_index.
+        leerfase (str): The 'Leerfase (afk)' in which the decision was made.
+        schooljaar_start (int): The first decision year (inclusive).
+        schooljaar_eind (int): The last decision year (inclusive).
+        horizon (int): Outcomes within this many school years after the decision.
+        min_tekortpunten (int): Only students with at least this many tekortpunten (the 'at risk' group).
+        tekortpunten_width (int): Width of the tekortpunten strata (1 matches exactly).
+
+    Returns:
+        tuple: (summary, strata)
+               - summary (pd.DataFrame): per outcome the matched rates of both groups, the difference
+                 and the unmatched rates; empty when no stratum has both groups.
+               - strata (pd.DataFrame): number of students per stratum and group.
+    """
+    selection = index[
+        (index['Leerfase (afk)'] == leerfase) &
+        (index['Schooljaar'] >= schooljaar_start) &
+        (index['Schooljaar'] <= schooljaar_eind) &
+        (index['Tekortpunten'] >= min_tekortpunten) &
+        index[f'Gevolgd {horizon}']
+    ].assign(Stratum=lambda frame: frame['Tekortpunten'] // tekortpunten_width * tekortpunten_width)
+
+    strata_keys = ['Vorige leerfase', 'Stratum']
+    outcome_columns = [f'{outcome} {horizon}' for outcome in COMPARISON_OUTCOMES]
+
+    strata = selection.groupby(strata_keys + ['Groep']).size().unstack('Groep', fill_value=0)
+    strata = strata.reindex(columns=list(GROUPS.values()), fill_value=0)
+    strata['Gematcht'] = (strata['Bevorderd'] > 0) & (strata['Doublure'] > 0)
+    strata = strata.rename_axis(index={'Stratum': 'Tekortpunten vanaf'}, columns=None)
+
+    matched = strata[strata['Gematcht']]
+    if matched.empty:
+        return pd.DataFrame(), strata.reset_index()
+
+    rates = selection.groupby(strata_keys + ['Groep'])[outcome_columns].mean().unstack('Groep')
+    rates = rates.rename_axis(index={'Stratum': 'Tekortpunten vanaf'}).loc[matched.index]
+    weights = matched['Bevorderd'] / matched['Bevorderd'].sum()
+
+    summary = pd.DataFrame(index=pd.Index(COMPARISON_OUTCOMES, name='Uitkomst'))
+    summary['Bevorderd (%)'] = [(rates[(column, 'Bevorderd')] * weights).sum() * 100 for column in outcome_columns]
+    summary['Doublure, gematcht (%)'] = [(rates[(column, 'Doublure')] * weights).sum() * 100
+                                         for column in outcome_columns]
+    summary['Verschil (%-punt)'] = summary['Bevorderd (%)'] - summary['Doublure, gematcht (%)']
+
+    unmatched = selection.groupby('Groep')[outcome_columns].mean().reindex(list(GROUPS.values())) * 100
+    summary['Bevorderd, alle (%)'] = unmatched.loc['Bevorderd'].to_numpy()
+    summary['Doublure, alle (%)'] = unmatched.loc['Doublure'].to_numpy()
+    return summary.round(1), strata.reset_index()
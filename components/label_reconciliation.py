@@ -0,0 +1,94 @@
+import pandas as pd
+
+from components.doorstroom_functions import SOURCE_LABEL_CATEGORIES
+
+NO_LABEL = 'Geen label'
+# The option on the analysis pages that switches to the source-first view (use_source_label)
+SOURCE_LABEL_OPTION = "Doorstroom-label uit de bron gebruiken"
+SOURCE_LABEL_HELP = ("Telt het Doorstroom-label uit de bron voor de berekende overgang, als dat label een categorie "
+                     "heeft. Het label wijkt vaak af (bijv. h4 naar MBO als Doorstroom); zie de afwijkingen op "
+                     "pagina 9.")
+
+
+def build_label_reconciliation(cube):
+    """
+    Compares the source 'Doorstroom' label with the computed classification (classify_progression)
+    for every one-year transition at once. The analyses use the computed 'Progression'; with
+    use_source_label they take the source label first (see reconciled_progression), and this shows
+    where and for which transitions the two views differ.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+
+    Returns:
+        dict: With keys
+              - 'confusion' (pd.DataFrame): number of transitions per source label (rows, NO_LABEL when
+                missing) and computed category (columns),
+              - 'per_label' (pd.DataFrame): per source label its category ('Categorie', None for labels that
+                are classified from the leerfases), 'Aantal', 'Akkoord', 'Afwijkend' and 'Akkoord (%)',
+              - 'disagreements' (pd.DataFrame): the transitions whose trusted source label differs from the
+                computed category, indexed by ('Bronlabel', 'Berekend') for a direct lookup per cell,
+              - 'per_transition' (pd.DataFrame): the number of disagreements per 'Leerfase (afk)',
+                'Volgende leerfase', 'Bronlabel' and 'Berekend' (e.g. h4 -> MBO labelled Doorstroom),
+                most frequent first,
+              - 'disagreement_flags' (pd.Series): True per cube row with such a disagreement.
+    """
+    transitions = cube[cube['consecutive_1']]
+    source_label = transitions['Doorstroom'].fillna(NO_LABEL)
+    source_category = source_label.map(SOURCE_LABEL_CATEGORIES)
+    computed = transitions['Progression']
+
+    confusion = pd.crosstab(source_label.rename('Bronlabel'), computed.rename('Berekend'))
+
+    compared = source_category.notna()
+    agrees = compared & (source_category == computed)
+    disagrees = compared & ~agrees
+    per_label = pd.DataFrame({
+        'Aantal': source_label.value_counts(),
+        'Akkoord': agrees.groupby(source_label).sum(),
+        'Afwijkend': disagrees.groupby(source_label).sum(),
+    })
+    per_label.insert(0, 'Categorie', per_label.index.map(SOURCE_LABEL_CATEGORIES))
+    per_label['Akkoord (%)'] = (per_label['Akkoord'] / per_label['Aantal'] * 100).round(1).where(
+        per_label['Categorie'].notna())
+    per_label.index.name = 'Bronlabel'
+
+    disagreements = pd.DataFrame({
+        'Bronlabel': source_label[disagrees],
+        'Berekend': computed[disagrees],
+        'Leerlingnummer': transitions.loc[disagrees, 'Leerlingnummer'],
+        'Schooljaar': transitions.loc[disagrees, 'Schooljaar'],
+        'Leerfase (afk)': transitions.loc[disagrees, 'Leerfase (afk)'],
+        'Volgende leerfase': transitions.loc[disagrees, 'next_leerfase_1'],
+    }).set_index(['Bronlabel', 'Berekend']).sort_index()
+
+    per_transition = (
+        disagreements.reset_index()
+        .groupby(['Leerfase (afk)', 'Volgende leerfase', 'Bronlabel', 'Berekend'])
+        .size().rename('Aantal').reset_index()
+        .sort_values('Aantal', ascending=False, kind='stable')
+        .reset_index(drop=True)
+    )
+
+    return {
+        'confusion': confusion,
+        'per_label': per_label.sort_values('Aantal', ascending=False),
+        'disagreements': disagreements,
+        'per_transition': per_transition,
+        'disagreement_flags': disagrees.reindex(cube.index, fill_value=False),
+    }
+
+
+def disagreements_for_students(reconciliation, leerlingnummers):
+    """
+    The disagreements of a group of students, looked up in the precomputed reconciliation.
+
+    Args:
+        reconciliation (dict): Output of build_label_reconciliation.
+        leerlingnummers (list): The students of the group.
+
+    Returns:
+        pd.DataFrame: The rows of 'disagreements' of these students, with 'Bronlabel' and 'Berekend' as columns.
+    """
+    disagreements = reconciliation['disagreements']
+    return disagreements[disagreements['Leerlingnummer'].isin(leerlingnummers)].reset_index()
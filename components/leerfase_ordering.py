@@ -0,0 +1,110 @@
+import tomllib
+import os
+import numpy as np
+import pandas as pd
+
+ORDERING_FILE_PATH = os.path.join(os.path.dirname(__file__), 'leerfase_ordering.toml')
+# The highest leerjaar compiled into the lookup for every prefix
+MAX_LEERJAAR = 9
+
+
+def load_ordering_rules(file_path=ORDERING_FILE_PATH):
+    """
+    Reads the leerfase ordering rules from the TOML config.
+
+    Args:
+        file_path (str): Path to the config (defaults to components/leerfase_ordering.toml).
+
+    Returns:
+        dict: With keys 'statuses' and 'codes' (code -> value), 'prefixes' (prefix -> offset,
+              longest prefix first) and 'strip_suffixes' (list).
+    """
+    with open(file_path, 'rb') as f:
+        config = tomllib.load(f)
+
+    prefixes = config.get('prefixes', {})
+    return {
+        'statuses': {code: float(value) for code, value in config.get('statuses', {}).items()},
+        'codes': {code: float(value) for code, value in config.get('codes', {}).items()},
+        'prefixes': {prefix: float(prefixes[prefix]) for prefix in sorted(prefixes, key=len, reverse=True)},
+        'strip_suffixes': config.get('options', {}).get('strip_suffixes', []),
+    }
+
+
+def leerfase_numeric_value(leerfase_str, rules):
+    """
+    Applies the ordering rules to a single 'Leerfase (afk)' code.
+
+    Args:
+        leerfase_str (str): The 'Leerfase (afk)' string.
+        rules (dict): Output of load_ordering_rules.
+
+    Returns:
+        float: The numeric value of the leerfase, or np.nan if no rule matches.
+    """
+    if pd.isna(leerfase_str):
+        return np.nan
+
+    leerfase_str = str(leerfase_str).strip()
+    if leerfase_str in rules['statuses']:
+        return rules['statuses'][leerfase_str]
+
+    for suffix in rules['strip_suffixes']:
+        leerfase_str = leerfase_str.replace(suffix, '')
+
+    if leerfase_str in rules['codes']:
+        return rules['codes'][leerfase_str]
+
+    for prefix, offset in rules['prefixes'].items():
+        if leerfase_str.startswith(prefix) and leerfase_str[len(prefix):].isdigit():
+            return offset + int(leerfase_str[len(prefix):])
+
+    return np.nan
+
+
+def compile_leerfase_lookup(rules, max_leerjaar=MAX_LEERJAAR):
+    """
+    Compiles the rules once into a table of every code they rank: the statuses, the explicit codes and
+    every prefix with leerjaar 1 to max_leerjaar, each also with the strip suffixes (e.g. h4_doublure).
+    A column of codes is then classified with one index lookup instead of evaluating the rules per code.
+
+    Args:
+        rules (dict): Output of load_ordering_rules.
+        max_leerjaar (int): The highest leerjaar compiled for every prefix.
+
+    Returns:
+        pd.Series: The numeric value (NaN where no rule matches) indexed by code.
+    """
+    codes = list(rules['statuses']) + list(rules['codes'])
+    codes += [f'{prefix}{leerjaar}' for prefix in rules['prefixes'] for leerjaar in range(1, max_leerjaar + 1)]
+    codes += [code + suffix for code in codes for suffix in rules['strip_suffixes']]
+    codes = list(dict.fromkeys(codes))
+    return pd.Series([leerfase_numeric_value(code, rules) for code in codes], index=codes, dtype=float)
+
+
+def numeric_values(leerfase, lookup, rules):
+    """
+    Looks up the numeric value of every code in a column.
+
+    Args:
+        leerfase (pd.Series): Column of 'Leerfase (afk)' codes.
+        lookup (pd.Series): Output of compile_leerfase_lookup.
+        rules (dict): The rules the lookup was compiled from, applied to the few codes outside the
+                      table (e.g. MBO or a leerjaar above max_leerjaar), once per unique code.
+
+    Returns:
+        np.ndarray: Float values, NaN for unknown or missing codes.
+    """
+    positions = lookup.index.get_indexer(leerfase)
+    values = lookup.to_numpy()[positions]
+    outside = (positions < 0) & leerfase.notna().to_numpy()
+    values[positions < 0] = np.nan
+    if outside.any():
+        codes = leerfase[outside]
+        values[outside] = codes.map({code: leerfase_numeric_value(code, rules) for code in codes.unique()}).to_numpy(float)
+    return values
+
+
+LEERFASE_ORDERING = load_ordering_rules()
+# Compiled once with the rules; a changed TOML file takes effect after a restart
+LEERFASE_LOOKUP = compile_leerfase_lookup(LEERFASE_ORDERING)
@@ -0,0 +1,265 @@
+"""
+Process-wide metrics of the caches and analyses, to size the servers from data:
+cache hits, misses and evictions, entry counts and sizes, the memory of the loaded dataset and
+a latency histogram per analysis function.
+
+The metrics are shown on the page 'Beheer_metrics' (no card on the start page) and, when
+DOORSTROOM_METRICS_PORT is set, served as Prometheus text on http://<host>:<port>/metrics.
+Functions cached with st.cache_data are only counted and timed when they are wrapped with
+instrumented_cache; Streamlit's own /_stcore/metrics reports nothing but their memory.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+METRICS_PORT_ENV_VAR = 'DOORSTROOM_METRICS_PORT'
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CACHE_EVENTS = ['hit', 'miss', 'eviction']
+
+_lock = threading.Lock()
+_cache_events = defaultdict(int)
+_latencies = {}
+_size_providers = {}
+_server = None
+_serve_attempted = False
+# Per thread: whether the body of the innermost instrumented_cache call ran
+_computing = threading.local()
+
+
+def count(cache, event, n=1):
+    """
+    Counts a cache event.
+
+    Args:
+        cache (str): Name of the cache (e.g. 'analysis_results').
+        event (str): One of CACHE_EVENTS.
+        n (int): Number of events.
+    """
+    with _lock:
+        _cache_events[(cache, event)] += n
+
+
+def observe(function, seconds):
+    """Adds one call of `function` that took `seconds` to its latency histogram."""
+    with _lock:
+        histogram = _latencies.setdefault(function, {'buckets': [0] * len(LATENCY_BUCKETS), 'sum': 0.0, 'count': 0})
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                histogram['buckets'][i] += 1
+        histogram['sum'] += seconds
+        histogram['count'] += 1
+
+
+@contextmanager
+def timed(function):
+    """Context manager that observes the duration of its block (also when it raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(function, time.perf_counter() - start)
+
+
+def instrumented_cache(cache_decorator, name=None):
+    """
+    Wraps a memoizing decorator such as st.cache_data so its hits and misses are counted and the
+    misses (the calls that run the body) are timed:
+
+        @instrumented_cache(st.cache_data)
+        def cached_forecast(...):
+
+    Args:
+        cache_decorator (callable): The caching decorator, e.g. st.cache_data or st.cache_data(ttl=600).
+        name (str, optional): Name of the cache and the function in the metrics (defaults to the function name).
+
+    Returns:
+        callable: The decorator for the function.
+    """
+    def decorate(function):
+        cache = name or function.__qualname__
+
+        @functools.wraps(function)
+        def compute(*args, **kwargs):
+            _computing.ran = True
+            with timed(cache):
+                return function(*args, **kwargs)
+
+        cached = cache_decorator(compute)
+
+        @functools.wraps(function)
+        def lookup(*args, **kwargs):
+            outer = getattr(_computing, 'ran', None)
+            _computing.ran = False
+            try:
+                result = cached(*args, **kwargs)
+                count(cache, 'miss' if _computing.ran else 'hit')
+                return result
+            finally:
+                # A cached function called from the body of another one
+                _computing.ran = outer
+
+        lookup.clear = getattr(cached, 'clear', None)
+        return lookup
+
+    return decorate
+
+
+def register_size(cache, provider):
+    """
+    Registers how to measure a cache.
+
+    Args:
+        cache (str): Name of the cache.
+        provider (callable): Returns (number of entries, size in bytes) when called.
+    """
+    _size_providers[cache] = provider
+
+
+def size_of(value):
+    """Approximate memory in bytes of a result: deep for DataFrames and Series, recursive for containers."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(k) + size_of(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def cache_table():
+    """
+    Returns:
+        pd.DataFrame: Per cache the hits, misses, hit rate (%), evictions, entries and size in bytes.
+    """
+    with _lock:
+        events = dict(_cache_events)
+    caches = sorted({cache for cache, _ in events} | set(_size_providers))
+
+    rows = []
+    for cache in caches:
+        hits, misses = events.get((cache, 'hit'), 0), events.get((cache, 'miss'), 0)
+        entries, size = _size_providers[cache]() if cache in _size_providers else (None, None)
+        rows.append((cache, hits, misses, round(hits / (hits + misses) * 100, 1) if hits + misses else None,
+                     events.get((cache, 'eviction'), 0), entries, size))
+    table = pd.DataFrame(rows, columns=['Cache', 'Hits', 'Misses', 'Hit rate (%)', 'Evictions', 'Entries', 'Bytes'])
+    return table.astype({'Entries': 'Int64', 'Bytes': 'Int64'})
+
+
+def _latency_snapshot():
+    with _lock:
+        return {function: dict(histogram, buckets=list(histogram['buckets']))
+                for function, histogram in _latencies.items()}
+
+
+def latency_table():
+    """
+    Returns:
+        pd.DataFrame: Per function the number of calls, the mean and total duration in seconds and
+                      the cumulative number of calls per histogram bucket ('<= bound').
+    """
+    latencies = _latency_snapshot()
+
+    rows = []
+    for function, histogram in sorted(latencies.items()):
+        rows.append([function, histogram['count'], round(histogram['sum'] / histogram['count'], 4),
+                     round(histogram['sum'], 3)] + histogram['buckets'])
+    columns = ['Functie', 'Aanroepen', 'Gemiddeld (s)', 'Totaal (s)'] + [f'<= {bound}' for bound in LATENCY_BUCKETS]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text():
+    """
+    All metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: The metrics, one sample per line.
+    """
+    lines = ['# HELP doorstroom_cache_requests_total Cache lookups by result.',
+             '# TYPE doorstroom_cache_requests_total counter']
+    caches = cache_table()
+    for row in caches.itertuples(index=False):
+        lines.append(f'doorstroom_cache_requests_total{{cache="{_label(row.Cache)}",result="hit"}} {row.Hits}')
+        lines.append(f'doorstroom_cache_requests_total{{cache="{_label(row.Cache)}",result="miss"}} {row.Misses}')
+
+    lines += ['# HELP doorstroom_cache_evictions_total Entries dropped to stay within the cache size.',
+              '# TYPE doorstroom_cache_evictions_total counter']
+    lines += [f'doorstroom_cache_evictions_total{{cache="{_label(row.Cache)}"}} {row.Evictions}'
+              for row in caches.itertuples(index=False)]
+
+    measured = caches[caches['Entries'].notna()]
+    lines += ['# HELP doorstroom_cache_entries Entries in the cache.', '# TYPE doorstroom_cache_entries gauge']
+    lines += [f'doorstroom_cache_entries{{cache="{_label(row.Cache)}"}} {int(row.Entries)}'
+              for row in measured.itertuples(index=False)]
+    lines += ['# HELP doorstroom_cache_bytes Approximate memory of the cache.', '# TYPE doorstroom_cache_bytes gauge']
+    lines += [f'doorstroom_cache_bytes{{cache="{_label(row.Cache)}"}} {int(row.Bytes)}'
+              for row in measured.itertuples(index=False)]
+
+    lines += ['# HELP doorstroom_function_seconds Duration of the analyses.',
+              '# TYPE doorstroom_function_seconds histogram']
+    latencies = _latency_snapshot()
+    for function, histogram in sorted(latencies.items()):
+        name = _label(function)
+        for bound, n in zip(LATENCY_BUCKETS, histogram['buckets']):
+            lines.append(f'doorstroom_function_seconds_bucket{{function="{name}",le="{bound}"}} {n}')
+        lines.append(f'doorstroom_function_seconds_bucket{{function="{name}",le="+Inf"}} {histogram["count"]}')
+        lines.append(f'doorstroom_function_seconds_sum{{function="{name}"}} {histogram["sum"]:.6f}')
+        lines.append(f'doorstroom_function_seconds_count{{function="{name}"}} {histogram["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        body = prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port, host='127.0.0.1'):
+    """
+    Serves prometheus_text() on http://host:port/metrics from a daemon thread, once per process.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+    return _server
+
+
+def serve_metrics_from_env():
+    """Starts the metrics endpoint when DOORSTROOM_METRICS_PORT is set; a no-op otherwise."""
+    global _serve_attempted
+    port = os.environ.get(METRICS_PORT_ENV_VAR)
+    if port and not _serve_attempted:
+        _serve_attempted = True
+        try:
+            serve_metrics(port)
+        except OSError:
+            # Another server process already serves the metrics on this port
+            pass
@@ -0,0 +1,99 @@
+import pandas as pd
+import numpy as np
+
+from components.transition_cube import STATUS_LABELS
+
+OUTCOMES = ['Geslaagd', 'Doublure', 'Afstroom', 'MBO', 'VO verlater']
+WATERFALL_YEARS = 5
+
+
+def reached_outcomes(cube, starts, years=WATERFALL_YEARS):
+    """
+    Follows the path of every starting row year by year while the years are consecutive:
+        - Geslaagd, MBO, VO verlater: that label is reached.
+        - Doublure: a step that the cube's 'Progression' classifies as Doublure (a year is repeated).
+        - Afstroom: a step classified as Afstroom (a lower level, or the Afstroom/Afgewezen label).
+
+    The steps use the 'Progression' of the student's row in the year the step starts, so the outcomes
+    agree with the one-year tables.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube, looking at least `years` years ahead.
+        starts (pd.DataFrame): Rows of the cube (with their cube index) to follow.
+        years (int): Number of school years to follow.
+
+    Yields:
+        tuple: (k, reached) for k = 1..years, with reached a boolean DataFrame (one column per
+               outcome, aligned with starts) that is True when the outcome occurred within k years.
+    """
+    reached = pd.DataFrame(False, index=starts.index, columns=OUTCOMES)
+    for k in range(1, years + 1):
+        current = starts[f'next_leerfase_{k}'].where(starts[f'consecutive_{k}'])
+        # The row k - 1 years later belongs to the same student while the years are consecutive
+        step = cube['Progression'].shift(-(k - 1)).reindex(starts.index).where(starts[f'consecutive_{k}'])
+
+        reached['Geslaagd'] |= current == 'Geslaagd'
+        reached['MBO'] |= current == 'MBO'
+        reached['VO verlater'] |= current == 'VO verlater'
+        reached['Doublure'] |= step == 'Doublure'
+        reached['Afstroom'] |= (step == 'Afstroom') & (current != 'VO verlater')
+        yield k, reached.copy()
+
+
+def _check_years_ahead(cube, years):
+    if f'next_leerfase_{years}' not in cube.columns:
+        raise ValueError(f"The transition cube looks fewer than {years} years ahead, "
+                         f"build it with build_transition_cube(df, years_ahead={years})")
+
+
+def build_outcome_waterfall(cube, years=WATERFALL_YEARS):
+    """
+    Cumulative outcomes of every instroom cohort (leerfase x schooljaar) within 1..years school years,
+    computed for all cohorts at once.
+
+    The outcomes are those of reached_outcomes.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube, looking at least `years` years ahead.
+        years (int): Number of school years to follow each cohort.
+
+    Returns:
+        pd.DataFrame: One row per cohort and number of years with 'Schooljaar', 'Leerfase (afk)',
+                      'Jaren', 'Aantal' (cohort size) and a cumulative percentage per outcome
+                      ('<outcome> (%)'), NaN when the data does not reach that far yet.
+    """
+    _check_years_ahead(cube, years)
+
+    starts = cube[cube['Leerfase (afk)'].notna() & ~cube['Leerfase (afk)'].isin(STATUS_LABELS)]
+    keys = [starts['Schooljaar'], starts['Leerfase (afk)']]
+    cohort_sizes = starts.groupby(keys).size()
+    last_schooljaar = cube['Schooljaar'].max()
+
+    tables = []
+    for k, reached in reached_outcomes(cube, starts, years):
+        shares = reached.groupby(keys).sum().div(cohort_sizes, axis=0).mul(100).round(1)
+        shares.columns = [f'{outcome} (%)' for outcome in OUTCOMES]
+        table = pd.concat([cohort_sizes.rename('Aantal'), shares], axis=1).reset_index()
+        table.insert(2, 'Jaren', k)
+        # Not observed yet: the cohort year plus k lies beyond the data
+        table.loc[table['Schooljaar'] + k > last_schooljaar, shares.columns] = np.nan
+        tables.append(table)
+
+    return pd.concat(tables, ignore_index=True).sort_values(['Leerfase (afk)', 'Schooljaar', 'Jaren'],
+                                                            ignore_index=True)
+
+
+def cohort_waterfall(waterfall, leerfase, schooljaar):
+    """
+    The cumulative outcome percentages of one cohort, per number of years.
+
+    Args:
+        waterfall (pd.DataFrame): Output of build_outcome_waterfall.
+        leerfase (str): The 'Leerfase (afk)' of the cohort.
+        schooljaar (int): The instroom year of the cohort.
+
+    Returns:
+        pd.DataFrame: Indexed by 'Jaren', one column per outcome.
+    """
+    cohort = waterfall[(waterfall['Leerfase (afk)'] == leerfase) & (waterfall['Schooljaar'] == schooljaar)]
+    return cohort.set_index('Jaren')[[f'{outcome} (%)' for outcome in OUTCOMES]]
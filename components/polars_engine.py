@@ -0,0 +1,195 @@
+"""
+Polars LazyFrame implementation of the flow queries (needs the optional 'polars' package).
+
+Same API and results as one_year_flow_table and three_year_flow_counts in
+components/transition_cube.py; the three-year counts are a pandas Series, so counts_with_percentages
+and prepare_sankey_data apply unchanged.
+Queries are built lazily, so Polars optimizes the whole plan and runs it on all cores. Select it
+with DOORSTROOM_ENGINE=polars (see components/engines.py).
+"""
+import pandas as pd
+
+from components.doorstroom_functions import (
+    AFSTROOM_STATUSES,
+    SOURCE_LABEL_CATEGORIES,
+    _get_leerfase_numeric_value,
+    _progression_counts_table,
+)
+from components.transition_cube import YEARS_AHEAD
+
+
+def _polars():
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError("The Polars engine needs the optional 'polars' package: pip install polars") from e
+    return pl
+
+
+def lazy_dataset(df):
+    """
+    Converts the prepared dataset into a Polars LazyFrame with the leerfase ordering resolved once per code.
+
+    Args:
+        df (pd.DataFrame): The prepared dataset (see read_dataset).
+
+    Returns:
+        pl.LazyFrame: 'Leerlingnummer', 'Schooljaar', 'Leerfase (afk)', 'Tekortpunten', 'Doorstroom',
+                      'Tekortpunten_Bucket' (as string), 'Niveau' (ordering value of the code) and 'Niveau_clean' (of the code
+                      without '_doublure'), null where the ordering has no value.
+    """
+    pl = _polars()
+
+    data = df[['Leerlingnummer', 'Schooljaar', 'Leerfase (afk)', 'Tekortpunten', 'Doorstroom']].copy()
+    # Same string as astype(str) in _add_transition_paths, also for a missing bucket
+    data['Tekortpunten_Bucket'] = df['Tekortpunten_Bucket'].astype(str)
+
+    codes = data['Leerfase (afk)'].dropna().unique()
+    levels = {code: _get_leerfase_numeric_value(code) for code in codes}
+    clean_levels = {code: _get_leerfase_numeric_value(code.replace('_doublure', '')) for code in codes}
+    data['Niveau'] = data['Leerfase (afk)'].map(levels)
+    data['Niveau_clean'] = data['Leerfase (afk)'].map(clean_levels)
+    return pl.from_pandas(data, nan_to_null=True).lazy()
+
+
+def _cohort(lazy_frame, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter,
+            bucket_filter_on_rows):
+    """
+    Starting rows with their next leerfases and school years.
+
+    A filter cannot be moved below the per-student shift, so the starting students are selected
+    first and the shift only runs over their rows.
+    """
+    pl = _polars()
+
+    starting = pl.col('Schooljaar').is_between(schooljaar_start, schooljaar_eind) & \
+        (pl.col('Leerfase (afk)') == leerfase_start)
+    if tekortpunten_bucket_filter:
+        in_buckets = pl.col('Tekortpunten_Bucket').is_in([str(bucket) for bucket in tekortpunten_bucket_filter])
+        students = lazy_frame.filter(starting & in_buckets).select('Leerlingnummer').unique()
+        if bucket_filter_on_rows:
+            starting = starting & in_buckets
+    else:
+        students = lazy_frame.filter(starting).select('Leerlingnummer').unique()
+
+    next_columns = [pl.col('Niveau_clean').shift(-1).over('Leerlingnummer').alias('next_niveau_1')]
+    for k in range(1, YEARS_AHEAD + 1):
+        next_columns.append(pl.col('Leerfase (afk)').shift(-k).over('Leerlingnummer').alias(f'next_leerfase_{k}'))
+        next_columns.append(pl.col('Schooljaar').shift(-k).over('Leerlingnummer').alias(f'next_schooljaar_{k}'))
+
+    return (
+        lazy_frame
+        .join(students, on='Leerlingnummer', how='semi')
+        .sort(['Leerlingnummer', 'Schooljaar'])
+        .with_columns(next_columns)
+        .filter(starting)
+    )
+
+
+def _progression_expression(use_source_label=False):
+    """
+    classify_progression as a Polars expression, with the same priority; with use_source_label the
+    trusted source label comes first, as in reconciled_progression.
+    """
+    pl = _polars()
+
+    expression = pl
+    if use_source_label:
+        source_label = pl.col('Doorstroom')
+        expression = (pl.when(source_label.is_in(list(SOURCE_LABEL_CATEGORIES)))
+                      .then(source_label.replace(SOURCE_LABEL_CATEGORIES)))
+
+    next_leerfase = pl.col('next_leerfase_1')
+    next_clean = next_leerfase.str.replace_all('_doublure', '', literal=True)
+    current_clean = pl.col('Leerfase (afk)').str.replace_all('_doublure', '', literal=True)
+    return (
+        expression.when(next_leerfase.is_null()).then(pl.lit('No Data (Dropout/Missing)'))
+        .when(next_leerfase.str.contains('_doublure', literal=True) & (next_clean == current_clean))
+        .then(pl.lit('Doublure'))
+        .when(next_clean == 'Geslaagd').then(pl.lit('Doorstroom'))
+        .when(next_clean.is_in(AFSTROOM_STATUSES)).then(pl.lit('Afstroom'))
+        .when(pl.col('Niveau').is_null() | pl.col('next_niveau_1').is_null()).then(pl.lit('Other'))
+        .when(pl.col('next_niveau_1') > pl.col('Niveau')).then(pl.lit('Doorstroom'))
+        .when(pl.col('next_niveau_1') < pl.col('Niveau')).then(pl.lit('Afstroom'))
+        .otherwise(pl.lit('Other'))
+        .alias('Progression')
+    )
+
+
+def _counts_series(counts, key):
+    return pd.Series(counts['count'].to_list(), index=pd.Index(counts[key].to_list(), name=key),
+                     name='count', dtype='int64')
+
+
+def one_year_flow_table(lazy_frame, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None,
+                        use_source_label=False):
+    """
+    Same table as transition_cube.one_year_flow_table, computed with Polars.
+
+    Args:
+        lazy_frame (pl.LazyFrame): Output of lazy_dataset.
+        schooljaar_start (int): The starting school year (inclusive) for the analysis.
+        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
+        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
+        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
+                                                   Defaults to None (all buckets).
+        use_source_label (bool): Take the source 'Doorstroom' label first (see reconciled_progression).
+
+    Returns:
+        pd.DataFrame: 'Aantallen' and 'Percentage' per progression category
+                      (empty with those columns if no students match the criteria).
+    """
+    pl = _polars()
+
+    counts = (
+        _cohort(lazy_frame, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter,
+                bucket_filter_on_rows=False)
+        .filter(pl.col('next_schooljaar_1') == pl.col('Schooljaar') + 1)
+        .select(_progression_expression(use_source_label))
+        .group_by('Progression')
+        .agg(pl.len().alias('count'))
+        .collect()
+    )
+    if counts.height == 0:
+        return pd.DataFrame(columns=['Aantallen', 'Percentage'])
+    return _progression_counts_table(_counts_series(counts, 'Progression'))
+
+
+def three_year_flow_counts(lazy_frame, schooljaar_start, schooljaar_eind, leerfase_start,
+                           tekortpunten_bucket_filter=None):
+    """
+    Same counts as transition_cube.three_year_flow_counts, computed with Polars.
+
+    Args:
+        lazy_frame (pl.LazyFrame): Output of lazy_dataset.
+        schooljaar_start (int): The starting school year (inclusive) for the analysis.
+        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
+        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
+        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
+                                                   Defaults to None (all buckets).
+
+    Returns:
+        pd.Series: A Series with three-year transition strings as index and counts as values.
+    """
+    pl = _polars()
+
+    parts = [pl.col('Leerfase (afk)'), pl.lit(' ['), pl.col('Tekortpunten_Bucket'), pl.lit(']')]
+    consecutive = pl.lit(True)
+    for k in range(1, YEARS_AHEAD + 1):
+        next_leerfase = pl.col(f'next_leerfase_{k}')
+        consecutive = consecutive & (pl.col(f'next_schooljaar_{k}') == pl.col('Schooljaar') + k)
+        step = consecutive & next_leerfase.is_not_null() & (next_leerfase != 'Doorstroom')
+        parts.append(pl.when(step).then(pl.lit(' -> ') + next_leerfase).otherwise(pl.lit('')))
+
+    counts = (
+        _cohort(lazy_frame, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter,
+                bucket_filter_on_rows=True)
+        .select(pl.concat_str(parts).alias('Transition'))
+        .group_by('Transition')
+        .agg(pl.len().alias('count'))
+        .sort(['count', 'Transition'], descending=[True, False])
+        .collect()
+    )
+    if counts.height == 0:
+        return pd.Series([], dtype=int)
+    return _counts_series(counts, 'Transition')
@@ -0,0 +1,225 @@
+import pandas as pd
+import numpy as np
+
+from components.outcomes import OUTCOMES, WATERFALL_YEARS
+from components.transition_cube import STATUS_LABELS, TEKORTPUNTEN_BINS
+
+SIMULATION_YEARS = WATERFALL_YEARS
+N_TRAJECTORIES = 100_000
+# Next state of a student without a next school year in the data
+UITSTROOM = 'Uitstroom'
+SIMULATION_OUTCOMES = OUTCOMES + [UITSTROOM]
+BEVORDERD, NIET_BEVORDERD = 1, 2
+
+
+def _bucket_codes(tekortpunten, n_buckets):
+    # Bucket of TEKORTPUNTEN_BINS per value, n_buckets for a missing value
+    codes = pd.cut(tekortpunten, bins=TEKORTPUNTEN_BINS, labels=False, right=True, include_lowest=True)
+    return np.where(np.isnan(codes), n_buckets, codes).astype(np.int64)
+
+
+def _pool(keys, member, n_keys):
+    """The member rows grouped by key: (rows sorted by key, first position per key, rows per key)."""
+    rows = np.flatnonzero(member)
+    rows = rows[np.argsort(keys[rows], kind='stable')]
+    size = np.bincount(keys[rows], minlength=n_keys)
+    start = np.concatenate([[0], np.cumsum(size)[:-1]])
+    return rows, start, size
+
+
+def _draw(pool, keys, rng):
+    """One uniformly drawn pool row per key, -1 where the pool has no row for the key."""
+    rows, start, size = pool
+    offset = np.floor(rng.random(len(keys)) * size[keys]).astype(np.int64)
+    drawn = np.full(len(keys), -1, dtype=np.int64)
+    found = size[keys] > 0
+    drawn[found] = rows[start[keys[found]] + offset[found]]
+    return drawn
+
+
+def transition_pools(cube, schooljaar_start, schooljaar_eind):
+    """
+    The observed one-year transitions of a school year window, grouped for vectorized sampling by
+    leerfase and tekortpunten bucket, and by leerfase alone as a fallback for empty buckets.
+
+    Transitions into a next class are 'bevorderd'; a doublure or a step down to a lower class is
+    'niet bevorderd'. Other transitions (exam results, leaving school) are no promotion decision.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        schooljaar_start (int): First starting school year (inclusive) of the window.
+        schooljaar_eind (int): Last starting school year (inclusive) of the window.
+
+    Returns:
+        dict: With keys
+              - 'states' (pd.Index): the leerfases, including UITSTROOM,
+              - 'terminal' (np.ndarray): per state, True when the simulation stops there,
+              - 'next_state', 'next_tekortpunten', 'progression', 'decision' (np.ndarray): per transition,
+              - 'pools' (dict): (level, decision) -> pool for _draw, level 'bucket' or 'leerfase' and
+                decision None (all transitions), BEVORDERD or NIET_BEVORDERD.
+    """
+    # The last school year has no next year yet, its students did not leave
+    last_schooljaar = cube['Schooljaar'].max()
+    next_tekortpunten = cube['Tekortpunten'].shift(-1).where(cube['consecutive_1'])
+    window = (
+        (cube['Schooljaar'] >= schooljaar_start) &
+        (cube['Schooljaar'] <= schooljaar_eind) &
+        (cube['Schooljaar'] < last_schooljaar) &
+        cube['Leerfase (afk)'].notna()
+    )
+    transitions = cube[window]
+    next_leerfase = transitions['next_leerfase_1'].where(transitions['consecutive_1']).fillna(UITSTROOM)
+
+    states = pd.Index(sorted(set(cube['Leerfase (afk)'].dropna()) | set(next_leerfase)))
+    state = states.get_indexer(transitions['Leerfase (afk)'])
+    n_buckets = len(TEKORTPUNTEN_BINS) - 1
+    bucket_keys = state * (n_buckets + 1) + _bucket_codes(transitions['Tekortpunten'].to_numpy(float), n_buckets)
+
+    into_class = ~next_leerfase.isin(STATUS_LABELS + [UITSTROOM])
+    decision = np.select(
+        [into_class & (transitions['Progression'] == 'Doorstroom'),
+         into_class & transitions['Progression'].isin(['Doublure', 'Afstroom'])],
+        [BEVORDERD, NIET_BEVORDERD], default=0)
+
+    pools = {}
+    for level, keys, n_keys in [('bucket', bucket_keys, len(states) * (n_buckets + 1)),
+                                ('leerfase', state, len(states))]:
+        pools[(level, None)] = _pool(keys, np.ones(len(keys), dtype=bool), n_keys)
+        for group in [BEVORDERD, NIET_BEVORDERD]:
+            pools[(level, group)] = _pool(keys, decision == group, n_keys)
+
+    outgoing = np.bincount(state, minlength=len(states))
+    return {
+        'states': states,
+        'n_buckets': n_buckets,
+        'terminal': states.isin(STATUS_LABELS + [UITSTROOM]) | (outgoing == 0),
+        'next_state': states.get_indexer(next_leerfase),
+        'next_tekortpunten': next_tekortpunten[window].to_numpy(float),
+        'progression': transitions['Progression'].fillna('').to_numpy(dtype=object),
+        'decision': decision,
+        'pools': pools,
+    }
+
+
+def _draw_transitions(pools, decision, state, tekortpunten, rng):
+    # The bucket of the student, or all buckets of the leerfase when the bucket was never observed
+    n_buckets = pools['n_buckets']
+    bucket_keys = state * (n_buckets + 1) + _bucket_codes(tekortpunten, n_buckets)
+    drawn = _draw(pools['pools'][('bucket', decision)], bucket_keys, rng)
+    missing = drawn < 0
+    drawn[missing] = _draw(pools['pools'][('leerfase', decision)], state[missing], rng)
+    return drawn
+
+
+def simulate_trajectories(pools, leerfases, tekortpunten, max_tekortpunten=None, years=SIMULATION_YEARS,
+                          n_trajectories=N_TRAJECTORIES, seed=None):
+    """
+    Monte Carlo trajectories of a cohort, all trajectories advanced together one school year at a time.
+
+    Every year a transition is drawn from the students with the same leerfase and tekortpunten bucket.
+    With a norm, every drawn promotion decision is replaced: students with at most max_tekortpunten are
+    promoted (a transition drawn from the promoted students), the others are not (drawn from the
+    doublures and step-downs). Exam years and leaving school keep their observed probabilities.
+
+    Args:
+        pools (dict): Output of transition_pools.
+        leerfases (np.ndarray): 'Leerfase (afk)' of the students in the starting cohort.
+        tekortpunten (np.ndarray): Their tekortpunten.
+        max_tekortpunten (float, optional): The promotion norm; None simulates the observed decisions.
+        years (int): Number of school years to simulate.
+        n_trajectories (int): Number of trajectories, starting from students drawn from the cohort.
+        seed (int, optional): Seed for reproducible results; with the same seed every norm starts from
+                              the same drawn students.
+
+    Returns:
+        pd.DataFrame: One row per year ('Jaren') with the cumulative percentage of trajectories per
+                      outcome in SIMULATION_OUTCOMES ('<outcome> (%)').
+    """
+    rng = np.random.default_rng(seed)
+    start = rng.integers(len(leerfases), size=n_trajectories)
+    state = pools['states'].get_indexer(np.asarray(leerfases, dtype=object)[start])
+    tekortpunten = np.asarray(tekortpunten, dtype=float)[start]
+
+    states = pools['states']
+    outcome_states = {outcome: states.get_loc(outcome) if outcome in states else -1
+                      for outcome in ['Geslaagd', 'MBO', 'VO verlater', UITSTROOM]}
+    reached = {outcome: np.zeros(n_trajectories, dtype=bool) for outcome in SIMULATION_OUTCOMES}
+
+    rows = []
+    for k in range(1, years + 1):
+        active = np.flatnonzero((state >= 0) & ~pools['terminal'][np.maximum(state, 0)])
+        drawn = _draw_transitions(pools, None, state[active], tekortpunten[active], rng)
+
+        if max_tekortpunten is not None:
+            deciding = np.flatnonzero((drawn >= 0) & (pools['decision'][np.maximum(drawn, 0)] > 0))
+            promote = tekortpunten[active[deciding]] <= max_tekortpunten
+            for group, members in [(BEVORDERD, deciding[promote]), (NIET_BEVORDERD, deciding[~promote])]:
+                redrawn = _draw_transitions(pools, group, state[active[members]], tekortpunten[active[members]], rng)
+                # Keep the observed transition when no student of this leerfase was ever treated so
+                drawn[members] = np.where(redrawn >= 0, redrawn, drawn[members])
+
+        moved = drawn >= 0
+        active, drawn = active[moved], drawn[moved]
+        next_state = pools['next_state'][drawn]
+        progression = pools['progression'][drawn]
+
+        for outcome in ['Geslaagd', 'MBO', 'VO verlater', UITSTROOM]:
+            reached[outcome][active] |= next_state == outcome_states[outcome]
+        reached['Doublure'][active] |= progression == 'Doublure'
+        reached['Afstroom'][active] |= (progression == 'Afstroom') & (next_state != outcome_states['VO verlater'])
+
+        state[active] = next_state
+        tekortpunten[active] = pools['next_tekortpunten'][drawn]
+        rows.append([k] + [round(reached[outcome].mean() * 100, 1) for outcome in SIMULATION_OUTCOMES])
+
+    return pd.DataFrame(rows, columns=['Jaren'] + [f'{outcome} (%)' for outcome in SIMULATION_OUTCOMES])
+
+
+def policy_what_if(cube, schooljaar_start, schooljaar_eind, leerfase, max_tekortpunten, years=SIMULATION_YEARS,
+                   n_trajectories=N_TRAJECTORIES, seed=0):
+    """
+    Projects the doublure, afstroom and diploma rates of a leerfase under a promotion norm
+    ('at most max_tekortpunten tekortpunten'), next to a simulation of the observed decisions.
+
+    The transition probabilities and the starting cohort (the students of the leerfase in those
+    school years) both come from the window schooljaar_start..schooljaar_eind.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        schooljaar_start (int): First school year (inclusive) of the window.
+        schooljaar_eind (int): Last school year (inclusive) of the window.
+        leerfase (str): The starting leerfase.
+        max_tekortpunten (float): The promotion norm.
+        years (int): Number of school years to simulate.
+        n_trajectories (int): Number of Monte Carlo trajectories per scenario.
+        seed (int, optional): Seed for reproducible results.
+
+    Returns:
+        dict: With keys
+              - 'huidig', 'norm' (pd.DataFrame): output of simulate_trajectories without and with the norm,
+              - 'cohort' (int): number of students in the starting cohort,
+              - 'changed' (int): students of the cohort whose promotion decision the norm reverses in the first year.
+    """
+    pools = transition_pools(cube, schooljaar_start, schooljaar_eind)
+    cohort = cube[
+        (cube['Schooljaar'] >= schooljaar_start) &
+        (cube['Schooljaar'] <= schooljaar_eind) &
+        (cube['Leerfase (afk)'] == leerfase)
+    ]
+    if cohort.empty:
+        return {'huidig': None, 'norm': None, 'cohort': 0, 'changed': 0}
+
+    leerfases = cohort['Leerfase (afk)'].to_numpy(dtype=object)
+    tekortpunten = cohort['Tekortpunten'].to_numpy(dtype=float)
+    above_norm = cohort['Tekortpunten'] > max_tekortpunten
+    promoted = cohort['Progression'] == 'Doorstroom'
+    into_class = cohort['consecutive_1'] & ~cohort['next_leerfase_1'].isin(STATUS_LABELS)
+    held_back = cohort['Progression'].isin(['Doublure', 'Afstroom'])
+    changed = into_class & ((promoted & above_norm) | (held_back & ~above_norm))
+
+    return {
+        'huidig': simulate_trajectories(pools, leerfases, tekortpunten, None, years, n_trajectories, seed),
+        'norm': simulate_trajectories(pools, leerfases, tekortpunten, max_tekortpunten, years, n_trajectories, seed),
+        'cohort': len(cohort),
+        'changed': int(changed.sum()),
+    }
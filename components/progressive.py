@@ -0,0 +1,69 @@
+"""
+Progressive rendering: the cheap results of a page are drawn first, the slower analyses run on a
+shared thread pool and are drawn in their reserved place as soon as each one is done.
+
+Analyses on the pool must not call Streamlit; only the render functions do, on the script thread.
+That includes functions decorated with st.cache_data: submit the plain function, cached_future
+(components/analysis_context.py) keeps its result.
+"""
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import streamlit as st
+
+MAX_WORKERS = 4
+WAITING_TEXT = "⏳ Bezig met berekenen..."
+ERROR_TEXT = "Deze berekening is mislukt: {error}"
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='analysis')
+
+
+def submit(compute, *args, **kwargs):
+    """
+    Starts an analysis on the shared thread pool.
+
+    Returns:
+        concurrent.futures.Future: The future result of compute(*args, **kwargs).
+    """
+    return _executor.submit(compute, *args, **kwargs)
+
+
+def completed(value):
+    """A future that is already done, for results that were cached."""
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def render_as_completed(panels, waiting_text=WAITING_TEXT):
+    """
+    Draws every panel as soon as its result is ready, in the order in which they finish. A failed
+    analysis shows an error in its own panels; the other panels are still drawn.
+
+    Args:
+        panels (list): (placeholder, future, render) triples, with placeholder an st.empty() that
+                       reserves the place on the page and render(result) drawing the panel.
+                       Several panels can share a future.
+        waiting_text (str): Shown in a placeholder until its result is ready.
+    """
+    pending = {}
+    for placeholder, future, render in panels:
+        if not future.done():
+            placeholder.caption(waiting_text)
+        pending.setdefault(future, []).append((placeholder, render))
+
+    while pending:
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            if error is not None:
+                logger.error("Analysis failed", exc_info=error)
+            for placeholder, render in pending.pop(future):
+                if error is not None:
+                    placeholder.error(ERROR_TEXT.format(error=error))
+                    continue
+                with placeholder.container():
+                    render(future.result())
+
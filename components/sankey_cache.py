@@ -0,0 +1,249 @@
+"""
+Cache of Sankey figure JSON, keyed by a hash of (labels, links, title).
+
+A figure for a given selection is built once and then served from memory, or from disk for other
+server processes and after a restart. The disk cache keeps at most DISK_CACHE_FILES files, the least
+recently used are removed first. Popular diagrams can be built ahead of time, optionally with
+static images (needs the optional 'kaleido' package):
+
+    python -m components.sankey_cache --schooljaar 2023 --image-format svg
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from components import metrics
+from components.doorstroom_functions import (
+    analyze_next_leerfase_per_category,
+    analyze_three_year_leerfase_transitions,
+    plot_sankey_diagram,
+    prepare_sankey_data,
+)
+
+SANKEY_CACHE_DIR = '.sankey_cache'
+MEMORY_CACHE_SIZE = 256
+# Files kept in the disk cache (figure JSON and prerendered images)
+DISK_CACHE_FILES = 2000
+
+_memory_cache = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+
+def _memory_cache_size():
+    with _memory_cache_lock:
+        return len(_memory_cache), sum(len(payload) for payload in _memory_cache.values())
+
+
+metrics.register_size('sankey_figures', _memory_cache_size)
+
+
+def sankey_cache_key(labels, source, target, value, title):
+    """Stable hash of the Sankey inputs, the same in every process."""
+    spec = json.dumps([list(labels), [int(s) for s in source], [int(t) for t in target],
+                       [int(v) for v in value], title], ensure_ascii=False)
+    return hashlib.sha256(spec.encode('utf-8')).hexdigest()
+
+
+def _remember(key, payload):
+    with _memory_cache_lock:
+        _memory_cache[key] = payload
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+            metrics.count('sankey_figures', 'eviction')
+
+
+def _prune_disk_cache(cache_dir, max_files=DISK_CACHE_FILES):
+    """Removes the least recently used files until the disk cache holds at most max_files."""
+    files = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and not entry.name.endswith('.tmp'):
+            try:
+                files.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+    files.sort()
+    for _, path in files[:max(len(files) - max_files, 0)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Removed by another process meanwhile
+            continue
+        metrics.count('sankey_disk', 'eviction')
+
+
+def sankey_figure_json(labels, source, target, value, title="Doorstroom leerlingen (3-jaar vooruit)",
+                       cache_dir=SANKEY_CACHE_DIR):
+    """
+    The Plotly JSON of a Sankey diagram, built at most once per unique input.
+
+    Args:
+        labels (list): Unique node labels.
+        source (list): Source node indices for links.
+        target (list): Target node indices for links.
+        value (list): Values (counts) for links.
+        title (str): Title for the Sankey diagram.
+        cache_dir (str): Directory for the on-disk cache (None to keep it in memory only).
+
+    Returns:
+        str: The figure as Plotly JSON.
+    """
+    key = sankey_cache_key(labels, source, target, value, title)
+    with _memory_cache_lock:
+        payload = _memory_cache.get(key)
+    metrics.count('sankey_figures', 'miss' if payload is None else 'hit')
+    if payload is not None:
+        return payload
+
+    path = os.path.join(cache_dir, f'{key}.json') if cache_dir else None
+    if path and os.path.exists(path):
+        metrics.count('sankey_disk', 'hit')
+        with open(path, encoding='utf-8') as f:
+            payload = f.read()
+        try:
+            # Marks the file as recently used for _prune_disk_cache
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+    else:
+        if path:
+            metrics.count('sankey_disk', 'miss')
+        with metrics.timed('plot_sankey_diagram'):
+            payload = plot_sankey_diagram(labels, source, target, value, title=title).to_json()
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first, so other processes never read a half-written file
+            temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+            _prune_disk_cache(cache_dir)
+
+    _remember(key, payload)
+    return payload
+
+
+def cached_sankey_figure(labels, source, target, value, title="Doorstroom leerlingen (3-jaar vooruit)"):
+    """
+    Cached Sankey diagram as a figure dict, ready for st.plotly_chart.
+
+    Args:
+        labels (list): Unique node labels.
+        source (list): Source node indices for links.
+        target (list): Target node indices for links.
+        value (list): Values (counts) for links.
+        title (str): Title for the Sankey diagram.
+
+    Returns:
+        dict: The Plotly figure specification.
+    """
+    return json.loads(sankey_figure_json(labels, source, target, value, title=title))
+
+
+def prerender_sankey_image(labels, source, target, value, title, image_format='svg', cache_dir=SANKEY_CACHE_DIR):
+    """
+    Writes a static image of a Sankey diagram next to its cached JSON (needs 'kaleido').
+
+    Returns:
+        str: Path of the image.
+    """
+    import plotly.io as pio
+
+    key = sankey_cache_key(labels, source, target, value, title)
+    path = os.path.join(cache_dir, f'{key}.{image_format}')
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        figure = pio.from_json(sankey_figure_json(labels, source, target, value, title=title, cache_dir=cache_dir))
+        figure.write_image(path, format=image_format)
+        _prune_disk_cache(cache_dir)
+    return path
+
+
+def details_sankey_title(leerfase, schooljaar_start, schooljaar_eind):
+    """Title of the Sankey diagram of a leerfase on page 9."""
+    return f"Student Progression: {leerfase} ({schooljaar_start}-{schooljaar_eind})"
+
+
+def category_sankey_title(leerfase, schooljaar_start, schooljaar_eind, category):
+    """Title of the Sankey diagram of one progression category on page 3."""
+    return f"3-Year Progression: {leerfase} ({schooljaar_start}-{schooljaar_eind}) - Category: {category}"
+
+
+def popular_diagrams(df, schooljaren, leerfases=None):
+    """
+    The three-year Sankey inputs of every leerfase in the given school years, computed and titled
+    as pages 9 and 3 do for a selection of one school year with their default filters: the paths
+    without buckets (bucket_paths=False) of the whole leerfase, and of the students per one-year
+    progression category.
+
+    Args:
+        df (pd.DataFrame): The prepared dataset (see read_dataset).
+        schooljaren (list): The starting school years (diagrams per year and leerfase).
+        leerfases (list, optional): Leerfases to include. Defaults to all leerfases in those years.
+
+    Yields:
+        tuple: (transition_counts, title)
+    """
+    all_buckets = sorted(df['Tekortpunten_Bucket'].dropna().unique().tolist())
+    for schooljaar in schooljaren:
+        year_leerfases = leerfases or sorted(df.loc[df['Schooljaar'] == schooljaar, 'Leerfase (afk)'].dropna().unique())
+        for leerfase in year_leerfases:
+            yield (analyze_three_year_leerfase_transitions(df, schooljaar, schooljaar, leerfase, bucket_paths=False),
+                   details_sankey_title(leerfase, schooljaar, schooljaar))
+
+            _, _, students_by_category = analyze_next_leerfase_per_category(
+                df, schooljaar, schooljaar, leerfase, tekortpunten_bucket_filter=all_buckets)
+            for category, leerlingnummers in students_by_category.items():
+                if leerlingnummers:
+                    transition_counts = analyze_three_year_leerfase_transitions(
+                        df, schooljaar, schooljaar, leerfase, leerlingnummer_filter=leerlingnummers, bucket_paths=False)
+                    yield transition_counts, category_sankey_title(leerfase, schooljaar, schooljaar, category)
+
+
+def warm_sankey_cache(diagrams, image_format=None, cache_dir=SANKEY_CACHE_DIR):
+    """
+    Builds Sankey diagrams ahead of time, so the first visitor does not pay for them.
+
+    Args:
+        diagrams (iterable): (transition_counts, title) pairs, e.g. from popular_diagrams.
+        image_format (str, optional): Also write 'svg' or 'png' images (needs 'kaleido').
+        cache_dir (str): Directory for the on-disk cache.
+
+    Returns:
+        int: Number of diagrams that were warmed.
+    """
+    n_diagrams = 0
+    for transition_counts, title in diagrams:
+        if transition_counts.empty:
+            continue
+        labels, source, target, value = prepare_sankey_data(transition_counts)
+        if not (labels and source and target and value):
+            continue
+        sankey_figure_json(labels, source, target, value, title=title, cache_dir=cache_dir)
+        if image_format:
+            prerender_sankey_image(labels, source, target, value, title, image_format, cache_dir)
+        n_diagrams += 1
+    return n_diagrams
+
+
+def main():
+    from components.transition_cube import DATA_FILE_PATH, read_dataset
+
+    parser = argparse.ArgumentParser(description="Pre-render Sankey diagrams into the figure cache.")
+    parser.add_argument('--data', default=DATA_FILE_PATH)
+    parser.add_argument('--schooljaar', type=int, nargs='+', required=True)
+    parser.add_argument('--leerfase', nargs='+')
+    parser.add_argument('--image-format', choices=['svg', 'png'])
+    parser.add_argument('--cache-dir', default=SANKEY_CACHE_DIR)
+    args = parser.parse_args()
+
+    diagrams = popular_diagrams(read_dataset(args.data), args.schooljaar, args.leerfase)
+    n_diagrams = warm_sankey_cache(diagrams, args.image_format, args.cache_dir)
+    print(f"{n_diagrams} diagrams in {args.cache_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import pandas as pd
+import numpy as np
+
+CATEGORIES = ['Doorstroom', 'Afstroom', 'Doublure']
+N_RESAMPLES = 5000
+# Shown below every table of compare_groups
+SIGNIFICANCE_CAPTION = (f"Intervallen met bootstrap, p-waarde met een permutatietoets ({N_RESAMPLES} herhalingen). "
+                        "Een p-waarde onder 0,05 betekent dat het verschil waarschijnlijk geen toeval is; "
+                        "bij kleine groepen zijn de intervallen breed.")
+
+
+def bootstrap_share_intervals(counts, n_resamples=N_RESAMPLES, confidence=0.95, seed=None):
+    """
+    Bootstrap confidence intervals for the share of every category in one group.
+
+    Resampling the students of a group with replacement is a multinomial draw on the category
+    counts, so all resamples are drawn in one call.
+
+    Args:
+        counts (pd.Series): Number of students per category.
+        n_resamples (int): Number of bootstrap resamples.
+        confidence (float): Confidence level of the interval.
+        seed (int, optional): Seed for reproducible results.
+
+    Returns:
+        pd.DataFrame: 'Ondergrens' and 'Bovengrens' in percent, indexed by category.
+    """
+    counts = counts.astype(int)
+    total = counts.sum()
+    if total == 0:
+        return pd.DataFrame(np.nan, index=counts.index, columns=['Ondergrens', 'Bovengrens'])
+
+    rng = np.random.default_rng(seed)
+    resampled = rng.multinomial(total, counts.to_numpy() / total, size=n_resamples) / total * 100
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(resampled, [alpha, 1 - alpha], axis=0)
+    return pd.DataFrame({'Ondergrens': lower, 'Bovengrens': upper}, index=counts.index)
+
+
+def permutation_p_values(counts_a, counts_b, n_resamples=N_RESAMPLES, seed=None):
+    """
+    Two-sided permutation p-values for the difference in share per category between two groups.
+
+    Shuffling the group labels of the pooled students and taking the first len(a) as group a is a
+    multivariate hypergeometric draw on the pooled counts, so all permutations are drawn in one call.
+
+    Args:
+        counts_a (pd.Series): Number of students per category in the analysis group.
+        counts_b (pd.Series): Number of students per category in the comparison group (same index).
+        n_resamples (int): Number of permutations.
+        seed (int, optional): Seed for reproducible results.
+
+    Returns:
+        pd.Series: p-value per category.
+    """
+    counts_a = counts_a.astype(int)
+    counts_b = counts_b.reindex(counts_a.index, fill_value=0).astype(int)
+    n_a, n_b = counts_a.sum(), counts_b.sum()
+    if n_a == 0 or n_b == 0:
+        return pd.Series(np.nan, index=counts_a.index)
+
+    pooled = (counts_a + counts_b).to_numpy()
+    observed = counts_a.to_numpy() / n_a - counts_b.to_numpy() / n_b
+
+    rng = np.random.default_rng(seed)
+    permuted_a = rng.multivariate_hypergeometric(pooled, n_a, size=n_resamples)
+    permuted = permuted_a / n_a - (pooled - permuted_a) / n_b
+
+    # Small tolerance so ties from floating point rounding count as "at least as extreme"
+    extreme = (np.abs(permuted) >= np.abs(observed) - 1e-12).sum(axis=0)
+    return pd.Series((extreme + 1) / (n_resamples + 1), index=counts_a.index)
+
+
+def compare_groups(counts_a, counts_b, categories=CATEGORIES, n_resamples=N_RESAMPLES, confidence=0.95, seed=0):
+    """
+    Compares the Doorstroom/Afstroom/Doublure shares of the analysis group and the comparison group.
+
+    Args:
+        counts_a (pd.Series): Number of students per progression category in the analysis group
+                              (e.g. the 'Aantallen' column of analyze_next_leerfase).
+        counts_b (pd.Series): The same for the comparison group.
+        categories (list): The categories to report. Shares are computed over all categories.
+        n_resamples (int): Number of bootstrap resamples and permutations.
+        confidence (float): Confidence level of the intervals.
+        seed (int, optional): Seed, fixed by default so the table does not change between reruns.
+
+    Returns:
+        pd.DataFrame: Per category the percentage and interval of both groups, the difference in
+                      percentage points and the permutation p-value.
+    """
+    all_categories = counts_a.index.union(counts_b.index)
+    counts_a = counts_a.reindex(all_categories, fill_value=0).astype(int)
+    counts_b = counts_b.reindex(all_categories, fill_value=0).astype(int)
+
+    share_a = counts_a / max(counts_a.sum(), 1) * 100
+    share_b = counts_b / max(counts_b.sum(), 1) * 100
+    interval_a = bootstrap_share_intervals(counts_a, n_resamples, confidence, seed)
+    interval_b = bootstrap_share_intervals(counts_b, n_resamples, confidence, None if seed is None else seed + 1)
+    p_values = permutation_p_values(counts_a, counts_b, n_resamples, None if seed is None else seed + 2)
+
+    level = f"{confidence:.0%}"
+    comparison = pd.DataFrame({
+        'Analyse groep': _format_percentage(share_a),
+        f'{level}-interval analyse groep': _format_interval(interval_a),
+        'Vergelijkingsgroep': _format_percentage(share_b),
+        f'{level}-interval vergelijkingsgroep': _format_interval(interval_b),
+        'Verschil (%-punt)': (share_a - share_b).round(0).astype(int),
+        'p-waarde': p_values.round(3),
+    })
+    return comparison.reindex([c for c in categories if c in comparison.index])
+
+
+def _format_percentage(share):
+    return share.round(0).astype(int).astype(str) + '%'
+
+
+def _format_interval(interval):
+    return interval['Ondergrens'].round(0).astype('Int64').astype(str) + '% - ' + \
+        interval['Bovengrens'].round(0).astype('Int64').astype(str) + '%'
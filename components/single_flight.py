@@ -0,0 +1,91 @@
+"""
+Process-wide single flight: an analysis that is already running for one session is not started
+again for another. Later callers with the same key wait for the running computation and share
+its result; once it is done the key is free again (storing results is up to the caller).
+"""
+import threading
+from concurrent.futures import Future
+
+from components import metrics
+from components.progressive import submit
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def _function_name(compute):
+    return f'{compute.__module__}.{compute.__qualname__}'
+
+
+def _timed(compute, *args, **kwargs):
+    with metrics.timed(_function_name(compute)):
+        return compute(*args, **kwargs)
+
+
+def _forget(key, future):
+    with _in_flight_lock:
+        if _in_flight.get(key) is future:
+            del _in_flight[key]
+
+
+def run_once(key, compute, *args, **kwargs):
+    """
+    Runs compute(*args, **kwargs) on this thread, unless a computation with the same key is running;
+    then it waits for that one.
+
+    Args:
+        key (hashable): Identifies the computation; equal keys must give equal results.
+        compute (callable): The analysis function.
+        *args, **kwargs: Arguments for compute.
+
+    Returns:
+        The result of compute.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _in_flight[key] = future
+    metrics.count('single_flight', 'miss' if leader else 'hit')
+    if not leader:
+        return future.result()
+
+    try:
+        result = _timed(compute, *args, **kwargs)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _forget(key, future)
+
+
+def shared_future(key, compute, *args, **kwargs):
+    """
+    Same as run_once, but computed on the analysis thread pool (see components/progressive.py).
+
+    Returns:
+        concurrent.futures.Future: The running computation with this key, or a new one.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        metrics.count('single_flight', 'miss' if future is None else 'hit')
+        if future is not None:
+            return future
+        future = submit(_timed, compute, *args, **kwargs)
+        _in_flight[key] = future
+    # Outside the lock, the callback runs at once when the computation is already done
+    future.add_done_callback(lambda done: _forget(key, done))
+    return future
+
+
+def in_flight():
+    """Number of computations running at the moment."""
+    with _in_flight_lock:
+        return len(_in_flight)
+
+
+metrics.register_size('single_flight', lambda: (in_flight(), 0))
@@ -0,0 +1,204 @@
+"""
+Versioned store of dataset releases (e.g. v0.91 with the VAVO fixes, v1.0 with MBO labels).
+
+Every version is an immutable Parquet snapshot identified by a content hash, stored together with
+its flow aggregates, so two versions are compared on aggregates instead of on rows:
+
+    python -m components.snapshots save v1.2 --note "Aanpassingen flow en opmaak"
+    python -m components.snapshots list
+    python -m components.snapshots diff v1.1 v1.2
+"""
+import argparse
+import hashlib
+import json
+import os
+import stat
+from datetime import datetime
+
+import pandas as pd
+
+from components.transition_cube import DATA_FILE_PATH, read_dataset, build_transition_cube
+from components.export_api import one_year_flows, three_year_flows
+
+SNAPSHOT_DIR = 'snapshots'
+MANIFEST_FILE = 'manifest.json'
+
+AGGREGATES = {
+    'one_year': (one_year_flows, ['Schooljaar', 'Leerfase (afk)', 'Tekortpunten_Bucket', 'Progression'], 'Aantallen'),
+    'three_year': (three_year_flows, ['Schooljaar', 'Leerfase (afk)', 'Transition'], 'Aantal'),
+}
+
+
+def content_hash(df):
+    """
+    Hash of the data values (row order and column names included), independent of the file format.
+
+    Args:
+        df (pd.DataFrame): The dataset.
+
+    Returns:
+        str: Hex sha256 digest.
+    """
+    digest = hashlib.sha256()
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _read_manifest(store_dir):
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_read_only(df, path):
+    df.to_parquet(path, index=False)
+    os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+
+def save_snapshot(df, version, store_dir=SNAPSHOT_DIR, note=''):
+    """
+    Stores a dataset release as an immutable snapshot plus its flow aggregates.
+
+    Saving the same content under an existing version is a no-op; different content under an
+    existing version raises, so a published version never changes.
+
+    Args:
+        df (pd.DataFrame): The prepared dataset (see read_dataset).
+        version (str): Version name, e.g. 'v1.2'.
+        store_dir (str): Directory of the store.
+        note (str): Short description of the release.
+
+    Returns:
+        dict: The manifest entry of the version.
+    """
+    manifest = _read_manifest(store_dir)
+    data_hash = content_hash(df)
+    if version in manifest:
+        if manifest[version]['hash'] != data_hash:
+            raise ValueError(f"Version '{version}' already exists with different content, use a new version name.")
+        return manifest[version]
+
+    version_dir = os.path.join(store_dir, version)
+    os.makedirs(version_dir, exist_ok=False)
+    _write_read_only(df, os.path.join(version_dir, 'data.parquet'))
+
+    cube = build_transition_cube(df)
+    for name, (build_aggregate, _, _) in AGGREGATES.items():
+        _write_read_only(build_aggregate(cube), os.path.join(version_dir, f'{name}.parquet'))
+
+    manifest[version] = {
+        'hash': data_hash,
+        'rows': len(df),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'note': note,
+    }
+    with open(os.path.join(store_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest[version]
+
+
+def list_snapshots(store_dir=SNAPSHOT_DIR):
+    """
+    All stored versions.
+
+    Args:
+        store_dir (str): Directory of the store.
+
+    Returns:
+        pd.DataFrame: One row per version with its hash, number of rows, creation time and note.
+    """
+    manifest = _read_manifest(store_dir)
+    return pd.DataFrame.from_dict(manifest, orient='index', columns=['hash', 'rows', 'created', 'note'])
+
+
+def load_snapshot(version, store_dir=SNAPSHOT_DIR, verify=True):
+    """
+    Loads the dataset of a version.
+
+    Args:
+        version (str): Version name.
+        store_dir (str): Directory of the store.
+        verify (bool): Check the content hash against the manifest.
+
+    Returns:
+        pd.DataFrame: The dataset as it was saved.
+    """
+    manifest = _read_manifest(store_dir)
+    if version not in manifest:
+        raise KeyError(f"Unknown version '{version}', available: {', '.join(manifest)}")
+
+    df = pd.read_parquet(os.path.join(store_dir, version, 'data.parquet'))
+    if verify and content_hash(df) != manifest[version]['hash']:
+        raise ValueError(f"Snapshot '{version}' does not match its content hash.")
+    return df
+
+
+def load_aggregate(version, aggregate='one_year', store_dir=SNAPSHOT_DIR):
+    """
+    Loads the precomputed 'one_year' or 'three_year' flow aggregate of a version.
+    """
+    return pd.read_parquet(os.path.join(store_dir, version, f'{aggregate}.parquet'))
+
+
+def diff_snapshots(version_a, version_b, aggregate='one_year', store_dir=SNAPSHOT_DIR, only_changes=True):
+    """
+    Compares the flow aggregates of two versions, showing how a data correction changed the reported numbers.
+
+    Args:
+        version_a (str): The old version.
+        version_b (str): The new version.
+        aggregate (str): 'one_year' or 'three_year'.
+        store_dir (str): Directory of the store.
+        only_changes (bool): Keep only groups whose count or percentage changed.
+
+    Returns:
+        pd.DataFrame: Per group the count and percentage in both versions and the differences.
+    """
+    _, keys, count_column = AGGREGATES[aggregate]
+    flows_a = load_aggregate(version_a, aggregate, store_dir)
+    flows_b = load_aggregate(version_b, aggregate, store_dir)
+
+    diff = flows_a.merge(flows_b, on=keys, how='outer', suffixes=(f' {version_a}', f' {version_b}'))
+    for version in [version_a, version_b]:
+        diff[f'{count_column} {version}'] = diff[f'{count_column} {version}'].fillna(0).astype(int)
+        diff[f'Percentage {version}'] = diff[f'Percentage {version}'].fillna(0.0)
+    diff['Verschil aantal'] = diff[f'{count_column} {version_b}'] - diff[f'{count_column} {version_a}']
+    diff['Verschil %-punt'] = (diff[f'Percentage {version_b}'] - diff[f'Percentage {version_a}']).round(1)
+
+    if only_changes:
+        diff = diff[(diff['Verschil aantal'] != 0) | (diff['Verschil %-punt'] != 0)]
+    return diff.sort_values(keys).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned snapshots of the doorstroom dataset.")
+    parser.add_argument('--store-dir', default=SNAPSHOT_DIR)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    save_parser = subparsers.add_parser('save', help="Store the current dataset as a new version")
+    save_parser.add_argument('version')
+    save_parser.add_argument('--data', default=DATA_FILE_PATH)
+    save_parser.add_argument('--note', default='')
+
+    subparsers.add_parser('list', help="List stored versions")
+
+    diff_parser = subparsers.add_parser('diff', help="Compare the flow aggregates of two versions")
+    diff_parser.add_argument('version_a')
+    diff_parser.add_argument('version_b')
+    diff_parser.add_argument('--aggregate', default='one_year', choices=list(AGGREGATES))
+
+    args = parser.parse_args()
+    if args.command == 'save':
+        entry = save_snapshot(read_dataset(args.data), args.version, args.store_dir, note=args.note)
+        print(f"{args.version}: {entry['rows']} rows, hash {entry['hash'][:12]}")
+    elif args.command == 'list':
+        print(list_snapshots(args.store_dir).to_string())
+    else:
+        print(diff_snapshots(args.version_a, args.version_b, args.aggregate, args.store_dir).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Measures cold import and first-render times, each in a fresh Python process:
+
+    python -m components.startup_timing
+    python -m components.startup_timing --pages Start.py pages/9_Details_voor_groepen.py --repeat 5
+
+The landing page should not load pandas or the analysis modules; the 'pandas geladen' column shows
+whether a page pulled them in. (Streamlit itself already imports plotly, so plotly is only imported
+lazily for the command-line tools.)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ['streamlit', 'pandas', 'numpy', 'plotly.graph_objects', 'components.popups',
+                   'components.doorstroom_functions', 'components.cached_data']
+DEFAULT_PAGES = ['Start.py'] + sorted(
+    os.path.join('pages', name) for name in os.listdir(os.path.join(ROOT_DIR, 'pages'))
+    if name.endswith('.py') and name != '__init__.py'
+)
+
+_RENDER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({page!r}, default_timeout={timeout}).run()
+print(json.dumps({{'seconds': time.perf_counter() - start, 'exceptions': len(at.exception),
+                  'pandas': 'pandas' in sys.modules}}))
+"""
+
+
+def _run_python(args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+
+
+def cold_import_time(module, repeat=3):
+    """
+    Fastest of `repeat` cold imports of a module, in seconds.
+    """
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    return min(float(_run_python(['-c', code]).stdout) for _ in range(repeat))
+
+
+def heaviest_imports(module, top=10):
+    """
+    The imports with the highest own import time when importing a module cold (from -X importtime).
+
+    Returns:
+        pd.DataFrame: 'Module', 'Eigen (ms)' and 'Cumulatief (ms)', sorted by own time.
+    """
+    stderr = _run_python(['-X', 'importtime', '-c', f'import {module}']).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    table = pd.DataFrame(rows, columns=['Module', 'Eigen (ms)', 'Cumulatief (ms)'])
+    return table.nlargest(top, 'Eigen (ms)').reset_index(drop=True)
+
+
+def cold_render_time(page, repeat=1, timeout=120):
+    """
+    First render of a page in a fresh process (Streamlit import included), via streamlit's AppTest.
+
+    Returns:
+        dict: 'seconds' (fastest run), 'exceptions' (number raised by the page) and
+              'pandas' (whether pandas was imported).
+    """
+    code = _RENDER_SCRIPT.format(page=page, timeout=timeout)
+    runs = [json.loads(_run_python(['-c', code]).stdout.strip().splitlines()[-1]) for _ in range(repeat)]
+    return min(runs, key=lambda run: run['seconds'])
+
+
+def startup_report(modules=DEFAULT_MODULES, pages=DEFAULT_PAGES, repeat=3):
+    """
+    Cold import times of modules and cold render times of pages.
+
+    Returns:
+        tuple: (imports, pages) as DataFrames.
+    """
+    imports = pd.DataFrame({
+        'Module': modules,
+        'Seconden': [round(cold_import_time(module, repeat), 3) for module in modules],
+    })
+    renders = []
+    for page in pages:
+        run = cold_render_time(page, repeat=1)
+        renders.append((page, round(run['seconds'], 3), run['pandas'], run['exceptions']))
+    renders = pd.DataFrame(renders, columns=['Pagina', 'Seconden', 'pandas geladen', 'Fouten'])
+    return imports, renders
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import and first-render times.")
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES)
+    parser.add_argument('--pages', nargs='+', default=DEFAULT_PAGES)
+    parser.add_argument('--repeat', type=int, default=3, help="Imports per module, the fastest is reported")
+    parser.add_argument('--profile', help="Also list the heaviest imports of this module")
+    args = parser.parse_args()
+
+    imports, renders = startup_report(args.modules, args.pages, args.repeat)
+    print(imports.to_string(index=False))
+    print()
+    print(renders.to_string(index=False))
+    if args.profile:
+        print()
+        print(heaviest_imports(args.profile).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import numpy as np
+
+TIMELINE_COLUMNS = ['Schooljaar', 'Leerfase (afk)', 'Leerfase (afk) vorig schooljaar', 'Tekortpunten',
+                    'Tekortpunten_Bucket', 'Doorstroom', 'Progression', 'Progression (bron)', 'Transition']
+
+
+def build_student_index(cube):
+    """
+    Builds a dense index from Leerlingnummer to the rows of that student.
+
+    The cube is sorted by student and school year, so every student is one contiguous row range.
+    Its start and end are stored in arrays indexed by Leerlingnummer minus the lowest number, so a
+    lookup is two array reads, whatever the size of the dataset.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+
+    Returns:
+        dict: With keys
+              - 'min_leerlingnummer' (int): the lowest Leerlingnummer,
+              - 'row_start', 'row_stop' (np.ndarray): the row range per Leerlingnummer - min_leerlingnummer
+                (both 0 for numbers without rows),
+              - 'timeline' (pd.DataFrame): the TIMELINE_COLUMNS of the cube, in the same order.
+    """
+    leerlingnummers = cube['Leerlingnummer'].to_numpy(dtype=np.int64)
+    if len(leerlingnummers) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return {'min_leerlingnummer': 0, 'row_start': empty, 'row_stop': empty,
+                'timeline': cube[TIMELINE_COLUMNS].reset_index(drop=True)}
+
+    min_leerlingnummer = int(leerlingnummers.min())
+    offsets = leerlingnummers - min_leerlingnummer
+
+    # First row of every student and the row after their last one
+    starts = np.flatnonzero(np.r_[True, offsets[1:] != offsets[:-1]])
+    stops = np.r_[starts[1:], len(offsets)]
+
+    row_start = np.zeros(int(offsets.max()) + 1, dtype=np.int64)
+    row_stop = np.zeros_like(row_start)
+    row_start[offsets[starts]] = starts
+    row_stop[offsets[starts]] = stops
+
+    return {
+        'min_leerlingnummer': min_leerlingnummer,
+        'row_start': row_start,
+        'row_stop': row_stop,
+        'timeline': cube[TIMELINE_COLUMNS].reset_index(drop=True),
+    }
+
+
+def student_timeline(index, leerlingnummer):
+    """
+    The full timeline of one student: leerfase, tekortpunten, bucket, the Doorstroom label of the
+    source, the one-year classification (as computed from the leerfases and with the source label
+    first) and the three-year path per school year.
+
+    Args:
+        index (dict): Output of build_student_index.
+        leerlingnummer (int): The student to look up.
+
+    Returns:
+        pd.DataFrame: One row per school year (empty when the student is not in the data).
+    """
+    offset = int(leerlingnummer) - index['min_leerlingnummer']
+    if not 0 <= offset < len(index['row_start']):
+        return index['timeline'].iloc[0:0]
+    return index['timeline'].iloc[index['row_start'][offset]:index['row_stop'][offset]]
@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy as np
+
+from components.transition_cube import STATUS_LABELS
+
+# Events whose time since the start of a cohort is analysed, as the leerfase that marks them
+SURVIVAL_EVENTS = ['Geslaagd', 'VO verlater']
+ALL_BUCKETS = 'Alle'
+
+
+def event_durations(cube, student_index, starts, event):
+    """
+    Years from every starting row until the event, or until censoring, read from the per-student
+    row ranges of the student index (no per-student loops).
+
+    The event is the first later row of the student with 'Leerfase (afk)' == event. Without it the
+    time is censored:
+        - at the last school year in the data (the student is still in school, or left in another
+          way, e.g. VO verlater while the event is Geslaagd, and can no longer have the event),
+        - at the last row of the student when the data stops earlier without a status label (lost).
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        student_index (dict): Output of build_student_index for the same cube.
+        starts (np.ndarray): Positions in the cube of the starting rows.
+        event (str): The leerfase that marks the event (one of SURVIVAL_EVENTS).
+
+    Returns:
+        tuple: (durations, observed) arrays aligned with starts: the time in school years and
+               True where the event happened (False where censored).
+    """
+    schooljaren = cube['Schooljaar'].to_numpy()
+    leerfases = cube['Leerfase (afk)'].to_numpy(dtype=object)
+    offsets = cube['Leerlingnummer'].to_numpy(dtype=np.int64)[starts] - student_index['min_leerlingnummer']
+    last_rows = student_index['row_stop'][offsets] - 1
+
+    # First event row after each start, if it still belongs to the same student
+    event_rows = np.flatnonzero(leerfases == event)
+    candidates = np.searchsorted(event_rows, starts + 1)
+    next_event = event_rows[np.minimum(candidates, max(len(event_rows) - 1, 0))] if len(event_rows) else starts
+    observed = (candidates < len(event_rows)) & (next_event <= last_rows)
+
+    last_schooljaar = schooljaren.max()
+    lost = (schooljaren[last_rows] < last_schooljaar) & ~pd.Series(leerfases[last_rows]).isin(STATUS_LABELS).to_numpy()
+    censored_at = np.where(lost, schooljaren[last_rows], last_schooljaar)
+
+    durations = np.where(observed, schooljaren[next_event], censored_at) - schooljaren[starts]
+    return durations.astype(np.int64), observed
+
+
+def kaplan_meier(durations, observed, confidence=0.95):
+    """
+    Kaplan-Meier estimate with a Greenwood interval, for whole school years.
+
+    Args:
+        durations (np.ndarray): Time in school years per student.
+        observed (np.ndarray): True where the event happened, False where censored.
+        confidence (float): Confidence level of the interval (normal approximation).
+
+    Returns:
+        pd.DataFrame: Per year ('Jaren', 1 to the longest time) the students 'Onder observatie' at the
+                      start of the year, 'Gebeurtenissen', 'Gecensureerd', the cumulative percentage with
+                      the event ('Cumulatief (%)', 1 minus the survival) with 'Ondergrens (%)' and 'Bovengrens (%)'.
+    """
+    durations = np.asarray(durations, dtype=np.int64)
+    observed = np.asarray(observed, dtype=bool)
+    max_years = int(durations.max()) if len(durations) else 0
+    years = np.arange(1, max_years + 1)
+
+    events = np.bincount(durations[observed], minlength=max_years + 1)[1:]
+    censored = np.bincount(durations[~observed], minlength=max_years + 1)[1:]
+    ended_before = np.cumsum(np.bincount(durations, minlength=max_years + 1))[:-1]
+    at_risk = len(durations) - ended_before
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hazard = np.where(at_risk > 0, events / at_risk, 0.0)
+        survival = np.cumprod(1 - hazard)
+        greenwood = np.cumsum(np.where(at_risk > events, events / (at_risk * (at_risk - events)), 0.0))
+    z = {0.9: 1.645, 0.95: 1.96, 0.99: 2.576}.get(confidence, 1.96)
+    margin = z * survival * np.sqrt(greenwood)
+
+    return pd.DataFrame({
+        'Jaren': years,
+        'Onder observatie': at_risk,
+        'Gebeurtenissen': events,
+        'Gecensureerd': censored,
+        'Cumulatief (%)': ((1 - survival) * 100).round(1),
+        'Ondergrens (%)': ((1 - np.minimum(survival + margin, 1)) * 100).round(1),
+        'Bovengrens (%)': ((1 - np.maximum(survival - margin, 0)) * 100).round(1),
+    })
+
+
+def median_time(curve):
+    """The first year in which at least half of the students had the event, None when not reached."""
+    reached = curve.loc[curve['Cumulatief (%)'] >= 50, 'Jaren']
+    return int(reached.iloc[0]) if len(reached) else None
+
+
+def survival_curves(cube, student_index, leerfase, schooljaar_start, schooljaar_eind, events=SURVIVAL_EVENTS):
+    """
+    Kaplan-Meier curves of the time to every event for a cohort definition: the students in a
+    leerfase in schooljaar_start..schooljaar_eind (their first such year), per tekortpunten bucket of
+    that year and for all buckets together.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        student_index (dict): Output of build_student_index for the same cube.
+        leerfase (str): The starting leerfase.
+        schooljaar_start (int): First starting school year (inclusive).
+        schooljaar_eind (int): Last starting school year (inclusive).
+        events (list): Events to analyse (see SURVIVAL_EVENTS).
+
+    Returns:
+        pd.DataFrame: The output of kaplan_meier per 'Gebeurtenis' and 'Tekortpunten_Bucket'
+                      (ALL_BUCKETS for the whole cohort), with the group size in 'Aantal';
+                      empty when no student matches.
+    """
+    selection = (
+        (cube['Schooljaar'] >= schooljaar_start) &
+        (cube['Schooljaar'] <= schooljaar_eind) &
+        (cube['Leerfase (afk)'] == leerfase)
+    )
+    first_starts = ~cube['Leerlingnummer'].where(selection).duplicated() & selection
+    starts = np.flatnonzero(first_starts.to_numpy())
+    if len(starts) == 0:
+        return pd.DataFrame()
+
+    buckets = cube['Tekortpunten_Bucket'].to_numpy(dtype=object)[starts]
+    groups = [(ALL_BUCKETS, np.ones(len(starts), dtype=bool))]
+    groups += [(str(bucket), buckets == bucket) for bucket in cube['Tekortpunten_Bucket'].cat.categories]
+
+    curves = []
+    for event in events:
+        durations, observed = event_durations(cube, student_index, starts, event)
+        for bucket, members in groups:
+            if not members.any():
+                continue
+            curve = kaplan_meier(durations[members], observed[members])
+            curve.insert(0, 'Gebeurtenis', event)
+            curve.insert(1, 'Tekortpunten_Bucket', bucket)
+            curve.insert(2, 'Aantal', int(members.sum()))
+            curves.append(curve)
+    return pd.concat(curves, ignore_index=True)
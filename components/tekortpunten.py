@@ -0,0 +1,133 @@
+import pandas as pd
+import numpy as np
+
+PROGRESSION_CATEGORIES = ['Doorstroom', 'Afstroom', 'Doublure', 'Other', 'No Data (Dropout/Missing)']
+
+
+def build_tekortpunten_index(cube):
+    """
+    Builds a cumulative-count index of one-year progression per exact number of tekortpunten.
+
+    Counts are stored per (schooljaar, leerfase, tekortpunten, category) and prefix-summed over
+    both the school years and the tekortpunten, so the counts for any year range and any
+    tekortpunten range come from four lookups instead of re-cutting or re-filtering the data.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+
+    Returns:
+        dict: With keys
+              - 'schooljaren' (list), 'leerfases' (list), 'categories' (list): the axis labels,
+              - 'max_tekortpunten' (int): the highest tekortpunten value in the data,
+              - 'cumulative' (np.ndarray): prefix sums with shape
+                (n_schooljaren + 1, n_leerfases, max_tekortpunten + 2, n_categories).
+    """
+    transitions = cube[cube['consecutive_1'] & cube['Leerfase (afk)'].notna() & cube['Tekortpunten'].notna()]
+
+    schooljaren = sorted(cube['Schooljaar'].unique().tolist())
+    leerfases = sorted(cube['Leerfase (afk)'].dropna().unique().tolist())
+    categories = PROGRESSION_CATEGORIES
+    max_tekortpunten = int(cube['Tekortpunten'].max())
+
+    counts = np.zeros((len(schooljaren), len(leerfases), max_tekortpunten + 1, len(categories)), dtype=np.int64)
+    np.add.at(counts, (
+        pd.Index(schooljaren).get_indexer(transitions['Schooljaar']),
+        pd.Index(leerfases).get_indexer(transitions['Leerfase (afk)']),
+        transitions['Tekortpunten'].astype(int).to_numpy(),
+        pd.Index(categories).get_indexer(transitions['Progression']),
+    ), 1)
+
+    cumulative = np.zeros((len(schooljaren) + 1, len(leerfases), max_tekortpunten + 2, len(categories)),
+                          dtype=np.int64)
+    cumulative[1:, :, 1:, :] = counts.cumsum(axis=0).cumsum(axis=2)
+
+    return {
+        'schooljaren': schooljaren,
+        'leerfases': leerfases,
+        'categories': categories,
+        'max_tekortpunten': max_tekortpunten,
+        'cumulative': cumulative,
+    }
+
+
+def _range_counts(index, schooljaar_start, schooljaar_eind, leerfase, tekortpunten_low, tekortpunten_high):
+    """Category counts for a school year range and an array of inclusive tekortpunten ranges."""
+    schooljaren = index['schooljaren']
+    year_low = np.searchsorted(schooljaren, schooljaar_start, side='left')
+    year_high = np.searchsorted(schooljaren, schooljaar_eind, side='right')
+    if leerfase not in index['leerfases'] or year_high <= year_low:
+        return np.zeros((len(np.atleast_1d(tekortpunten_low)), len(index['categories'])), dtype=np.int64)
+
+    cumulative = index['cumulative'][:, index['leerfases'].index(leerfase)]
+    low = np.clip(np.atleast_1d(tekortpunten_low), 0, index['max_tekortpunten'] + 1)
+    high = np.clip(np.atleast_1d(tekortpunten_high) + 1, 0, index['max_tekortpunten'] + 1)
+    return (cumulative[year_high, high] - cumulative[year_low, high]
+            - cumulative[year_high, low] + cumulative[year_low, low])
+
+
+def _rates_table(counts, labels, categories, label_name):
+    table = pd.DataFrame(counts, index=pd.Index(labels, name=label_name), columns=categories)
+    totals = table.sum(axis=1)
+    rates = table.div(totals.where(totals > 0), axis=0).mul(100).round(1)
+    rates.columns = [f'{category} (%)' for category in categories]
+    return pd.concat([totals.rename('Aantal'), rates], axis=1)
+
+
+def rates_per_tekortpunt(index, schooljaar_start, schooljaar_eind, leerfase):
+    """
+    One-year progression rates for every exact number of tekortpunten.
+
+    Args:
+        index (dict): Output of build_tekortpunten_index.
+        schooljaar_start (int): The starting school year (inclusive).
+        schooljaar_eind (int): The ending school year (inclusive).
+        leerfase (str): The 'Leerfase (afk)' to start from.
+
+    Returns:
+        pd.DataFrame: 'Aantal' and a percentage per category, indexed by 'Tekortpunten'
+                      (only values that occur in the selection).
+    """
+    values = np.arange(index['max_tekortpunten'] + 1)
+    counts = _range_counts(index, schooljaar_start, schooljaar_eind, leerfase, values, values)
+    table = _rates_table(counts, values, index['categories'], 'Tekortpunten')
+    return table[table['Aantal'] > 0]
+
+
+def rates_per_bucket(index, schooljaar_start, schooljaar_eind, leerfase, bucket_starts):
+    """
+    One-year progression rates for any bucket scheme, e.g. [0, 4, 7, 10] for 0-3 / 4-6 / 7-9 / 10+.
+
+    Args:
+        index (dict): Output of build_tekortpunten_index.
+        schooljaar_start (int): The starting school year (inclusive).
+        schooljaar_eind (int): The ending school year (inclusive).
+        leerfase (str): The 'Leerfase (afk)' to start from.
+        bucket_starts (list): Ascending lowest tekortpunten value of every bucket; the last bucket is open-ended.
+
+    Returns:
+        pd.DataFrame: 'Aantal' and a percentage per category, indexed by bucket label.
+    """
+    low = np.asarray(bucket_starts, dtype=int)
+    high = np.append(low[1:] - 1, index['max_tekortpunten'])
+    labels = [f'{l}-{h}' for l, h in zip(low[:-1], high[:-1])] + [f'{low[-1]}+']
+    counts = _range_counts(index, schooljaar_start, schooljaar_eind, leerfase, low, high)
+    return _rates_table(counts, labels, index['categories'], 'Tekortpunten')
+
+
+def rates_by_threshold(index, schooljaar_start, schooljaar_eind, leerfase, threshold):
+    """
+    One-year progression rates at most versus above a tekortpunten threshold (e.g. a promotion norm).
+
+    Args:
+        index (dict): Output of build_tekortpunten_index.
+        schooljaar_start (int): The starting school year (inclusive).
+        schooljaar_eind (int): The ending school year (inclusive).
+        leerfase (str): The 'Leerfase (afk)' to start from.
+        threshold (int): Highest number of tekortpunten in the first group.
+
+    Returns:
+        pd.DataFrame: 'Aantal' and a percentage per category for '<= threshold' and '> threshold'.
+    """
+    counts = _range_counts(index, schooljaar_start, schooljaar_eind, leerfase,
+                           [0, threshold + 1], [threshold, index['max_tekortpunten']])
+    return _rates_table(counts, [f'<= {threshold}', f'> {threshold}'], index['categories'], 'Tekortpunten')
@@ -0,0 +1,198 @@
+import pandas as pd
+import numpy as np
+import os
+
+from components.doorstroom_functions import (
+    classify_progression,
+    source_progression,
+    _progression_table,
+    _add_transition_paths,
+)
+
+DATA_FILE_PATH = 'updated_df.xlsx'
+YEARS_AHEAD = 3
+YEARS_BACK = 3
+# Herkomst of a row without a previous school year, in the data or in 'Leerfase (afk) vorig schooljaar'
+NIEUWE_INSTROOM = 'Nieuwe instroom'
+
+# Same buckets as the analysis pages use for 'Tekortpunten_Bucket'
+TEKORTPUNTEN_BINS = [-1, 3, 6, 9, np.inf]
+TEKORTPUNTEN_LABELS = ['0-3', '4-6', '7-9', '10+']
+
+# Outcome labels that are valid values of 'Leerfase (afk)' without a numeric level
+STATUS_LABELS = ['Geslaagd', 'VO verlater', 'Afstroom', 'Afgewezen', 'Doorstroom', 'Doublure', 'Opstroom', 'MBO', 'VAVO']
+
+
+def read_dataset(file_path=DATA_FILE_PATH):
+    """
+    Reads the doorstroom dataset without Streamlit, applying the same preparation as the pages' load_data.
+
+    Args:
+        file_path (str): Path to the Excel export (defaults to 'updated_df.xlsx').
+
+    Returns:
+        pd.DataFrame: The dataset with an int 'Schooljaar', a datetime 'Inschrijvingsdatum'
+                      and a 'Tekortpunten_Bucket' column.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Data file not found at {file_path}.")
+
+    df = pd.read_excel(file_path)
+    df['Schooljaar'] = df['Schooljaar'].astype(int)
+    df['Inschrijvingsdatum'] = pd.to_datetime(df['Inschrijvingsdatum'])
+    df['Tekortpunten_Bucket'] = pd.cut(df['Tekortpunten'], bins=TEKORTPUNTEN_BINS, labels=TEKORTPUNTEN_LABELS,
+                                       right=True, include_lowest=True)
+    return df
+
+
+def build_transition_cube(df, years_ahead=YEARS_AHEAD, years_back=YEARS_BACK):
+    """
+    Precomputes the forward trajectory and the herkomst of every student-year row once, in the same
+    pass, so flow tables (outflow and inflow) become plain filters and group-bys instead of
+    per-query groupby shifts.
+
+    Args:
+        df (pd.DataFrame): The prepared dataset (see read_dataset).
+        years_ahead (int): Number of school years to look ahead (defaults to 3).
+        years_back (int): Number of school years to look back (defaults to 3).
+
+    Returns:
+        pd.DataFrame: The dataset sorted by 'Leerlingnummer' and 'Schooljaar' with added columns
+                      'next_leerfase_k', 'next_schooljaar_k' and 'consecutive_k' for k = 1..years_ahead,
+                      'Progression' (one-year category of classify_progression, NaN without a consecutive
+                      next year), 'Progression (bron)' (the same with the source label first, see
+                      reconciled_progression),
+                      'Transition' (the three-year path string), and 'prev_leerfase_k',
+                      'prev_schooljaar_k' and 'prev_consecutive_k' for k = 1..years_back with the
+                      herkomst columns of _add_herkomst.
+    """
+    cube = df.sort_values(by=['Leerlingnummer', 'Schooljaar']).reset_index(drop=True)
+    grouped = cube.groupby('Leerlingnummer')
+
+    consecutive = pd.Series(True, index=cube.index)
+    for k in range(1, years_ahead + 1):
+        cube[f'next_leerfase_{k}'] = grouped['Leerfase (afk)'].shift(-k)
+        cube[f'next_schooljaar_{k}'] = grouped['Schooljaar'].shift(-k)
+        consecutive = consecutive & (cube[f'next_schooljaar_{k}'] == cube['Schooljaar'] + k)
+        cube[f'consecutive_{k}'] = consecutive
+
+    consecutive = pd.Series(True, index=cube.index)
+    for k in range(1, years_back + 1):
+        cube[f'prev_leerfase_{k}'] = grouped['Leerfase (afk)'].shift(k)
+        cube[f'prev_schooljaar_{k}'] = grouped['Schooljaar'].shift(k)
+        consecutive = consecutive & (cube[f'prev_schooljaar_{k}'] == cube['Schooljaar'] - k)
+        cube[f'prev_consecutive_{k}'] = consecutive
+
+    computed = pd.Series(classify_progression(cube['Leerfase (afk)'], cube['next_leerfase_1']), index=cube.index)
+    cube['Progression'] = computed.where(cube['consecutive_1'])
+    # The source-first view, for use_source_label and components/label_reconciliation.py
+    cube['Progression (bron)'] = source_progression(cube['Doorstroom']).fillna(computed).where(cube['consecutive_1'])
+
+    if years_ahead >= 3:
+        cube = _add_transition_paths(cube)
+    if years_back >= 1:
+        _add_herkomst(cube, years_back)
+
+    return cube
+
+
+def _add_herkomst(cube, years_back):
+    """
+    Adds the herkomst of every row:
+        - 'Vorige leerfase': the leerfase one school year earlier; from 'Leerfase (afk) vorig schooljaar'
+          when the data has no previous year (e.g. in its first school year).
+        - 'Herkomst': the one-year category of the step into this leerfase (see classify_progression),
+          or NIEUWE_INSTROOM without a previous leerfase.
+        - 'Herkomstpad': the consecutive previous leerfases up to years_back years, e.g. 'h3 -> h4 -> h5 [0-3]'.
+    """
+    vorige_leerfase = cube['prev_leerfase_1'].where(cube['prev_consecutive_1'])
+    cube['Vorige leerfase'] = vorige_leerfase.fillna(cube['Leerfase (afk) vorig schooljaar']).astype(object)
+
+    herkomst = pd.Series(classify_progression(cube['Vorige leerfase'], cube['Leerfase (afk)']), index=cube.index)
+    cube['Herkomst'] = herkomst.where(cube['Vorige leerfase'].notna(), NIEUWE_INSTROOM)
+
+    path = cube['Leerfase (afk)'].astype(str) + ' [' + cube['Tekortpunten_Bucket'].astype(str) + ']'
+    for k in range(1, years_back + 1):
+        step = cube[f'prev_leerfase_{k}'].where(cube[f'prev_consecutive_{k}'])
+        path = (step + ' -> ').fillna('') + path
+    cube['Herkomstpad'] = path
+
+
+def _starting_rows(cube, schooljaar_start, schooljaar_eind, leerfase_start):
+    return cube[
+        (cube['Schooljaar'] >= schooljaar_start) &
+        (cube['Schooljaar'] <= schooljaar_eind) &
+        (cube['Leerfase (afk)'] == leerfase_start)
+    ]
+
+
+def one_year_flow_table(cube, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None,
+                        use_source_label=False):
+    """
+    Same table as analyze_next_leerfase, read from the precomputed transition cube.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        schooljaar_start (int): The starting school year (inclusive) for the analysis.
+        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
+        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
+        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
+                                                   Defaults to None (all buckets).
+        use_source_label (bool): Count the 'Progression (bron)' categories, with the source 'Doorstroom'
+                                 label first, instead of the computed ones.
+
+    Returns:
+        pd.DataFrame: 'Aantallen' and 'Percentage' per progression category
+                      (empty with those columns if no students match the criteria).
+    """
+    starting_rows = _starting_rows(cube, schooljaar_start, schooljaar_eind, leerfase_start)
+
+    relevant_students = starting_rows
+    if tekortpunten_bucket_filter is not None and len(tekortpunten_bucket_filter) > 0:
+        relevant_students = starting_rows[starting_rows['Tekortpunten_Bucket'].isin(tekortpunten_bucket_filter)]
+
+    transitions_df = starting_rows[
+        starting_rows['Leerlingnummer'].isin(relevant_students['Leerlingnummer'].unique()) &
+        starting_rows['consecutive_1']
+    ]
+
+    if transitions_df.empty:
+        return pd.DataFrame(columns=['Aantallen', 'Percentage'])
+
+    if use_source_label:
+        transitions_df = transitions_df.assign(Progression=transitions_df['Progression (bron)'])
+    return _progression_table(transitions_df)
+
+
+def three_year_flow_counts(cube, schooljaar_start, schooljaar_eind, leerfase_start,
+                           leerlingnummer_filter=None, tekortpunten_bucket_filter=None):
+    """
+    Same counts as analyze_three_year_leerfase_transitions, read from the precomputed transition cube.
+
+    Args:
+        cube (pd.DataFrame): Output of build_transition_cube.
+        schooljaar_start (int): The starting school year (inclusive) for the analysis.
+        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
+        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
+        leerlingnummer_filter (int or list, optional): A single 'Leerlingnummer' or a list of 'Leerlingnummer's
+                                                       to filter the analysis. Defaults to None (all students).
+        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
+                                                   Defaults to None (all buckets).
+
+    Returns:
+        pd.Series: A Series with three-year transition strings as index and counts as values.
+    """
+    transitions_df = _starting_rows(cube, schooljaar_start, schooljaar_eind, leerfase_start)
+
+    if leerlingnummer_filter is not None:
+        if isinstance(leerlingnummer_filter, int):
+            leerlingnummer_filter = [leerlingnummer_filter]
+        transitions_df = transitions_df[transitions_df['Leerlingnummer'].isin(leerlingnummer_filter)]
+
+    if tekortpunten_bucket_filter is not None and len(tekortpunten_bucket_filter) > 0:
+        transitions_df = transitions_df[transitions_df['Tekortpunten_Bucket'].isin(tekortpunten_bucket_filter)]
+
+    if transitions_df.empty:
+        return pd.Series([], dtype=int)
+
+    return transitions_df['Transition'].value_counts()
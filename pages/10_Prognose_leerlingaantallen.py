@@ -0,0 +1,107 @@
+import streamlit as st
+from components.cached_data import load_snapshot, load_transition_cube
+from components.data_store import partition_token
+from components.metrics import instrumented_cache
+from components.forecast import forecast_cohorts, transition_schooljaren
+
+# --- Streamlit App Layout ---
+st.set_page_config(page_title="Prognose leerlingaantallen", page_icon="📈", layout="wide")
+st.markdown(
+    """
+    <style>
+    .card-link {
+        text-decoration: none;
+    }
+
+    .card {
+        padding: 1.6rem;
+        border-radius: 18px;
+        height: 100%;
+        box-shadow: 0 4px 14px rgba(0,0,0,0.08);
+        transition: all 0.2s ease;
+        border: 1px solid rgba(0,0,0,0.05);
+    }
+
+    .card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 8px 22px rgba(0,0,0,0.12);
+    }
+
+    .card h3 {
+        margin-top: 0;
+        margin-bottom: 0.6rem;
+        font-size: 1.15rem;
+    }
+
+    .card p {
+        margin: 0;
+        font-size: 0.95rem;
+        line-height: 1.4;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("Prognose leerlingaantallen")
+st.write("De prognose gebruikt de eenjaars overgangen uit de gekozen schooljaren als kansen (Markov-keten) "
+         "en rekent de huidige aantallen per leerfase 1 tot 5 jaar vooruit. Nieuwe instroom is niet meegenomen. "
+         "De onder- en bovengrens zijn een 95%-bootstrap interval.")
+
+updated_cube = load_transition_cube()
+all_schoolyears = sorted(updated_cube['Schooljaar'].unique().tolist())
+transition_years = transition_schooljaren(updated_cube)
+
+
+@instrumented_cache(st.cache_data)
+def cached_forecast(_cube, schooljaar_start, schooljaar_eind, schooljaar_basis, years, data_token):
+    # _cube is not hashed: data_token hashes the transition years (and the year each leads to) and the
+    # basis year, so a reloaded dataset only reruns the forecast when one of those school years changed
+    return forecast_cohorts(_cube, schooljaar_start, schooljaar_eind,
+                            schooljaar_basis=schooljaar_basis, years=years, seed=0)
+
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    schooljaar_start = st.selectbox("Overgangen vanaf schooljaar:", options=transition_years,
+                                    index=max(0, len(transition_years) - 3))
+with col2:
+    # Up to the last school year whose next year still has students in a class
+    schooljaar_eind = st.selectbox("Tot en met schooljaar:", options=transition_years,
+                                   index=max(0, len(transition_years) - 1))
+with col3:
+    # The last school year in the data only holds the outcome of the year before (Doorstroom, Geslaagd, ...)
+    schooljaar_basis = st.selectbox("Aantallen van schooljaar:", options=all_schoolyears,
+                                    index=max(0, len(all_schoolyears) - 2))
+with col4:
+    years = st.slider("Jaren vooruit:", min_value=1, max_value=5, value=3)
+
+if schooljaar_start > schooljaar_eind:
+    st.error("Start Schooljaar cannot be after End Schooljaar.")
+    st.stop()
+
+snapshot = load_snapshot()
+data_token = (partition_token(snapshot, schooljaar_start, schooljaar_eind, years_ahead=1) +
+              partition_token(snapshot, schooljaar_basis, schooljaar_basis, years_ahead=0))
+forecast = cached_forecast(updated_cube, schooljaar_start, schooljaar_eind, schooljaar_basis, years, data_token)
+
+leerfases = sorted(forecast['Leerfase (afk)'].unique().tolist())
+selected_leerfases = st.multiselect("Leerfases:", options=leerfases,
+                                    default=[l for l in ['h4', 'h5', 'v5', 'v6'] if l in leerfases])
+if selected_leerfases:
+    forecast = forecast[forecast['Leerfase (afk)'].isin(selected_leerfases)]
+
+st.write("#### Verwacht aantal leerlingen")
+st.dataframe(forecast.pivot(index='Leerfase (afk)', columns='Schooljaar', values='Verwacht').round(0))
+st.write("#### Met interval")
+st.dataframe(forecast.round(1), hide_index=True)
+
+st.markdown(
+        """
+        <a class="card-link" href="/" target="_self">
+            <div class="card" style="background-color:#F8FAFC;">
+                <h3>Terug naar start</h3>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
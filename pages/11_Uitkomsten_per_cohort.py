@@ -0,0 +1,82 @@
+import streamlit as st
+from components.cached_data import load_outcome_waterfall
+from components.outcomes import cohort_waterfall
+
+# --- Streamlit App Layout ---
+st.set_page_config(page_title="Uitkomsten per cohort", page_icon="📈", layout="wide")
+st.markdown(
+    """
+    <style>
+    .card-link {
+        text-decoration: none;
+    }
+
+    .card {
+        padding: 1.6rem;
+        border-radius: 18px;
+        height: 100%;
+        box-shadow: 0 4px 14px rgba(0,0,0,0.08);
+        transition: all 0.2s ease;
+        border: 1px solid rgba(0,0,0,0.05);
+    }
+
+    .card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 8px 22px rgba(0,0,0,0.12);
+    }
+
+    .card h3 {
+        margin-top: 0;
+        margin-bottom: 0.6rem;
+        font-size: 1.15rem;
+    }
+
+    .card p {
+        margin: 0;
+        font-size: 0.95rem;
+        line-height: 1.4;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("Uitkomsten per instroomcohort")
+st.write("Voor alle leerlingen die in een schooljaar in een leerfase zitten (het cohort) staat hieronder welk deel "
+         "binnen 1 tot 5 jaar geslaagd is, gedoubleerd heeft, afgestroomd is, naar het MBO is gegaan of de school "
+         "heeft verlaten. De percentages tellen op over de jaren; een leerling kan in meer dan één kolom tellen "
+         "(bijvoorbeeld eerst doublure, daarna geslaagd). Een leeg vak betekent dat de data nog niet zo ver reikt.")
+
+waterfall = load_outcome_waterfall()
+all_leerfases = sorted(waterfall['Leerfase (afk)'].unique().tolist())
+all_schoolyears = sorted(waterfall['Schooljaar'].unique().tolist())
+
+col1, col2 = st.columns(2)
+with col1:
+    leerfase = st.selectbox("Leerfase van het cohort:", options=all_leerfases,
+                            index=all_leerfases.index('h5') if 'h5' in all_leerfases else 0)
+with col2:
+    jaren = st.slider("Binnen aantal jaar:", min_value=1, max_value=int(waterfall['Jaren'].max()), value=2)
+
+st.write(f"#### Cohorten {leerfase}, uitkomst binnen {jaren} jaar")
+cohorts = waterfall[(waterfall['Leerfase (afk)'] == leerfase) & (waterfall['Jaren'] == jaren)]
+st.dataframe(cohorts.drop(columns=['Leerfase (afk)', 'Jaren']).set_index('Schooljaar'))
+
+schooljaar = st.selectbox("Verloop van het cohort uit schooljaar:", options=all_schoolyears,
+                          index=max(0, len(all_schoolyears) - 5))
+verloop = cohort_waterfall(waterfall, leerfase, schooljaar)
+if verloop.empty:
+    st.info("Geen leerlingen in deze leerfase in dit schooljaar.")
+else:
+    st.line_chart(verloop.rename(columns=lambda column: column.replace(' (%)', '')))
+    st.dataframe(verloop)
+
+st.markdown(
+        """
+        <a class="card-link" href="/" target="_self">
+            <div class="card" style="background-color:#F8FAFC;">
+                <h3>Terug naar start</h3>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
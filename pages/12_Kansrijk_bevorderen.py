@@ -0,0 +1,96 @@
+import streamlit as st
+from components.cached_data import load_matching_index
+from components.kansrijk import matched_comparison
+
+# --- Streamlit App Layout ---
+st.set_page_config(page_title="Kansrijk bevorderen", page_icon="📈", layout="wide")
+st.markdown(
+    """
+    <style>
+    .card-link {
+        text-decoration: none;
+    }
+
+    .card {
+        padding: 1.6rem;
+        border-radius: 18px;
+        height: 100%;
+        box-shadow: 0 4px 14px rgba(0,0,0,0.08);
+        transition: all 0.2s ease;
+        border: 1px solid rgba(0,0,0,0.05);
+    }
+
+    .card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 8px 22px rgba(0,0,0,0.12);
+    }
+
+    .card h3 {
+        margin-top: 0;
+        margin-bottom: 0.6rem;
+        font-size: 1.15rem;
+    }
+
+    .card p {
+        margin: 0;
+        font-size: 0.95rem;
+        line-height: 1.4;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("Effect van kansrijk bevorderen")
+st.write("Leerlingen die met tekortpunten bevorderd zijn, worden vergeleken met doublanten uit dezelfde leerfase "
+         "die even veel tekortpunten hadden en uit dezelfde vorige leerfase kwamen (gematchte groepen, over alle "
+         "gekozen schooljaren). Alleen groepjes waarin beide soorten leerlingen voorkomen tellen mee; de doublanten "
+         "wegen mee naar het aantal bevorderde leerlingen in hun groepje. Het verschil is zo een schatting van het "
+         "effect van bevorderen voor leerlingen zoals de bevorderde leerlingen.")
+
+matching_index = load_matching_index()
+all_leerfases = sorted(matching_index['Leerfase (afk)'].unique().tolist())
+all_schoolyears = sorted(matching_index['Schooljaar'].unique().tolist())
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    leerfase = st.selectbox("Leerfase van het besluit:", options=all_leerfases,
+                            index=all_leerfases.index('h4') if 'h4' in all_leerfases else 0)
+    min_tekortpunten = st.number_input("Minimaal aantal tekortpunten:", min_value=0, value=3)
+with col2:
+    schooljaar_start = st.selectbox("Besluiten vanaf schooljaar:", options=all_schoolyears, index=0)
+    schooljaar_eind = st.selectbox("Tot en met schooljaar:", options=all_schoolyears,
+                                   index=len(all_schoolyears) - 1)
+with col3:
+    horizon = st.slider("Uitkomst binnen aantal jaar:", min_value=1, max_value=5, value=3)
+    tekortpunten_width = st.selectbox("Tekortpunten matchen per:", options=[1, 2, 3], index=0)
+
+if schooljaar_start > schooljaar_eind:
+    st.error("Start Schooljaar cannot be after End Schooljaar.")
+    st.stop()
+
+summary, strata = matched_comparison(matching_index, leerfase, schooljaar_start, schooljaar_eind, horizon=horizon,
+                                     min_tekortpunten=min_tekortpunten, tekortpunten_width=tekortpunten_width)
+if summary.empty:
+    st.info("Geen vergelijkbare bevorderde leerlingen en doublanten gevonden voor deze selectie. "
+            "Kies meer schooljaren, minder tekortpunten of een kortere termijn.")
+else:
+    matched = strata[strata['Gematcht']]
+    st.write(f"#### Uitkomsten binnen {horizon} jaar")
+    st.caption(f"Gematcht: {matched['Bevorderd'].sum()} bevorderde leerlingen en {matched['Doublure'].sum()} "
+               f"doublanten in {len(matched)} groepjes. Niet gematcht: "
+               f"{strata.loc[~strata['Gematcht'], 'Bevorderd'].sum()} bevorderde leerlingen en "
+               f"{strata.loc[~strata['Gematcht'], 'Doublure'].sum()} doublanten.")
+    st.dataframe(summary)
+    with st.expander("Groepjes (vorige leerfase en tekortpunten)"):
+        st.dataframe(strata, hide_index=True)
+
+st.markdown(
+        """
+        <a class="card-link" href="/" target="_self">
+            <div class="card" style="background-color:#F8FAFC;">
+                <h3>Terug naar start</h3>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
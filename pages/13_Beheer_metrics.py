@@ -0,0 +1,88 @@
+import streamlit as st
+from components.cached_data import load_snapshot
+from components.metrics import METRICS_PORT_ENV_VAR, cache_table, latency_table, prometheus_text
+
+# Not linked from the start page: open it with /Beheer_metrics
+st.set_page_config(page_title="Beheer: metrics", page_icon="📈", layout="wide")
+st.markdown(
+    """
+    <style>
+    .card-link {
+        text-decoration: none;
+    }
+
+    .card {
+        padding: 1.6rem;
+        border-radius: 18px;
+        height: 100%;
+        box-shadow: 0 4px 14px rgba(0,0,0,0.08);
+        transition: all 0.2s ease;
+        border: 1px solid rgba(0,0,0,0.05);
+    }
+
+    .card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 8px 22px rgba(0,0,0,0.12);
+    }
+
+    .card h3 {
+        margin-top: 0;
+        margin-bottom: 0.6rem;
+        font-size: 1.15rem;
+    }
+
+    .card p {
+        margin: 0;
+        font-size: 0.95rem;
+        line-height: 1.4;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("Beheer: caches en rekentijden")
+st.write("Cijfers van dit serverproces sinds de start, om de servers op de juiste maat te kiezen. "
+         f"Met {METRICS_PORT_ENV_VAR} ingesteld zijn ze ook als Prometheus-tekst op te halen via /metrics op die poort. "
+         "De st.cache_data-functies van de pagina's staan er onder hun eigen naam bij; "
+         "Streamlits eigen /_stcore/metrics geeft alleen hun geheugen.")
+
+snapshot = load_snapshot()
+caches = cache_table()
+dataset = caches.set_index('Cache').reindex(['dataset'])
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Dataset in geheugen (MB)", round((dataset['Bytes'].iloc[0] or 0) / 1e6, 1))
+with col2:
+    st.metric("Rijen in de dataset", len(snapshot['df']))
+with col3:
+    st.metric("Versie van de dataset", snapshot['version'])
+
+st.write("#### Caches")
+st.dataframe(caches, hide_index=True)
+st.caption("Entries en Bytes zijn de huidige stand; de rest telt op sinds de start van het proces. "
+           "analysis_results telt de resultaten van alle open sessies samen.")
+
+st.write("#### Rekentijd per functie")
+latencies = latency_table()
+if latencies.empty:
+    st.info("Er is nog niets berekend in dit proces.")
+else:
+    st.dataframe(latencies, hide_index=True)
+    st.caption("De kolommen '<= s' tellen het aantal aanroepen dat binnen zoveel seconden klaar was (cumulatief).")
+
+with st.expander("Prometheus-tekst"):
+    metrics_text = prometheus_text()
+    st.code(metrics_text, language='text')
+    st.download_button("Download metrics.txt", metrics_text, file_name='metrics.txt', mime='text/plain')
+
+st.markdown(
+        """
+        <a class="card-link" href="/" target="_self">
+            <div class="card" style="background-color:#F8FAFC;">
+                <h3>Terug naar start</h3>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
@@ -0,0 +1,93 @@
+import streamlit as st
+from components.cached_data import load_transition_cube
+from components.doorstroom_functions import counts_with_percentages
+from components.herkomst import inflow_tables, herkomst_path_counts
+
+# --- Streamlit App Layout ---
+st.set_page_config(page_title="Herkomst", page_icon="🧭", layout="wide")
+st.markdown(
+    """
+    <style>
+    .card-link {
+        text-decoration: none;
+    }
+
+    .card {
+        padding: 1.6rem;
+        border-radius: 18px;
+        height: 100%;
+        box-shadow: 0 4px 14px rgba(0,0,0,0.08);
+        transition: all 0.2s ease;
+        border: 1px solid rgba(0,0,0,0.05);
+    }
+
+    .card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 8px 22px rgba(0,0,0,0.12);
+    }
+
+    .card h3 {
+        margin-top: 0;
+        margin-bottom: 0.6rem;
+        font-size: 1.15rem;
+    }
+
+    .card p {
+        margin: 0;
+        font-size: 0.95rem;
+        line-height: 1.4;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("Herkomst van leerlingen")
+st.write("Waar kwamen de leerlingen van een leerfase vandaan? Per leerling staat de leerfase van het schooljaar "
+         "ervoor; is dat schooljaar niet in de data, dan de leerfase vorig schooljaar uit de bron. De herkomst is "
+         "de overgang naar deze leerfase: doorstroom, doublure, afstroom of opstroom. Leerlingen zonder vorige "
+         "leerfase tellen als nieuwe instroom.")
+
+cube = load_transition_cube()
+all_leerfases = sorted(cube['Leerfase (afk)'].dropna().unique().tolist())
+all_schoolyears = sorted(cube['Schooljaar'].unique().tolist())
+all_buckets = sorted(cube['Tekortpunten_Bucket'].dropna().unique().tolist())
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    leerfase = st.selectbox("Leerfase:", options=all_leerfases,
+                            index=all_leerfases.index('h5') if 'h5' in all_leerfases else 0)
+with col2:
+    schooljaar_start, schooljaar_eind = st.select_slider("Schooljaren:", options=all_schoolyears,
+                                                         value=(all_schoolyears[0], all_schoolyears[-1]))
+with col3:
+    tekortpunten_buckets = st.multiselect("Tekortpunten (leeg = alle):", options=all_buckets)
+
+per_leerfase, per_herkomst = inflow_tables(cube, schooljaar_start, schooljaar_eind, leerfase, tekortpunten_buckets)
+if per_leerfase.empty:
+    st.info("Geen leerlingen in deze leerfase met deze selectie.")
+else:
+    st.write(f"#### {int(per_leerfase['Aantal'].sum())} leerlingen in {leerfase}, "
+             f"schooljaar {schooljaar_start} t/m {schooljaar_eind}")
+    col4, col5 = st.columns(2)
+    with col4:
+        st.write("Per vorige leerfase")
+        st.dataframe(per_leerfase)
+    with col5:
+        st.write("Per soort overgang")
+        st.dataframe(per_herkomst)
+        st.bar_chart(per_herkomst['Aantal'])
+
+    st.write("#### Meest voorkomende paden (tot drie jaar terug)")
+    paden = herkomst_path_counts(cube, schooljaar_start, schooljaar_eind, leerfase, tekortpunten_buckets)
+    st.dataframe(counts_with_percentages(paden).head(20))
+
+st.markdown(
+        """
+        <a class="card-link" href="/" target="_self">
+            <div class="card" style="background-color:#F8FAFC;">
+                <h3>Terug naar start</h3>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
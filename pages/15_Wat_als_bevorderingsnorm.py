@@ -0,0 +1,128 @@
+import streamlit as st
+import pandas as pd
+from components.cached_data import load_snapshot, load_transition_cube
+from components.data_store import partition_token
+from components.metrics import instrumented_cache
+from components.forecast import transition_schooljaren
+from components.policy_simulation import N_TRAJECTORIES, SIMULATION_YEARS, policy_what_if
+
+# --- Streamlit App Layout ---
+st.set_page_config(page_title="Wat als: bevorderingsnorm", page_icon="🎲", layout="wide")
+st.markdown(
+    """
+    <style>
+    .card-link {
+        text-decoration: none;
+    }
+
+    .card {
+        padding: 1.6rem;
+        border-radius: 18px;
+        height: 100%;
+        box-shadow: 0 4px 14px rgba(0,0,0,0.08);
+        transition: all 0.2s ease;
+        border: 1px solid rgba(0,0,0,0.05);
+    }
+
+    .card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 8px 22px rgba(0,0,0,0.12);
+    }
+
+    .card h3 {
+        margin-top: 0;
+        margin-bottom: 0.6rem;
+        font-size: 1.15rem;
+    }
+
+    .card p {
+        margin: 0;
+        font-size: 0.95rem;
+        line-height: 1.4;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("Wat als: bevorderingsnorm")
+st.write("Wat gebeurt er met doublure, afstroom en slagen als de school een harde norm invoert, bijvoorbeeld "
+         "\"bevorderd met maximaal 6 tekortpunten\"? De simulatie trekt elk jaar een overgang uit de leerlingen "
+         "met dezelfde leerfase en tekortpunten in de gekozen schooljaren. Met de norm wordt elke "
+         "bevorderingsbeslissing vervangen: wie binnen de norm valt gaat over, de rest niet (doublure of "
+         "afstroom zoals die historisch voorkwam). Examenjaren en vertrek blijven zoals ze waren. "
+         f"Per scenario worden {N_TRAJECTORIES:_} leerlingtrajecten gesimuleerd.".replace('_', '.'))
+
+updated_cube = load_transition_cube()
+# Years whose next year still has students in a class; later transitions only lead to status labels
+transition_years = transition_schooljaren(updated_cube)
+all_leerfases = sorted(updated_cube['Leerfase (afk)'].dropna().unique().tolist())
+
+
+@instrumented_cache(st.cache_data)
+def cached_what_if(_cube, schooljaar_start, schooljaar_eind, leerfase, max_tekortpunten, years, data_token):
+    # _cube is not hashed. Both scenarios are drawn from the transitions of the window alone: data_token
+    # hashes those school years and the year after, so new data for other years keeps the simulation
+    return policy_what_if(_cube, schooljaar_start, schooljaar_eind, leerfase, max_tekortpunten,
+                          years=years, seed=0)
+
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    leerfase = st.selectbox("Leerfase:", options=all_leerfases,
+                            index=all_leerfases.index('h4') if 'h4' in all_leerfases else 0)
+with col2:
+    schooljaar_start = st.selectbox("Overgangen vanaf schooljaar:", options=transition_years, index=0)
+with col3:
+    schooljaar_eind = st.selectbox("Tot en met schooljaar:", options=transition_years,
+                                   index=len(transition_years) - 1)
+
+col4, col5 = st.columns(2)
+with col4:
+    max_tekortpunten = st.slider("Norm: bevorderd met maximaal ... tekortpunten", min_value=0,
+                                 max_value=int(updated_cube['Tekortpunten'].max()), value=6)
+with col5:
+    years = st.slider("Jaren vooruit:", min_value=1, max_value=SIMULATION_YEARS, value=SIMULATION_YEARS)
+
+if schooljaar_start > schooljaar_eind:
+    st.error("Start Schooljaar cannot be after End Schooljaar.")
+    st.stop()
+
+data_token = partition_token(load_snapshot(), schooljaar_start, schooljaar_eind, years_ahead=1)
+what_if = cached_what_if(updated_cube, schooljaar_start, schooljaar_eind, leerfase, max_tekortpunten, years, data_token)
+
+if what_if['cohort'] == 0:
+    st.info("Geen leerlingen in deze leerfase in deze schooljaren.")
+else:
+    col6, col7 = st.columns(2)
+    col6.metric("Leerlingen in het cohort", what_if['cohort'])
+    col7.metric("Andere beslissing door de norm (eerste jaar)", what_if['changed'])
+
+    huidig = what_if['huidig'].set_index('Jaren')
+    norm = what_if['norm'].set_index('Jaren')
+    st.write(f"#### Na {years} jaar: huidige beslissingen tegenover de norm van maximaal {max_tekortpunten} tekortpunten")
+    vergelijking = pd.DataFrame({
+        'Huidig (%)': huidig.iloc[-1].to_numpy(),
+        'Met norm (%)': norm.iloc[-1].to_numpy(),
+    }, index=[column.replace(' (%)', '') for column in huidig.columns])
+    vergelijking['Verschil (%-punt)'] = (vergelijking['Met norm (%)'] - vergelijking['Huidig (%)']).round(1)
+    st.dataframe(vergelijking)
+
+    st.write("#### Verloop per jaar met de norm (cumulatief)")
+    st.line_chart(norm[['Geslaagd (%)', 'Doublure (%)', 'Afstroom (%)']].rename(
+        columns=lambda column: column.replace(' (%)', '')))
+    with st.expander("Alle jaren"):
+        st.write("Huidige beslissingen:")
+        st.dataframe(huidig)
+        st.write("Met de norm:")
+        st.dataframe(norm)
+
+st.markdown(
+        """
+        <a class="card-link" href="/" target="_self">
+            <div class="card" style="background-color:#F8FAFC;">
+                <h3>Terug naar start</h3>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
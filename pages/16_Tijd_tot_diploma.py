@@ -0,0 +1,121 @@
+import streamlit as st
+import pandas as pd
+from components.cached_data import load_snapshot, load_transition_cube, load_student_index
+from components.data_store import partition_token
+from components.metrics import instrumented_cache
+from components.transition_cube import STATUS_LABELS
+from components.survival import ALL_BUCKETS, SURVIVAL_EVENTS, median_time, survival_curves
+
+# --- Streamlit App Layout ---
+st.set_page_config(page_title="Tijd tot diploma", page_icon="⏱️", layout="wide")
+st.markdown(
+    """
+    <style>
+    .card-link {
+        text-decoration: none;
+    }
+
+    .card {
+        padding: 1.6rem;
+        border-radius: 18px;
+        height: 100%;
+        box-shadow: 0 4px 14px rgba(0,0,0,0.08);
+        transition: all 0.2s ease;
+        border: 1px solid rgba(0,0,0,0.05);
+    }
+
+    .card:hover {
+        transform: translateY(-3px);
+        box-shadow: 0 8px 22px rgba(0,0,0,0.12);
+    }
+
+    .card h3 {
+        margin-top: 0;
+        margin-bottom: 0.6rem;
+        font-size: 1.15rem;
+    }
+
+    .card p {
+        margin: 0;
+        font-size: 0.95rem;
+        line-height: 1.4;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("Tijd tot diploma of vertrek")
+st.write("Hoe lang duurt het tot een leerling uit een leerfase geslaagd is, of de school verlaat? De curves "
+         "(Kaplan-Meier) tellen ook leerlingen die doubleren of later afstromen. Leerlingen die nog op school "
+         "zitten, of op een andere manier vertrokken zijn, tellen mee tot het laatste schooljaar in de data; "
+         "leerlingen die zonder uitstroomlabel uit de data verdwijnen tot hun laatste schooljaar. "
+         "Het percentage is het deel van het cohort dat de gebeurtenis binnen het aantal jaren had.")
+
+updated_cube = load_transition_cube()
+all_schoolyears = sorted(updated_cube['Schooljaar'].unique().tolist())
+all_leerfases = sorted(l for l in updated_cube['Leerfase (afk)'].dropna().unique() if l not in STATUS_LABELS)
+
+
+@instrumented_cache(st.cache_data)
+def cached_survival_curves(_cube, _student_index, leerfase, schooljaar_start, schooljaar_eind, data_token):
+    # One entry per cohort definition; the cube and its index are not hashed. The students are followed
+    # until the last school year in the data, so data_token hashes every school year from schooljaar_start on
+    return survival_curves(_cube, _student_index, leerfase, schooljaar_start, schooljaar_eind)
+
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    leerfase = st.selectbox("Leerfase bij de start:", options=all_leerfases,
+                            index=all_leerfases.index('h4') if 'h4' in all_leerfases else 0)
+with col2:
+    schooljaar_start = st.selectbox("Start vanaf schooljaar:", options=all_schoolyears[:-1], index=0)
+with col3:
+    schooljaar_eind = st.selectbox("Tot en met schooljaar:", options=all_schoolyears[:-1],
+                                   index=max(0, len(all_schoolyears) - 4))
+with col4:
+    gebeurtenis = st.radio("Tijd tot:", options=SURVIVAL_EVENTS, horizontal=True)
+
+if schooljaar_start > schooljaar_eind:
+    st.error("Start Schooljaar cannot be after End Schooljaar.")
+    st.stop()
+
+data_token = partition_token(load_snapshot(), schooljaar_start, all_schoolyears[-1], years_ahead=0)
+curves = cached_survival_curves(updated_cube, load_student_index(), leerfase, schooljaar_start, schooljaar_eind, data_token)
+
+if curves.empty:
+    st.info("Geen leerlingen in deze leerfase in deze schooljaren.")
+else:
+    curves = curves[curves['Gebeurtenis'] == gebeurtenis]
+    buckets = curves['Tekortpunten_Bucket'].unique().tolist()
+    selected_buckets = st.multiselect("Tekortpunten bij de start:", options=buckets, default=buckets)
+    curves = curves[curves['Tekortpunten_Bucket'].isin(selected_buckets)]
+
+    if not curves.empty:
+        st.write(f"#### Cumulatief percentage {gebeurtenis}, leerlingen in {leerfase} "
+                 f"({schooljaar_start} t/m {schooljaar_eind})")
+        st.line_chart(curves.pivot(index='Jaren', columns='Tekortpunten_Bucket', values='Cumulatief (%)'))
+
+        samenvatting = pd.DataFrame([
+            {'Tekortpunten': bucket, 'Aantal': group['Aantal'].iloc[0],
+             'Mediane tijd (jaar)': median_time(group),
+             **{f'Binnen {jaren} jaar (%)': group.loc[group['Jaren'] == jaren, 'Cumulatief (%)'].max()
+                for jaren in [2, 3, 4]}}
+            for bucket, group in curves.groupby('Tekortpunten_Bucket', sort=False)
+        ]).set_index('Tekortpunten')
+        st.dataframe(samenvatting)
+        st.caption(f"'{ALL_BUCKETS}' is het hele cohort. Een lege mediane tijd betekent dat minder dan de helft "
+                   f"de gebeurtenis had binnen de gevolgde jaren.")
+
+        with st.expander("Tabel met aantallen en 95%-interval"):
+            st.dataframe(curves.drop(columns=['Gebeurtenis']), hide_index=True)
+
+st.markdown(
+        """
+        <a class="card-link" href="/" target="_self">
+            <div class="card" style="background-color:#F8FAFC;">
+                <h3>Terug naar start</h3>
+        </a>
+        """,
+        unsafe_allow_html=True
+    )
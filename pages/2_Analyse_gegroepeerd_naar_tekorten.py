@@ -1,10 +1,23 @@
 import pandas as pd
-import plotly.graph_objects as go
 from components.doorstroom_functions import *
 from components.popups import *
+from components.significance import SIGNIFICANCE_CAPTION, compare_groups
+from components.cached_data import load_dataset, load_flow_engine
+from components.engines import one_year_flow_table, three_year_flow_counts
+from components.label_reconciliation import SOURCE_LABEL_OPTION, SOURCE_LABEL_HELP
+from components.progressive import render_as_completed
+from components.analysis_context import (
+    COHORT_FIELDS,
+    VERGELIJK_FIELDS,
+    get_selection,
+    set_selection,
+    selection_index,
+    selection_default,
+    cached_result,
+    cached_future,
+)
 import streamlit as st
 import numpy as np
-import os
 #from streamlit-extras import card
 
 
@@ -73,33 +86,7 @@ if False: #not st.session_state.logged_in: #override van login
             st.error("Incorrect Passcode")
 else:
     # --- Data Loading ---
-    @st.cache_data
-    def load_data():
-        # Adjust this path if your Streamlit app is not in the Colab /content/drive/MyDrive/Data directory
-        file_path = 'updated_df.xlsx'
-        if not os.path.exists(file_path):
-            st.error(
-                f"Error: Data file not found at {file_path}. Please ensure 'updated_df.xlsx' is in your Google Drive's 'Data' folder and Drive is mounted (if running in Colab) or the path is correct.")
-            st.stop()
-        try:
-            df = pd.read_excel(file_path)
-            # Ensure 'Schooljaar' is int and 'Inschrijvingsdatum' is datetime
-            df['Schooljaar'] = df['Schooljaar'].astype(int)
-            df['Inschrijvingsdatum'] = pd.to_datetime(df['Inschrijvingsdatum'])
-
-            # Create 'Tekortpunten_Bucket' column
-            bins = [-1, 2, 6, 9, np.inf]
-            labels = ['0-3', '4-6', '7-9', '10+']
-            df['Tekortpunten_Bucket'] = pd.cut(df['Tekortpunten'], bins=bins, labels=labels, right=True,
-                                               include_lowest=True)
-
-            return df
-        except Exception as e:
-            st.error(f"Error loading or processing data: {e}")
-            st.stop()
-
-
-    updated_df = load_data()
+    updated_df = load_dataset()
 
     # --- Sidebar for Filters ---
 
@@ -141,143 +128,198 @@ else:
         "ℹ️ Uitleg: Vervolg filters.",
         on_click=filter_helper_2
     )
+    # Outside the fragments, so switching it reruns both groups
+    use_source_label = st.checkbox(SOURCE_LABEL_OPTION, value=False, help=SOURCE_LABEL_HELP)
+    def remember_details_selection():
+        # The details page opens with these results instead of waiting for 'Run Analysis'
+        selection = get_selection()
+        if 'leerfase_start' in selection and 'leerfase_vergelijk' in selection:
+            st.session_state.details_selection = (selection['schooljaar_start'], selection['schooljaar_eind'],
+                                                  selection['leerfase_start'], selection['leerfase_vergelijk'])
+
+    def render_three_year(three_year_transition_counts):
+        if not three_year_transition_counts.empty:
+            st.write("#### Stromen in volgende 3 jaar")
+            st.dataframe(counts_with_percentages(three_year_transition_counts))
+        else:
+            st.info("No transitions found for the selected criteria.")
+
+    def render_verschil(verschil):
+        st.write("#### Verschil tussen de groepen")
+        st.dataframe(verschil)
+        st.caption(SIGNIFICANCE_CAPTION)
+
+    def verschil_panel(placeholder):
+        # Drawn by both group fragments into one placeholder below the columns, so it follows either group
+        progression_percentages = st.session_state.get('groep_percentages')
+        vergelijk_percentages = st.session_state.get('vergelijk_percentages')
+        if progression_percentages is None or progression_percentages.empty or \
+                vergelijk_percentages is None or vergelijk_percentages.empty:
+            placeholder.empty()
+            return
+        verschil = cached_future(
+            'verschil', compare_groups,
+            progression_percentages['Aantallen'], vergelijk_percentages['Aantallen'],
+            depends_on=COHORT_FIELDS + VERGELIJK_FIELDS
+        )
+        render_as_completed([(placeholder, verschil, render_verschil)])
+
+    # Each group is a fragment: changing its filters only reruns (and recomputes) that group
+    @st.fragment
+    def analyse_groep_panel(verschil_placeholder):
+        with st.spinner("Berekenen en plaatje maken..."):
+            st.subheader("Analyse groep")
+            schooljaar_start = st.selectbox(
+                "Selecteer start schooljaar data (kies bijv. 2022 en 2022 voor schooljaar 2022-2023, of 2022 2023 voor schooljaren 2022 augustus-2024 juli):",
+                options=all_schoolyears,
+                index=selection_index(all_schoolyears, 'schooljaar_start', 5)
+            )
+            schooljaar_eind = st.selectbox(
+                "Tot schooljaar:",
+                options=all_schoolyears,
+                index=selection_index(all_schoolyears, 'schooljaar_eind', 5)
+            )
+
+            if schooljaar_start > schooljaar_eind:
+                # A fragment cannot write to the sidebar
+                st.error("Start Schooljaar cannot be after End Schooljaar.")
+                st.stop()
+            leerfase_start = st.selectbox(
+                "Selecteer de Leerfase (afk):",
+                options=all_leerfases,
+                index=selection_index(all_leerfases, 'leerfase_start', 4)
+            )
+
+            # Tekortpunten_Bucket filter
+
+            selected_tekortpunten_buckets = st.multiselect(
+                "Selecteer de filter op tekortpunten (In het Startjaar):",
+                options=all_tekortpunten_buckets,
+                default=selection_default(all_tekortpunten_buckets, 'tekortpunten_buckets',
+                                          all_tekortpunten_buckets)  # Default to all selected
+            )
+            # Shared with the other pages, so drilling down keeps these filters and results
+            set_selection(schooljaar_start=schooljaar_start, schooljaar_eind=schooljaar_eind,
+                          leerfase_start=leerfase_start, tekortpunten_buckets=selected_tekortpunten_buckets)
+            # The three-year paths are computed in the background, the one-year table is read from the
+            # prepared dataset of the configured engine and drawn at once
+            three_year_transition_counts = cached_future(
+                'three_year', three_year_flow_counts,
+                load_flow_engine(),
+                schooljaar_start=schooljaar_start,
+                schooljaar_eind=schooljaar_eind,
+                leerfase_start=leerfase_start,
+                tekortpunten_bucket_filter=selected_tekortpunten_buckets
+            )
+            progression_percentages = cached_result(
+                'next_leerfase', one_year_flow_table,
+                load_flow_engine(),
+                schooljaar_start=schooljaar_start,
+                schooljaar_eind=schooljaar_eind,
+                leerfase_start=leerfase_start,
+                tekortpunten_bucket_filter=selected_tekortpunten_buckets,
+                use_source_label=use_source_label
+            )
+            st.session_state.groep_percentages = progression_percentages
+            if not progression_percentages.empty:
+                st.write("#### Aantallen en percentages")
+                st.dataframe(progression_percentages)
+            render_as_completed([(st.empty(), three_year_transition_counts, render_three_year)])
+        remember_details_selection()
+        verschil_panel(verschil_placeholder)
+
+    @st.fragment
+    def vergelijkingsgroep_panel(verschil_placeholder):
+        with st.spinner("Berekenen en plaatje maken..."):
+            st.subheader("Vergelijkingsgroep")
+            schooljaar_start_vergelijk = st.selectbox(
+                "Selecteer ook alle filters voor de groep waarmee je wil vergelijken. ________________________________________________",
+                options=all_schoolyears,
+                index=5,
+                key=1
+            )
+            schooljaar_eind_vergelijk = st.selectbox(
+                "Tot schooljaar:",
+                options=all_schoolyears,
+                index=5,
+                key=2
+            )
+
+            leerfase_vergelijk = st.selectbox(
+                "Selecteer de Leerfase (afk) om mee te vergelijken:",
+                options=all_leerfases,
+                index=selection_index(all_leerfases, 'leerfase_vergelijk', 5)
+            )
+
+            selected_tekortpunten_buckets_vergelijk = st.multiselect(
+                "Selecteer de filter op tekortpunten (In het Startjaar):",
+                options=all_tekortpunten_buckets,
+                default=all_tekortpunten_buckets,  # Default to all selected
+                key=6
+            )
+            set_selection(schooljaar_start_vergelijk=schooljaar_start_vergelijk,
+                          schooljaar_eind_vergelijk=schooljaar_eind_vergelijk,
+                          leerfase_vergelijk=leerfase_vergelijk,
+                          tekortpunten_buckets_vergelijk=selected_tekortpunten_buckets_vergelijk)
+            three_year_transition_counts_vergelijk = cached_future(
+                'three_year_vergelijk', three_year_flow_counts,
+                load_flow_engine(),
+                schooljaar_start=schooljaar_start_vergelijk,
+                schooljaar_eind=schooljaar_eind_vergelijk,
+                leerfase_start=leerfase_vergelijk,
+                tekortpunten_bucket_filter=selected_tekortpunten_buckets_vergelijk,
+                depends_on=VERGELIJK_FIELDS
+            )
+            vergelijk_percentages = cached_result(
+                'next_leerfase_vergelijk', one_year_flow_table,
+                load_flow_engine(),
+                schooljaar_start=schooljaar_start_vergelijk,
+                schooljaar_eind=schooljaar_eind_vergelijk,
+                leerfase_start=leerfase_vergelijk,
+                tekortpunten_bucket_filter=selected_tekortpunten_buckets_vergelijk,
+                use_source_label=use_source_label,
+                depends_on=VERGELIJK_FIELDS
+            )
+            st.session_state.vergelijk_percentages = vergelijk_percentages
+            if not vergelijk_percentages.empty:
+                st.write("#### Vergelijking")
+                st.dataframe(vergelijk_percentages)
+            render_as_completed([(st.empty(), three_year_transition_counts_vergelijk, render_three_year)])
+        remember_details_selection()
+        verschil_panel(verschil_placeholder)
+
     if True:
         if updated_df is not None:
-            with st.spinner("Berekenen en plaatje maken..."):
-
-
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.subheader("Analyse groep")
-                    schooljaar_start = st.selectbox(
-                        "Selecteer start schooljaar data (kies bijv. 2022 en 2022 voor schooljaar 2022-2023, of 2022 2023 voor schooljaren 2022 augustus-2024 juli):",
-                        options=all_schoolyears,
-                        index=5
-                    )
-                    schooljaar_eind = st.selectbox(
-                        "Tot schooljaar:",
-                        options=all_schoolyears,
-                        index=5
-                    )
-
-                    if schooljaar_start > schooljaar_eind:
-                        st.sidebar.error("Start Schooljaar cannot be after End Schooljaar.")
-                        st.stop()
-                    leerfase_start = st.selectbox(
-                        "Selecteer de Leerfase (afk):",
-                        options=all_leerfases,
-                        index=4
-                    )
-
-                    # Tekortpunten_Bucket filter
-
-                    selected_tekortpunten_buckets = st.multiselect(
-                        "Selecteer de filter op tekortpunten (In het Startjaar):",
-                        options=all_tekortpunten_buckets,
-                        default=all_tekortpunten_buckets  # Default to all selected
-                    )
-                    progression_percentages = analyze_next_leerfase(
-                        updated_df,
-                        schooljaar_start=schooljaar_start,
-                        schooljaar_eind=schooljaar_eind,
-                        leerfase_start=leerfase_start,
-                        tekortpunten_bucket_filter=selected_tekortpunten_buckets
-
-                    )
-                    three_year_transition_counts = analyze_three_year_leerfase_transitions(
-                        updated_df,
-                        schooljaar_start=schooljaar_start,
-                        schooljaar_eind=schooljaar_eind,
-                        leerfase_start=leerfase_start,
-                        tekortpunten_bucket_filter=selected_tekortpunten_buckets
-                    )
-                    if not three_year_transition_counts.empty:
-                        st.write("#### Aantallen en percentages")
-                        st.dataframe(progression_percentages)
-                        df_three_year = counts_with_percentages(three_year_transition_counts)
-                        st.write("#### Stromen in volgende 3 jaar")
-                        st.dataframe(df_three_year)
-
-                    else:
-                        st.info("No transitions found for the selected criteria.")
-                with col2:
-                    st.subheader("Vergelijkingsgroep")
-                    schooljaar_start_vergelijk = st.selectbox(
-                        "Selecteer ook alle filters voor de groep waarmee je wil vergelijken. ________________________________________________",
-                        options=all_schoolyears,
-                        index=5,
-                        key=1
-                    )
-                    schooljaar_eind_vergelijk = st.selectbox(
-                        "Tot schooljaar:",
-                        options=all_schoolyears,
-                        index=5,
-                        key=2
-                    )
-
-                    leerfase_vergelijk = st.selectbox(
-                        "Selecteer de Leerfase (afk) om mee te vergelijken:",
-                        options=all_leerfases,
-                        index=5
-                    )
-
-                    selected_tekortpunten_buckets_vergelijk = st.multiselect(
-                        "Selecteer de filter op tekortpunten (In het Startjaar):",
-                        options=all_tekortpunten_buckets,
-                        default=all_tekortpunten_buckets,  # Default to all selected
-                        key=6
-                    )
-                    three_year_transition_counts_vergelijk = analyze_three_year_leerfase_transitions(
-                        updated_df,
-                        schooljaar_start=schooljaar_start_vergelijk,
-                        schooljaar_eind=schooljaar_eind_vergelijk,
-                        leerfase_start=leerfase_vergelijk,
-                        tekortpunten_bucket_filter=selected_tekortpunten_buckets_vergelijk
-                    )
-                    vergelijk_percentages = analyze_next_leerfase(
-                        updated_df,
-                        schooljaar_start=schooljaar_start_vergelijk,
-                        schooljaar_eind=schooljaar_eind_vergelijk,
-                        leerfase_start=leerfase_vergelijk,
-                        tekortpunten_bucket_filter=selected_tekortpunten_buckets_vergelijk
-
-                    )
-                    if not three_year_transition_counts.empty:
-                        st.write("#### Vergelijking")
-                        st.dataframe(vergelijk_percentages)
-
-                        df_three_year_vergelijk = counts_with_percentages(
-                            three_year_transition_counts_vergelijk
-                        )
-                        st.write("#### Stromen in volgende 3 jaar")
-                        st.dataframe(df_three_year_vergelijk)
-
-                    else:
-                        st.info("No transitions found for the selected criteria.")
-                url = "Details_voor_groepen"
-                st.write(
-                    "Toelichting: als er alleen een leerfase met een aantal staat zonder pijltje. Dan zijn deze leerlingen "
-                    "in de geselecteerde periode in de geselecteerde leerfase aangekomen, maar nog niet doorgestroomd. "
-                    "Bijvoorbeeld als je jaren 2023-2024 selecteerd dan zijn er in 2024 leerlingen in H4 gestart, maar "
-                    "zonder data van 2025-2026 zijn deze leerlingen nog niet doorgestroomd. Zie onderaan op de [pagina Details voor groepen](%s) de tabel met leerlingnummers voor meer inzicht." % url)
-
-                # if not three_year_transition_counts.empty:
-                #     # Generate Sankey Diagram
-                #     labels, source, target, value = prepare_sankey_data(three_year_transition_counts)
-                #     if labels and source and target and value:
-                #         title_str = f"Student Progression: {leerfase_start} ({schooljaar_start}-{schooljaar_eind})"
-                #         if selected_tekortpunten_buckets:
-                #             title_str += f" (Tekortpunten: {', '.join(selected_tekortpunten_buckets)})"
-                #
-                #         fig = plot_sankey_diagram(labels, source, target, value,
-                #                                   title=title_str)
-                #         st.write("### Sankey Diagram")
-                #         st.plotly_chart(fig, use_container_width=True)
-                #     else:
-                #         st.warning("Not enough data to generate a Sankey diagram for the selected filters.")
-                # else:
-                #     st.info("No transitions found for the selected criteria.")
+            col1, col2 = st.columns(2)
+            # Created after the columns, so the comparison is shown below both groups
+            verschil_placeholder = st.empty()
+            with col1:
+                analyse_groep_panel(verschil_placeholder)
+            with col2:
+                vergelijkingsgroep_panel(verschil_placeholder)
+            url = "Details_voor_groepen"
+            st.write(
+                "Toelichting: als er alleen een leerfase met een aantal staat zonder pijltje. Dan zijn deze leerlingen "
+                "in de geselecteerde periode in de geselecteerde leerfase aangekomen, maar nog niet doorgestroomd. "
+                "Bijvoorbeeld als je jaren 2023-2024 selecteerd dan zijn er in 2024 leerlingen in H4 gestart, maar "
+                "zonder data van 2025-2026 zijn deze leerlingen nog niet doorgestroomd. Zie onderaan op de [pagina Details voor groepen](%s) de tabel met leerlingnummers voor meer inzicht." % url)
+
+            # if not three_year_transition_counts.empty:
+            #     # Generate Sankey Diagram
+            #     labels, source, target, value = prepare_sankey_data(three_year_transition_counts)
+            #     if labels and source and target and value:
+            #         title_str = f"Student Progression: {leerfase_start} ({schooljaar_start}-{schooljaar_eind})"
+            #         if selected_tekortpunten_buckets:
+            #             title_str += f" (Tekortpunten: {', '.join(selected_tekortpunten_buckets)})"
+            #
+            #         fig = plot_sankey_diagram(labels, source, target, value,
+            #                                   title=title_str)
+            #         st.write("### Sankey Diagram")
+            #         st.plotly_chart(fig, use_container_width=True)
+            #     else:
+            #         st.warning("Not enough data to generate a Sankey diagram for the selected filters.")
+            # else:
+            #     st.info("No transitions found for the selected criteria.")
         else:
             st.error("Data not loaded. Please check the file path and data content.")
 st.markdown("#### Ben je klaar met deze pagina, je kan altijd verder kijken op de andere pagina's.")
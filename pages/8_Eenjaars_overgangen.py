@@ -1,188 +1,19 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 import numpy as np
-import os
+from components.significance import SIGNIFICANCE_CAPTION, compare_groups
+from components.cached_data import load_dataset, load_tekortpunten_index
+from components.tekortpunten import rates_per_bucket, rates_by_threshold, rates_per_tekortpunt
+from components.label_reconciliation import SOURCE_LABEL_OPTION, SOURCE_LABEL_HELP
+from components.doorstroom_functions import (
+    analyze_next_leerfase_per_category,
+)
 
 
 # Mount Google Drive (if running in Colab, this will prompt authentication)
 # In a local Streamlit environment, ensure the file path is accessible.
 # drive.mount('/content/drive')
 
-# --- Functions (copied from notebook) ---
-
-def _get_leerfase_numeric_value(leerfase_str):
-    """
-    Assigns a numerical value to each 'Leerfase (afk)' for comparison.
-
-    Args:
-        leerfase_str (str): The 'Leerfase (afk)' string.
-
-    Returns:
-        float: A numerical representation of the leerfase, or np.nan if not recognized.
-    """
-    if pd.isna(leerfase_str):
-        return np.nan
-
-    leerfase_str = str(leerfase_str).strip()
-
-    # Handle terminal statuses
-    if leerfase_str == 'Geslaagd':
-        return 100.0  # High value for successful completion
-    elif leerfase_str in ['VO verlater', 'Afstroom', 'Afgewezen']:
-        return 0.0    # Low value for non-progression/failure
-
-    # Handle 'doublure' by stripping it for the core comparison logic
-    original_leerfase = leerfase_str
-    if '_doublure' in leerfase_str:
-        leerfase_str = leerfase_str.replace('_doublure', '')
-
-    # Handle 'v', 'h', 't' levels
-    if leerfase_str.startswith('t') and leerfase_str[1:].isdigit():
-        return 10 + int(leerfase_str[1:])
-    elif leerfase_str.startswith('hv') and leerfase_str[2:].isdigit():
-        return 15 + int(leerfase_str[2:])
-    elif leerfase_str.startswith('h') and leerfase_str[1:].isdigit():
-        return 20 + int(leerfase_str[1:])
-    elif leerfase_str.startswith('v') and leerfase_str[1:].isdigit():
-        return 30 + int(leerfase_str[1:])
-
-    return np.nan # Return NaN for unknown patterns
-
-def analyze_next_leerfase(df, schooljaar_start, schooljaar_eind, leerfase_start, tekortpunten_bucket_filter=None, leerfase_vergelijk=None):
-    """
-    Analyzes one-year student progression from a specific 'Leerfase (afk)'
-    within a school year range, categorizing into 'Doublure', 'Doorstroom',
-    'Afstroom', or 'Other', and calculating percentages and counts.
-
-    Args:
-        df (pd.DataFrame): The input DataFrame, sorted by 'Leerlingnummer' and 'Schooljaar'.
-                           Must contain 'Leerlingnummer', 'Schooljaar', 'Leerfase (afk)',
-                           'Leerfase (afk) vorig schooljaar', and 'Tekortpunten_Bucket' columns.
-        schooljaar_start (int): The starting school year (inclusive) for the analysis.
-        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
-        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
-        tekortpunten_bucket_filter (list, optional): A list of 'Tekortpunten_Bucket' categories to filter.
-                                                   Defaults to None (all buckets).
-        leerfase_vergelijk (str, optional): A specific 'Leerfase (afk)' to compare against.
-                                            If provided, will specifically track progression to this phase.
-
-    Returns:
-        tuple: A tuple containing two pd.Series:
-               - progression_percentages (pd.Series): Percentages of progression categories.
-               - progression_counts (pd.Series): Absolute counts of progression categories.
-               Returns (pd.Series([], dtype=float), pd.Series([], dtype=int)) if no students match the criteria.
-    """
-    # 1. Filter students who were in the leerfase_start within the specified year range.
-    initial_phase_students_df = df[
-        (df['Schooljaar'] >= schooljaar_start) &
-        (df['Schooljaar'] <= schooljaar_eind) &
-        (df['Leerfase (afk)'] == leerfase_start)
-    ].copy()
-
-    # Apply tekortpunten_bucket_filter if provided
-    if tekortpunten_bucket_filter is not None and len(tekortpunten_bucket_filter) > 0:
-        initial_phase_students_df = initial_phase_students_df[
-            initial_phase_students_df['Tekortpunten_Bucket'].isin(tekortpunten_bucket_filter)
-        ]
-
-    relevant_leerlingnummers = initial_phase_students_df['Leerlingnummer'].unique()
-
-    if len(relevant_leerlingnummers) == 0:
-        return pd.Series([], dtype=float), pd.Series([], dtype=int)
-
-    # 2. Get ALL records for these relevant students to track their next year's phase
-    student_records = df[df['Leerlingnummer'].isin(relevant_leerlingnummers)].copy()
-    student_records = student_records.sort_values(by=['Leerlingnummer', 'Schooljaar'])
-
-    # Calculate the next 'Leerfase (afk)' for each student
-    student_records['next_leerfase'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-1)
-    student_records['next_schooljaar'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-1)
-
-    # Filter to get only the transitions from leerfase_start in the specified school years
-    # and only for the immediate next school year.
-    transitions_df = student_records[
-        (student_records['Leerfase (afk)'] == leerfase_start) &
-        (student_records['Schooljaar'] >= schooljaar_start) &
-        (student_records['Schooljaar'] <= schooljaar_eind) &
-        (student_records['next_schooljaar'] == student_records['Schooljaar'] + 1)
-    ].copy()
-
-    # Make sure Leerfase (afk) vorig schooljaar is valid before comparison for doublure
-    transitions_df['Leerfase (afk) vorig schooljaar_clean'] = transitions_df['Leerfase (afk) vorig schooljaar'].apply(lambda x: str(x).replace('_doublure', '') if pd.notna(x) else np.nan)
-
-    # Remove _doublure from leerfase_start for comparison
-    leerfase_start_clean = str(leerfase_start).replace('_doublure', '')
-
-    def categorize_progression(row):
-        current_phase = row['Leerfase (afk)']
-        next_phase = row['next_leerfase']
-
-        if pd.isna(next_phase):
-            return 'No Data (Dropout/Missing)' # Handle cases where next phase is missing
-
-        # Specific comparison for leerfase_vergelijk if provided
-        if leerfase_vergelijk and next_phase == leerfase_vergelijk:
-            return f'To {leerfase_vergelijk}'
-
-        # Priority 1: Doublure detection
-        if '_doublure' in str(next_phase) and str(next_phase).replace('_doublure', '') == leerfase_start_clean:
-            return 'Doublure'
-
-        # Clean next_phase for numeric comparison
-        next_phase_clean = str(next_phase).replace('_doublure', '')
-
-        # Priority 2: Terminal statuses
-        if next_phase_clean == 'Geslaagd':
-            return 'Doorstroom' # Geslaagd is always a positive progression
-        elif next_phase_clean in ['VO verlater', 'Afstroom', 'Afgewezen']:
-            return 'Afstroom' # These are definitive negative outcomes
-
-        # Priority 3: Numeric comparison for v/h/t levels
-        current_numeric = _get_leerfase_numeric_value(current_phase)
-        next_numeric = _get_leerfase_numeric_value(next_phase_clean)
-
-        if pd.isna(current_numeric) or pd.isna(next_numeric):
-            return 'Other' # Cannot compare if numeric values are unknown
-
-        if next_numeric > current_numeric:
-            return 'Doorstroom'
-        elif next_numeric < current_numeric:
-            return 'Afstroom'
-        elif next_numeric == current_numeric:
-            # If numeric values are the same but not a _doublure and not a terminal status,
-            # it implies staying in the same level without explicitly being a doublure, which is 'Other'
-            return 'Other'
-
-        return 'Other' # Default for any uncaught cases
-
-    if transitions_df.empty:
-        return pd.Series([], dtype=float), pd.Series([], dtype=int)
-
-    transitions_df['Progression'] = transitions_df.apply(categorize_progression, axis=1)
-
-    # Calculate percentages
-    total_students = len(transitions_df)
-    if total_students == 0:
-        return pd.Series([], dtype=float), pd.Series([], dtype=int)
-
-    progression_counts = transitions_df['Progression'].value_counts()
-    progression_percentages = (progression_counts / total_students) * 100
-
-    # Ensure all categories are present, even if 0% or 0 count
-    all_categories = ['Doorstroom', 'Afstroom', 'Doublure', 'Other', 'No Data (Dropout/Missing)']
-    if leerfase_vergelijk:
-        all_categories.append(f'To {leerfase_vergelijk}')
-
-    for category in all_categories:
-        if category not in progression_percentages.index:
-            progression_percentages[category] = 0.0
-        if category not in progression_counts.index:
-            progression_counts[category] = 0
-
-    return progression_percentages.sort_index(), progression_counts.sort_index()
-
-
 # --- Streamlit App Layout ---
 st.set_page_config(layout="wide")
 st.markdown(
@@ -241,30 +72,7 @@ if False:#not st.session_state.logged_in:
             st.error("Incorrect Passcode")
 else:
     # --- Data Loading ---
-    @st.cache_data
-    def load_data():
-        # Adjust this path if your Streamlit app is not in the Colab /content/drive/MyDrive/Data directory
-        file_path = 'updated_df.xlsx'
-        if not os.path.exists(file_path):
-            st.error(f"Error: Data file not found at {file_path}. Please ensure 'updated_df.xlsx' is in your Google Drive's 'Data' folder and Drive is mounted (if running in Colab) or the path is correct.")
-            st.stop()
-        try:
-            df = pd.read_excel(file_path)
-            # Ensure 'Schooljaar' is int and 'Inschrijvingsdatum' is datetime
-            df['Schooljaar'] = df['Schooljaar'].astype(int)
-            df['Inschrijvingsdatum'] = pd.to_datetime(df['Inschrijvingsdatum'])
-
-            # Create 'Tekortpunten_Bucket' column
-            bins = [-1, 3, 6, 9, np.inf]
-            labels = ['0-3', '4-6', '7-9', '10+']
-            df['Tekortpunten_Bucket'] = pd.cut(df['Tekortpunten'], bins=bins, labels=labels, right=True, include_lowest=True)
-
-            return df
-        except Exception as e:
-            st.error(f"Error loading or processing data: {e}")
-            st.stop()
-
-    updated_df = load_data()
+    updated_df = load_dataset()
 
     # --- Sidebar for Filters ---
     st.sidebar.header("Analysis Filters")
@@ -342,6 +150,7 @@ else:
         options=all_tekortpunten_buckets,
         default=all_tekortpunten_buckets  # Default to all selected
     )
+    use_source_label = st.sidebar.checkbox(SOURCE_LABEL_OPTION, value=False, help=SOURCE_LABEL_HELP)
 
     # --- Main Content ---
     st.subheader(f"Een jaar vooruit ({schooljaar_start}-{schooljaar_eind})") # Updated Subheader
@@ -350,19 +159,21 @@ else:
         if updated_df is not None:
             with st.spinner("Running analysis and generating results..."):
                 # Call the one-year progression analysis function
-                progression_percentages, progression_counts = analyze_next_leerfase(
+                progression_percentages, progression_counts, _ = analyze_next_leerfase_per_category(
                     updated_df,
                     schooljaar_start=schooljaar_start,
                     schooljaar_eind=schooljaar_eind,
                     leerfase_start=leerfase_start,
-                    tekortpunten_bucket_filter=selected_tekortpunten_buckets
+                    tekortpunten_bucket_filter=selected_tekortpunten_buckets,
+                    use_source_label=use_source_label
                 )
-                vergelijk_percentages, vergelijk_counts = analyze_next_leerfase(
+                vergelijk_percentages, vergelijk_counts, _ = analyze_next_leerfase_per_category(
                     updated_df,
                     schooljaar_start=vergelijk_start,
                     schooljaar_eind=vergelijk_eind,
                     leerfase_start=leerfase_vergelijk,
-                    tekortpunten_bucket_filter=vergelijk_tekortpunten_buckets
+                    tekortpunten_bucket_filter=vergelijk_tekortpunten_buckets,
+                    use_source_label=use_source_label
                 )
                 col1, col2 = st.columns(2)
                 with col1:
@@ -387,8 +198,33 @@ else:
                             vergelijk_counts.reset_index().rename(columns={'index': 'Progression Category', 0: 'Count'}))
                     else:
                         st.info("No transitions found for the selected criteria.")
+                if not progression_counts.empty and not vergelijk_counts.empty:
+                    st.write("### Verschil tussen de groepen")
+                    st.dataframe(compare_groups(progression_counts, vergelijk_counts))
+                    st.caption(SIGNIFICANCE_CAPTION)
         else:
             st.error("Data not loaded. Please check the file path and data content.")
+
+    # --- Per tekortpunt, answered from the cumulative-count index without re-cutting the data ---
+    with st.expander(f"Doorstroom per aantal tekortpunten voor {leerfase_start}"):
+        tekortpunten_index = load_tekortpunten_index()
+        grenzen = st.text_input("Eigen indeling (laagste aantal tekortpunten per groep, gescheiden door komma's):",
+                                value="0, 4, 7, 10")
+        try:
+            bucket_starts = sorted({int(g) for g in grenzen.split(',') if g.strip()})
+        except ValueError:
+            st.error("Gebruik alleen hele getallen, bijv. 0, 4, 7, 10.")
+            bucket_starts = []
+        if bucket_starts:
+            st.dataframe(rates_per_bucket(tekortpunten_index, schooljaar_start, schooljaar_eind, leerfase_start,
+                                          bucket_starts))
+        # Bounded by the data, so every norm is one the index can answer
+        max_tekortpunten = tekortpunten_index['max_tekortpunten']
+        norm = st.slider("Norm (maximaal aantal tekortpunten):", min_value=0, max_value=max(max_tekortpunten, 1),
+                         value=min(6, max_tekortpunten))
+        st.dataframe(rates_by_threshold(tekortpunten_index, schooljaar_start, schooljaar_eind, leerfase_start, norm))
+        st.write("Per exact aantal tekortpunten:")
+        st.dataframe(rates_per_tekortpunt(tekortpunten_index, schooljaar_start, schooljaar_eind, leerfase_start))
 st.markdown(
         """
         <a class="card-link" href="/" target="_self">
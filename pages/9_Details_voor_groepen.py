@@ -1,310 +1,24 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 import numpy as np
-import os
+from components.sankey_cache import cached_sankey_figure, details_sankey_title
+from components.details_table import paginated_dataframe
+from components.cached_data import load_dataset, load_quality_report, load_student_index, load_label_reconciliation
+from components.student_index import student_timeline
+from components.data_quality import quality_summary, issues_for_students
+from components.label_reconciliation import SOURCE_LABEL_OPTION, disagreements_for_students
+from components.analysis_context import set_selection, selection_index, cached_future
+from components.progressive import render_as_completed
+from components.doorstroom_functions import (
+    analyze_three_year_leerfase_transitions,
+    analyze_three_year_leerfase_transitions_with_leerlingnummers,
+    prepare_sankey_data,
+)
 
 # Mount Google Drive (if running in Colab, this will prompt authentication)
 # In a local Streamlit environment, ensure the file path is accessible.
 # drive.mount('/content/drive')
 
-# --- Functions (copied from notebook) ---
-
-def analyze_three_year_leerfase_transitions(df, schooljaar_start, schooljaar_eind, leerfase_start, leerlingnummer_filter=None):
-    """
-    Analyzes 'Leerfase (afk)' transitions for students over three consecutive school years.
-    Shows up to three transitions, even if fewer are available consecutively.
-
-    Args:
-        df (pd.DataFrame): The input DataFrame, expected to be sorted by 'Leerlingnummer' and 'Schooljaar'.
-                           It must contain 'Leerlingnummer', 'Schooljaar', and 'Leerfase (afk)' columns.
-        schooljaar_start (int): The starting school year (inclusive) for the analysis.
-        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
-        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
-        leerlingnummer_filter (int or list, optional): A single 'Leerlingnummer' or a list of 'Leerlingnummer's
-                                                       to filter the analysis. Defaults to None (all students).
-
-    Returns:
-        pd.Series: A Series with three-year transition strings as index and counts as values.
-                   (e.g., "v5 -> v6", "v5 -> v6 -> h1", or "v5 -> v6 -> h1 -> h2").
-    """
-    # Filter students who were in the leerfase_start within the specified year range.
-    initial_phase_students_df = df[
-        (df['Schooljaar'] >= schooljaar_start) &
-        (df['Schooljaar'] <= schooljaar_eind) &
-        (df['Leerfase (afk)'] == leerfase_start)
-    ].copy() # Use .copy() to avoid SettingWithCopyWarning
-
-    if leerlingnummer_filter is not None:
-        if isinstance(leerlingnummer_filter, int):
-            leerlingnummer_filter = [leerlingnummer_filter]
-        initial_phase_students_df = initial_phase_students_df[
-            initial_phase_students_df['Leerlingnummer'].isin(leerlingnummer_filter)
-        ]
-
-    # Get unique Leerlingnummer's from the filtered initial phase students
-    relevant_leerlingnummers = initial_phase_students_df['Leerlingnummer'].unique()
-
-    if len(relevant_leerlingnummers) == 0:
-        # st.warning(f"No students found in '{leerfase_start}' between {schooljaar_start}-{schooljaar_eind} (or matching filter).")
-        return pd.Series([], dtype=int)
-
-    # Get ALL records for these relevant students.
-    student_records = df[df['Leerlingnummer'].isin(relevant_leerlingnummers)].copy()
-    student_records = student_records.sort_values(by=['Leerlingnummer', 'Schooljaar'])
-
-    # Calculate the next two 'Leerfase (afk)' and 'Schooljaar' for each student
-    student_records['next_leerfase_1'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-1)
-    student_records['next_schooljaar_1'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-1)
-    student_records['next_leerfase_2'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-2)
-    student_records['next_schooljaar_2'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-2)
-    student_records['next_leerfase_3'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-3)
-    student_records['next_schooljaar_3'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-3)
-
-    # Filter for starting points within the specified range
-    transitions_df = student_records[
-        (student_records['Leerfase (afk)'] == leerfase_start) &
-        (student_records['Schooljaar'] >= schooljaar_start) &
-        (student_records['Schooljaar'] <= schooljaar_eind)
-    ].copy()
-
-    if transitions_df.empty:
-        # st.warning(f"No starting points found from '{leerfase_start}' between {schooljaar_start}-{schooljaar_eind} (or matching filter).")
-        return pd.Series([], dtype=int)
-
-    # Initialize the transition string with the starting phase
-    transitions_df['Transition'] = transitions_df['Leerfase (afk)']
-
-    # Conditionally add the first transition
-    transitions_df['Transition'] = np.where(
-        (transitions_df['next_schooljaar_1'] == transitions_df['Schooljaar'] + 1) & (transitions_df['next_leerfase_1'].notna()),
-        transitions_df['Transition'] + ' -> ' + transitions_df['next_leerfase_1'],
-        transitions_df['Transition']
-    )
-
-    # Conditionally add the second transition
-    transitions_df['Transition'] = np.where(
-        (transitions_df['next_schooljaar_1'] == transitions_df['Schooljaar'] + 1) &
-        (transitions_df['next_schooljaar_2'] == transitions_df['Schooljaar'] + 2) &
-        (transitions_df['next_leerfase_2'].notna()),
-        transitions_df['Transition'] + ' -> ' + transitions_df['next_leerfase_2'],
-        transitions_df['Transition']
-    )
-
-    # Conditionally add the third transition
-    transitions_df['Transition'] = np.where(
-        (transitions_df['next_schooljaar_1'] == transitions_df['Schooljaar'] + 1) &
-        (transitions_df['next_schooljaar_2'] == transitions_df['Schooljaar'] + 2) &
-        (transitions_df['next_schooljaar_3'] == transitions_df['Schooljaar'] + 3) &
-        (transitions_df['next_leerfase_3'].notna()),
-        transitions_df['Transition'] + ' -> ' + transitions_df['next_leerfase_3'],
-        transitions_df['Transition']
-    )
-
-    # Aantal the occurrences of each unique transition
-    transition_counts = transitions_df['Transition'].value_counts()
-
-    return transition_counts
-import pandas as pd
-import numpy as np
-
-def analyze_three_year_leerfase_transitions_with_leerlingnummers(df, schooljaar_start, schooljaar_eind, leerfase_start, leerlingnummer_filter=None):
-    """
-    Analyzes 'Leerfase (afk)' transitions for students over three consecutive school years,
-    returning each student's Leerlingnummer along with their transition path.
-
-    Args:
-        df (pd.DataFrame): The input DataFrame, expected to be sorted by 'Leerlingnummer' and 'Schooljaar'.
-                           It must contain 'Leerlingnummer', 'Schooljaar', and 'Leerfase (afk)' columns.
-        schooljaar_start (int): The starting school year (inclusive) for the analysis.
-        schooljaar_eind (int): The ending school year (inclusive) for the analysis.
-        leerfase_start (str): The specific 'Leerfase (afk)' from which to track transitions.
-        leerlingnummer_filter (int or list, optional): A single 'Leerlingnummer' or a list of 'Leerlingnummer's
-                                                       to filter the analysis. Defaults to None (all students).
-
-    Returns:
-        pd.DataFrame: A DataFrame with 'Transition' strings, 'Aantal' of students, and a list of 'Leerlingnummer's
-                      for each transition path.
-    """
-
-    # Filter students who were in the leerfase_start within the specified year range.
-    initial_phase_students_df = df[
-        (df['Schooljaar'] >= schooljaar_start) &
-        (df['Schooljaar'] <= schooljaar_eind) &
-        (df['Leerfase (afk)'] == leerfase_start)
-    ].copy()
-
-    if leerlingnummer_filter is not None:
-        if isinstance(leerlingnummer_filter, int):
-            leerlingnummer_filter = [leerlingnummer_filter]
-        initial_phase_students_df = initial_phase_students_df[
-            initial_phase_students_df['Leerlingnummer'].isin(leerlingnummer_filter)
-        ]
-
-
-    # Get unique Leerlingnummer's from the filtered initial phase students
-    relevant_leerlingnummers = initial_phase_students_df['Leerlingnummer'].unique()
-
-    if len(relevant_leerlingnummers) == 0:
-        print(f"No students found in '{leerfase_start}' between {schooljaar_start}-{schooljaar_eind} (or matching filter).")
-        return pd.DataFrame(columns=['Transition', 'Aantal', 'Leerlingnummers'])
-
-    # Get ALL records for these relevant students.
-    student_records = df[df['Leerlingnummer'].isin(relevant_leerlingnummers)].copy()
-    student_records = student_records.sort_values(by=['Leerlingnummer', 'Schooljaar'])
-
-    # Calculate the next 'Leerfase (afk)' and 'Schooljaar' for each student for three years
-    student_records['next_leerfase_1'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-1)
-    student_records['next_schooljaar_1'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-1)
-    student_records['next_leerfase_2'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-2)
-    student_records['next_schooljaar_2'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-2)
-    student_records['next_leerfase_3'] = student_records.groupby('Leerlingnummer')['Leerfase (afk)'].shift(-3)
-    student_records['next_schooljaar_3'] = student_records.groupby('Leerlingnummer')['Schooljaar'].shift(-3)
-
-    # Filter for starting points within the specified range
-    transitions_df = student_records[
-        (student_records['Leerfase (afk)'] == leerfase_start) &
-        (student_records['Schooljaar'] >= schooljaar_start) &
-        (student_records['Schooljaar'] <= schooljaar_eind)
-    ].copy()
-
-
-    if transitions_df.empty:
-        print(f"No starting points found from '{leerfase_start}' between {schooljaar_start}-{schooljaar_eind} (or matching filter).")
-        return pd.DataFrame(columns=['Transition', 'Aantal', 'Leerlingnummers'])
-
-    # Initialize the transition string with the starting phase
-    transitions_df['Transition'] = transitions_df['Leerfase (afk)']
-
-    # Conditionally add the first transition
-    transitions_df['Transition'] = np.where(
-        (transitions_df['next_schooljaar_1'] == transitions_df['Schooljaar'] + 1) & (transitions_df['next_leerfase_1'].notna()),
-        transitions_df['Transition'] + ' -> ' + transitions_df['next_leerfase_1'],
-        transitions_df['Transition']
-    )
-
-    # Conditionally add the second transition
-    transitions_df['Transition'] = np.where(
-        (transitions_df['next_schooljaar_1'] == transitions_df['Schooljaar'] + 1) &
-        (transitions_df['next_schooljaar_2'] == transitions_df['Schooljaar'] + 2) &
-        (transitions_df['next_leerfase_2'].notna()),
-        transitions_df['Transition'] + ' -> ' + transitions_df['next_leerfase_2'],
-        transitions_df['Transition']
-    )
-
-    # Conditionally add the third transition
-    transitions_df['Transition'] = np.where(
-        (transitions_df['next_schooljaar_1'] == transitions_df['Schooljaar'] + 1) &
-        (transitions_df['next_schooljaar_2'] == transitions_df['Schooljaar'] + 2) &
-        (transitions_df['next_schooljaar_3'] == transitions_df['Schooljaar'] + 3) &
-        (transitions_df['next_leerfase_3'].notna()),
-        transitions_df['Transition'] + ' -> ' + transitions_df['next_leerfase_3'],
-        transitions_df['Transition']
-    )
-
-    # Group by transition path to get counts and lists of Leerlingnummers
-    transition_summary = transitions_df.groupby('Transition').agg(
-        Aantal=('Leerlingnummer', 'size'),
-        Leerlingnummers=('Leerlingnummer', lambda x: list(x.unique()))
-    ).reset_index()
-
-    return transition_summary
-
-
-
-
-def prepare_sankey_data(transition_counts):
-    """
-    Processes transition counts to prepare data for a Sankey diagram.
-
-    Args:
-        transition_counts (pd.Series): A Series where the index contains transition strings
-                                       (e.g., 'h3 -> h4 -> Geslaagd') and values are the counts.
-
-    Returns:
-        tuple: A tuple containing four lists: (labels, source, target, value)
-               - labels (list): Unique node labels.
-               - source (list): Source node indices for links.
-               - target (list): Target node indices for links.
-               - value (list): Values (counts) for links.
-    """
-    all_labels = []
-    for transition_string in transition_counts.index:
-        steps = transition_string.split(' -> ')
-        all_labels.extend(steps)
-
-    # Remove duplicates and sort for consistent node ordering
-    labels = sorted(list(set(all_labels)))
-
-    # Create a mapping from label to its index
-    label_to_index = {label: i for i, label in enumerate(labels)}
-
-    source = []
-    target = []
-    value = []
-
-    for transition_string, Aantal in transition_counts.items():
-        steps = transition_string.split(' -> ')
-        for i in range(len(steps) - 1):
-            step_current = steps[i]
-            step_next = steps[i+1]
-
-            # Get indices for source and target
-            source_index = label_to_index[step_current]
-            target_index = label_to_index[step_next]
-
-            source.append(source_index)
-            target.append(target_index)
-            value.append(Aantal)
-
-    # Aggregate values for identical source-target links
-    sankey_links_df = pd.DataFrame({
-        'source': source,
-        'target': target,
-        'value': value
-    })
-
-    # Group by source and target and sum the values
-    aggregated_links = sankey_links_df.groupby(['source', 'target'])['value'].sum().reset_index()
-
-    return labels, aggregated_links['source'].tolist(), aggregated_links['target'].tolist(), aggregated_links['value'].tolist()
-
-def plot_sankey_diagram(labels, source, target, value, title="Student Leerfase Progression (3-Year Transitions)"):
-    """
-    Generates an interactive Sankey diagram.
-
-    Args:
-        labels (list): Unique node labels.
-        source (list): Source node indices for links.
-        target (list): Target node indices for links.
-        value (list): Values (counts) for links.
-        title (str): Title for the Sankey diagram.
-
-    Returns:
-        go.Figure: A Plotly Figure object representing the Sankey diagram.
-    """
-    fig = go.Figure(data=[
-        go.Sankey(
-            node=dict(
-                pad=15,
-                thickness=20,
-                line=dict(color="black", width=0.5),
-                label=labels,
-                # color=["blue", "blue", "red", "red", ...] # Example: assign colors to nodes
-            ),
-            link=dict(
-                source=source, # indices correspond to labels, e.g. 0 = 'A', 1 = 'B', 2 = 'C'
-                target=target,
-                value=value,
-                # color=["rgba(0,0,255,0.2)", ...] # Example: assign colors to links
-            )
-        )
-    ])
-
-    fig.update_layout(title_text=title, font_size=10)
-    # fig.show() # In Streamlit, use st.plotly_chart(fig)
-    return fig
-
 # --- Streamlit App Layout ---
 st.set_page_config(page_title="Met tekortpunten", page_icon="📈")
 st.markdown(
@@ -363,26 +77,7 @@ if False:# not st.session_state.logged_in:
 else:
 
 # --- Data Loading ---
-    @st.cache_data
-    def load_data():
-        # Adjust this path if your Streamlit app is not in the Colab /content/drive/MyDrive/Data directory
-        file_path = 'updated_df.xlsx'
-        if not os.path.exists(file_path):
-            st.error(
-                f"Error: Data file not found at {file_path}. Please ensure 'updated_df.xlsx' is in your Google Drive's 'Data' folder and Drive is mounted (if running in Colab) or the path is correct.")
-            st.stop()
-        try:
-            df = pd.read_excel(file_path)
-            # Ensure 'Schooljaar' is int and 'Inschrijvingsdatum' is datetime
-            df['Schooljaar'] = df['Schooljaar'].astype(int)
-            df['Inschrijvingsdatum'] = pd.to_datetime(df['Inschrijvingsdatum'])
-            return df
-        except Exception as e:
-            st.error(f"Error loading or processing data: {e}")
-            st.stop()
-
-
-    updated_df = load_data()
+    updated_df = load_dataset()
 
     # --- Sidebar for Filters ---
     st.sidebar.header("Analysis Filters")
@@ -399,12 +94,12 @@ else:
     schooljaar_start = st.selectbox(
         "Selecteer start schooljaar data (kies bijv. 2022 voor schooljaar 2022-2023):",
         options=all_schoolyears,
-        index=5
+        index=selection_index(all_schoolyears, 'schooljaar_start', 5)
     )
     schooljaar_eind = st.selectbox(
         "Select eind schooljaar:",
         options=all_schoolyears,
-        index=5
+        index=selection_index(all_schoolyears, 'schooljaar_eind', 5)
     )
 
     if schooljaar_start > schooljaar_eind:
@@ -424,75 +119,147 @@ else:
     leerfase_start = st.selectbox(
         "Selecteer de Leerfase (afk):",
         options=all_leerfases,
-        index=4
+        index=selection_index(all_leerfases, 'leerfase_start', 4)
     )
     leerfase_vergelijk = st.selectbox(
         "Selecteer de Leerfase (afk) om mee te vergelijken:",
         options=all_leerfases,
-        index=5
+        index=selection_index(all_leerfases, 'leerfase_vergelijk', 5)
     )
 
 # --- Main Content ---
 
     st.subheader(f"Hieronder de groep leerlingen uit '{leerfase_start}' van {schooljaar_start}-{schooljaar_eind + 1} en hun doorstroom in de daaropvolgende jaren")
     st.write("Selecteer links de schooljaren en leerfase.")
+    selection = (schooljaar_start, schooljaar_eind, leerfase_start, leerfase_vergelijk)
+    set_selection(schooljaar_start=schooljaar_start, schooljaar_eind=schooljaar_eind,
+                  leerfase_start=leerfase_start, leerfase_vergelijk=leerfase_vergelijk)
     if st.button("Run Analysis"):
+        st.session_state.details_selection = selection
+    # Keep the results after the run, so paging through the details table does not hide them
+    if st.session_state.get('details_selection') == selection:
         if updated_df is not None:
-            with st.spinner("Running analysis and generating diagram..."):
-                three_year_transition_counts = analyze_three_year_leerfase_transitions(
-                    updated_df,
-                    schooljaar_start=schooljaar_start,
-                    schooljaar_eind=schooljaar_eind,
-                    leerfase_start=leerfase_start
-                )
-                three_year_transition_counts_vergelijk = analyze_three_year_leerfase_transitions(
-                    updated_df,
-                    schooljaar_start=schooljaar_start,
-                    schooljaar_eind=schooljaar_eind,
-                    leerfase_start=leerfase_vergelijk
-                )
+            # All analyses start at once in the background; every panel is drawn as soon as its result is ready
+            three_year_transition_counts = cached_future(
+                'details_three_year', analyze_three_year_leerfase_transitions,
+                updated_df,
+                schooljaar_start=schooljaar_start,
+                schooljaar_eind=schooljaar_eind,
+                leerfase_start=leerfase_start,
+                bucket_paths=False,
+                depends_on=['schooljaar_start', 'schooljaar_eind', 'leerfase_start']
+            )
+            three_year_transition_counts_vergelijk = cached_future(
+                'details_three_year', analyze_three_year_leerfase_transitions,
+                updated_df,
+                schooljaar_start=schooljaar_start,
+                schooljaar_eind=schooljaar_eind,
+                leerfase_start=leerfase_vergelijk,
+                bucket_paths=False,
+                depends_on=['schooljaar_start', 'schooljaar_eind', 'leerfase_vergelijk']
+            )
+            student_transitions = cached_future(
+                'details_leerlingnummers', analyze_three_year_leerfase_transitions_with_leerlingnummers,
+                updated_df,
+                schooljaar_start=schooljaar_start,
+                schooljaar_eind=schooljaar_eind,
+                leerfase_start=leerfase_start,
+                bucket_paths=False,
+                depends_on=['schooljaar_start', 'schooljaar_eind', 'leerfase_start'])
+
+            def render_aantallen(three_year_transition_counts):
+                if not three_year_transition_counts.empty:
+                    st.write("### Aantallen")
 
-                student_transitions = analyze_three_year_leerfase_transitions_with_leerlingnummers(
-                    updated_df,
-                    schooljaar_start=schooljaar_start,
-                    schooljaar_eind=schooljaar_eind,
-                    leerfase_start=leerfase_start)
-                col1, col2 = st.columns(2)
-                with col1:
-                    if not three_year_transition_counts.empty:
-                        st.write("### Aantallen")
+                    st.dataframe(three_year_transition_counts)
 
-                        st.dataframe(three_year_transition_counts)
+                else:
+                    st.info("No transitions found for the selected criteria.")
 
-                    else:
-                        st.info("No transitions found for the selected criteria.")
-                with col2:
-                    if not three_year_transition_counts.empty:
-                        st.write("### Vergelijking")
+            def render_vergelijking(three_year_transition_counts_vergelijk):
+                if not three_year_transition_counts_vergelijk.empty:
+                    st.write("### Vergelijking")
 
-                        st.dataframe(three_year_transition_counts_vergelijk)
-                        st.write(
-                            "Toelichting: als er alleen een leerfase met een aantal staat zonder pijltje. Dan zijn deze leerlingen "
-                            "in de geselecteerde periode in de geselecteerde leerfase aangekomen, maar nog niet doorgestroomd. Bijvoorbeeld als je jaren 2023-2024 selecteerd dan zijn er in 2024 leerlingen in H4 gestart, maar zonder data van 2025-2026 zijn deze leerlingen nog niet doorgestroomd. Zie onderaan op de Analyse per leerfase pagina de tabel met leerlingnummers voor meer inzicht.")
+                    st.dataframe(three_year_transition_counts_vergelijk)
+                    st.write(
+                        "Toelichting: als er alleen een leerfase met een aantal staat zonder pijltje. Dan zijn deze leerlingen "
+                        "in de geselecteerde periode in de geselecteerde leerfase aangekomen, maar nog niet doorgestroomd. Bijvoorbeeld als je jaren 2023-2024 selecteerd dan zijn er in 2024 leerlingen in H4 gestart, maar zonder data van 2025-2026 zijn deze leerlingen nog niet doorgestroomd. Zie onderaan op de Analyse per leerfase pagina de tabel met leerlingnummers voor meer inzicht.")
 
-                    else:
-                        st.info("No transitions found for the selected criteria.")
+                else:
+                    st.info("No transitions found for the selected criteria.")
+
+            def render_sankey(three_year_transition_counts):
                 # Generate Sankey Diagram
                 if not three_year_transition_counts.empty:
                     labels, source, target, value = prepare_sankey_data(three_year_transition_counts)
                     if labels and source and target and value:
-                        fig = plot_sankey_diagram(labels, source, target, value,
-                                                  title=f"Student Progression: {leerfase_start} ({schooljaar_start}-{schooljaar_eind})")
+                        fig = cached_sankey_figure(labels, source, target, value,
+                                                   title=details_sankey_title(leerfase_start, schooljaar_start, schooljaar_eind))
                         st.write("### Sankey Diagram voor Leerfase")
                         st.plotly_chart(fig, use_container_width=True)
                     else:
                         st.warning("Not enough data to generate a Sankey diagram for the selected filters.")
-                    st.write("### Details voor leerfase")
-                    st.dataframe(student_transitions)
                 else:
                     st.info("No transitions found for the selected criteria.")
+
+            def render_details(student_transitions):
+                if student_transitions.empty:
+                    return
+                st.write("### Details voor leerfase")
+                paginated_dataframe(student_transitions, key='details',
+                                    file_name=f"details_{leerfase_start}_{schooljaar_start}-{schooljaar_eind}")
+
+                # Checks run once at load time, here they are only looked up for this group
+                quality_report = load_quality_report()
+                group_leerlingnummers = [l for ls in student_transitions['Leerlingnummers'] for l in ls]
+                group_issues = issues_for_students(quality_report, group_leerlingnummers)
+                with st.expander(f"Datakwaliteit voor deze groep ({len(group_issues)} meldingen)"):
+                    st.write("Meldingen in de hele dataset:")
+                    st.dataframe(quality_summary(quality_report))
+                    st.write("Meldingen voor leerlingen in deze groep:")
+                    st.dataframe(group_issues, hide_index=True)
+
+                reconciliation = load_label_reconciliation()
+                group_disagreements = disagreements_for_students(reconciliation, group_leerlingnummers)
+                with st.expander(f"Doorstroom-label uit de bron tegenover de berekende overgang "
+                                 f"({len(group_disagreements)} afwijkingen in deze groep)"):
+                    st.write(f"De analyses berekenen de overgang uit de leerfases. Met de optie '{SOURCE_LABEL_OPTION}' "
+                             "(pagina's 2, 3 en 8) telt het label uit de bron voor, als dat een categorie heeft. "
+                             "Aantal overgangen per label (rijen) en berekende categorie (kolommen) in de hele dataset:")
+                    st.dataframe(reconciliation['confusion'])
+                    st.dataframe(reconciliation['per_label'])
+                    st.write("Afwijkingen per overgang in de hele dataset:")
+                    st.dataframe(reconciliation['per_transition'], hide_index=True)
+                    st.write("Afwijkingen voor leerlingen in deze groep:")
+                    st.dataframe(group_disagreements, hide_index=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                aantallen_placeholder = st.empty()
+            with col2:
+                vergelijking_placeholder = st.empty()
+            render_as_completed([
+                (aantallen_placeholder, three_year_transition_counts, render_aantallen),
+                (vergelijking_placeholder, three_year_transition_counts_vergelijk, render_vergelijking),
+                (st.empty(), three_year_transition_counts, render_sankey),
+                (st.empty(), student_transitions, render_details),
+            ])
         else:
             st.error("Data not loaded. Please check the file path and data content.")
+
+    st.write("### Leerling opzoeken")
+    st.write("Controleer de herkomst van de data voor één leerling: alle schooljaren met leerfase, tekortpunten, "
+             "het Doorstroom-label uit de bron en de berekende overgang.")
+    gezocht_leerlingnummer = st.text_input("Leerlingnummer:", key='leerling_zoeken').strip()
+    if gezocht_leerlingnummer:
+        if not gezocht_leerlingnummer.isdigit():
+            st.warning("Een leerlingnummer bestaat alleen uit cijfers.")
+        else:
+            timeline = student_timeline(load_student_index(), int(gezocht_leerlingnummer))
+            if timeline.empty:
+                st.info(f"Leerlingnummer {gezocht_leerlingnummer} komt niet voor in de data.")
+            else:
+                st.dataframe(timeline, hide_index=True)
 #st_pages.hide_pages(["1_Analyse_per_leerfase", "3_Analyse_eenjaar_vooruit", "4_Analyse_gesplitst"])
 st.markdown(
     """
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.transition_cube import TEKORTPUNTEN_BINS, TEKORTPUNTEN_LABELS, build_transition_cube
+
+COLUMNS = ['Leerlingnummer', 'Schooljaar', 'Leerfase (afk)', 'Tekortpunten', 'Doorstroom']
+
+# A cohort small enough to follow by hand; the last school year in the data is 2022
+SMALL_COHORT = [
+    # h3 -> h4 -> h5 -> Geslaagd
+    (1, 2019, 'h3', 2, 'Doorstroom'),
+    (1, 2020, 'h4', 5, 'Doorstroom'),
+    (1, 2021, 'h5', 1, 'Geslaagd'),
+    (1, 2022, 'Geslaagd', 0, None),
+    # h3 -> h3 doublure -> h4 -> h5, still in school
+    (2, 2019, 'h3', 8, 'Doublure'),
+    (2, 2020, 'h3_doublure', 4, 'Doorstroom'),
+    (2, 2021, 'h4', 0, 'Doorstroom'),
+    (2, 2022, 'h5', 3, None),
+    # h3 -> t4 (afstroom) -> Geslaagd
+    (3, 2019, 'h3', 11, 'Afstroom'),
+    (3, 2020, 't4', 6, 'Geslaagd'),
+    (3, 2021, 'Geslaagd', 0, None),
+    # h4 -> VO verlater
+    (4, 2020, 'h4', 0, 'VO verlater'),
+    (4, 2021, 'VO verlater', 0, None),
+    # h4 -> h5 -> h5 doublure, then no longer in the data (lost)
+    (5, 2019, 'h4', 3, 'Doorstroom'),
+    (5, 2020, 'h5', 7, 'Doublure'),
+    (5, 2021, 'h5_doublure', 2, None),
+    # v1 -> v2
+    (6, 2021, 'v1', 0, 'Doorstroom'),
+    (6, 2022, 'v2', 1, None),
+]
+
+
+def make_dataset(rows):
+    """A prepared dataset (as read_dataset returns it) from (Leerlingnummer, Schooljaar, Leerfase, Tekortpunten, Doorstroom) rows."""
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df['Leerfase (afk) vorig schooljaar'] = (
+        df.sort_values(['Leerlingnummer', 'Schooljaar']).groupby('Leerlingnummer')['Leerfase (afk)'].shift(1))
+    df['Inschrijvingsdatum'] = pd.Timestamp('2010-08-01')
+    df['Tekortpunten_Bucket'] = pd.cut(df['Tekortpunten'], bins=TEKORTPUNTEN_BINS, labels=TEKORTPUNTEN_LABELS,
+                                       right=True, include_lowest=True)
+    return df
+
+
+def random_dataset(n_students=300, seed=0):
+    """A larger dataset of random but plausible trajectories, for comparisons with plain pandas."""
+    rng = np.random.default_rng(seed)
+    labels = ['Doorstroom', 'Doublure', 'Afstroom', 'Geslaagd', 'VO verlater', None]
+    rows = []
+    for leerlingnummer in range(1000, 1000 + n_students):
+        prefix = rng.choice(['t', 'hv', 'h', 'v'])
+        leerjaar = int(rng.integers(1, 5))
+        schooljaar = int(rng.integers(2016, 2020))
+        suffix = ''
+        for _ in range(int(rng.integers(1, 6))):
+            leerfase = f'{prefix}{leerjaar}{suffix}'
+            suffix = ''
+            rows.append((leerlingnummer, schooljaar, leerfase, int(rng.integers(0, 15)), labels[rng.integers(len(labels))]))
+            step = rng.random()
+            if step < 0.1:
+                rows.append((leerlingnummer, schooljaar + 1, rng.choice(['Geslaagd', 'VO verlater', 'MBO']), 0, None))
+                break
+            if step < 0.25:
+                prefix = {'v': 'h', 'h': 't'}.get(prefix, prefix)
+            elif step < 0.35:
+                suffix = '_doublure'
+            else:
+                leerjaar += 1
+            schooljaar += 1
+    return make_dataset(rows)
+
+
+@pytest.fixture
+def small_dataset():
+    return make_dataset(SMALL_COHORT)
+
+
+@pytest.fixture
+def small_cube(small_dataset):
+    return build_transition_cube(small_dataset, years_ahead=5)
+
+
+@pytest.fixture(scope='session')
+def random_cube():
+    return build_transition_cube(random_dataset(), years_ahead=5)
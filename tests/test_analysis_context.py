@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+import pandas as pd
+import pytest
+
+from components import analysis_context
+from components.analysis_context import _result_key, cached_result
+
+
+@pytest.fixture
+def context(monkeypatch, small_dataset, small_cube):
+    """The session context and the loaded snapshot, without a running Streamlit app."""
+    snapshot = {'version': 1, 'df': small_dataset, 'derived': {'cube': small_cube},
+                'partitions': {2019: 'a', 2020: 'b', 2021: 'c', 2022: 'd'}}
+    state = {'selection': {'schooljaar_start': 2019, 'schooljaar_eind': 2019, 'leerfase_start': 'h3',
+                           'tekortpunten_buckets': ['0-3']},
+             'results': OrderedDict()}
+    monkeypatch.setattr(analysis_context, 'current_snapshot', lambda: snapshot)
+    monkeypatch.setattr(analysis_context, '_context', lambda: state)
+    return snapshot, state
+
+
+def test_other_arguments_give_other_keys(context):
+    first = _result_key('counts', ['leerfase_start'], (pd.Series([1, 2, 3]),), {'leerfase': 'h3'})
+    other_series = _result_key('counts', ['leerfase_start'], (pd.Series([1, 2, 4]),), {'leerfase': 'h3'})
+    other_kwarg = _result_key('counts', ['leerfase_start'], (pd.Series([1, 2, 3]),), {'leerfase': 'h4'})
+
+    assert len({first, other_series, other_kwarg}) == 3
+
+
+def test_equal_content_gives_the_same_key(context):
+    key = _result_key('counts', ['leerfase_start'], (pd.DataFrame({'a': [1, 2]}),), {'filter': ['0-3', '4-6']})
+
+    assert key == _result_key('counts', ['leerfase_start'], (pd.DataFrame({'a': [1, 2]}),), {'filter': ['0-3', '4-6']})
+
+
+def test_dataset_is_keyed_by_name_and_version(context, small_dataset, small_cube):
+    snapshot, _ = context
+    on_dataset = _result_key('counts', ['leerfase_start'], (small_dataset,))
+    on_cube = _result_key('counts', ['leerfase_start'], (small_cube,))
+
+    assert ('dataset', 'df') in on_dataset[2]
+    assert on_dataset != on_cube
+    # Without a school year range the result depends on the whole dataset version
+    assert on_dataset[-1] == ('version', 1)
+    snapshot['version'] = 2
+    assert _result_key('counts', ['leerfase_start'], (small_dataset,)) != on_dataset
+
+
+def test_school_year_range_is_keyed_by_partitions(context, small_cube):
+    snapshot, _ = context
+    depends_on = ['schooljaar_start', 'schooljaar_eind', 'leerfase_start']
+    key = _result_key('counts', depends_on, (small_cube,))
+
+    assert ('version', 1) not in key
+    snapshot['version'] = 2
+    assert _result_key('counts', depends_on, (small_cube,)) == key
+    snapshot['partitions'] = {**snapshot['partitions'], 2020: 'changed'}
+    assert _result_key('counts', depends_on, (small_cube,)) != key
+
+
+def test_cached_result_does_not_share_results_between_arguments(context):
+    calls = []
+
+    def count_rows(df, leerfase):
+        calls.append(leerfase)
+        return int((df['Leerfase (afk)'] == leerfase).sum())
+
+    df = pd.DataFrame({'Leerfase (afk)': ['h3', 'h3', 'h4']})
+    assert cached_result('rows', count_rows, df, leerfase='h3') == 2
+    assert cached_result('rows', count_rows, df, leerfase='h4') == 1
+    assert cached_result('rows', count_rows, df, leerfase='h3') == 2
+    assert calls == ['h3', 'h4']
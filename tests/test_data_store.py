@@ -0,0 +1,60 @@
+import pandas as pd
+
+from components import data_store
+from components.data_store import current_snapshot, derived, partition_hashes, partition_token, reload
+from tests.conftest import SMALL_COHORT, make_dataset
+
+
+def _write(rows, path):
+    make_dataset(rows).drop(columns='Tekortpunten_Bucket').to_excel(path, index=False)
+
+
+def test_partition_hashes_ignore_the_row_order(small_dataset):
+    shuffled = small_dataset.sample(frac=1, random_state=0)
+
+    assert partition_hashes(shuffled) == partition_hashes(small_dataset)
+    assert sorted(partition_hashes(small_dataset)) == [2019, 2020, 2021, 2022]
+
+
+def test_partition_token_covers_the_years_ahead():
+    snapshot = {'partitions': {2019: 'a', 2020: 'b', 2021: 'c'}}
+
+    assert partition_token(snapshot, 2019, 2019, years_ahead=0) == ('a',)
+    assert partition_token(snapshot, 2020, 2020, years_ahead=2) == ('b', 'c', None)
+
+
+def test_derived_tables_are_built_once_per_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / 'doorstroom.xlsx'
+    _write(SMALL_COHORT, path)
+    monkeypatch.setattr(data_store, '_start_watcher', lambda path: None)
+
+    snapshot = current_snapshot(str(path))
+
+    assert snapshot is current_snapshot(str(path))
+    assert snapshot['version'] == 1
+    assert len(snapshot['df']) == len(SMALL_COHORT)
+    assert derived(snapshot, 'cube') is derived(snapshot, 'cube')
+    assert derived(snapshot, 'student_index')['min_leerlingnummer'] == 1
+
+
+def test_reload_swaps_the_snapshot_and_only_changes_the_edited_years(tmp_path, monkeypatch):
+    path = tmp_path / 'doorstroom.xlsx'
+    _write(SMALL_COHORT, path)
+    monkeypatch.setattr(data_store, '_start_watcher', lambda path: None)
+    old = current_snapshot(str(path))
+    old_cube = derived(old, 'cube')
+
+    # Student 6 gets more tekortpunten in 2022
+    _write([row if row[:2] != (6, 2022) else (6, 2022, 'v2', 9, None) for row in SMALL_COHORT], path)
+    new = reload(str(path))
+
+    assert new['version'] == old['version'] + 1
+    assert current_snapshot(str(path)) is new
+    # The tables the old snapshot had built are ready in the new one
+    assert 'cube' in new['derived']
+    assert new['derived']['cube'] is not old_cube
+    assert partition_token(new, 2019, 2019, years_ahead=2) == partition_token(old, 2019, 2019, years_ahead=2)
+    assert partition_token(new, 2022, 2022, years_ahead=0) != partition_token(old, 2022, 2022, years_ahead=0)
+    # A running page keeps the snapshot it holds
+    assert old['df'].loc[old['df']['Leerlingnummer'].eq(6) & old['df']['Schooljaar'].eq(2022), 'Tekortpunten'].item() == 1
+    pd.testing.assert_frame_equal(derived(old, 'cube'), old_cube)
@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip('duckdb')
+
+from components import duckdb_backend
+from tests.conftest import random_dataset
+
+
+def test_small_cohort_matches_the_transition_cube(small_dataset):
+    assert duckdb_backend.check_against_cube(small_dataset) == []
+
+
+def test_random_dataset_matches_the_transition_cube():
+    df = random_dataset(n_students=100)
+
+    assert duckdb_backend.check_against_cube(df, schooljaren=[2018, 2019]) == []
+    assert duckdb_backend.check_against_cube(df, schooljaren=[2018], tekortpunten_bucket_filter=['0-3', '4-6']) == []
+
@@ -0,0 +1,42 @@
+import pytest
+
+from components import engines
+from components.transition_cube import build_transition_cube
+from tests.conftest import random_dataset
+
+SCHOOLJAREN = [2018, 2019]
+
+
+def _assert_same_flows(df, engine):
+    expected = engines.prepare_dataset(df, 'pandas')
+    prepared = engines.prepare_dataset(df, engine)
+    for schooljaar in SCHOOLJAREN:
+        for leerfase in sorted(df.loc[df['Schooljaar'] == schooljaar, 'Leerfase (afk)'].dropna().unique()):
+            for bucket_filter in [None, ['0-3', '4-6']]:
+                arguments = (schooljaar, schooljaar, leerfase, bucket_filter)
+                for use_source_label in [False, True]:
+                    assert engines.one_year_flow_table(prepared, *arguments, use_source_label=use_source_label).astype(
+                        str).equals(engines.one_year_flow_table(expected, *arguments,
+                                                                use_source_label=use_source_label).astype(str))
+                assert (engines.three_year_flow_counts(prepared, *arguments).sort_index().to_dict()
+                        == engines.three_year_flow_counts(expected, *arguments).sort_index().to_dict())
+
+
+def test_pandas_engine_reuses_the_cube(small_dataset):
+    cube = build_transition_cube(small_dataset)
+
+    engine, prepared = engines.prepare_dataset(small_dataset, 'pandas', cube=cube)
+    assert engine == 'pandas'
+    assert prepared is cube
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        engines.selected_engine('spark')
+
+
+@pytest.mark.parametrize('engine', ['polars', 'duckdb'])
+def test_engine_matches_the_pandas_engine(engine):
+    pytest.importorskip(engine)
+
+    _assert_same_flows(random_dataset(n_students=100), engine)
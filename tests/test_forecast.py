@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from components.forecast import (
+    bootstrap_transition_matrices,
+    forecast_cohorts,
+    transition_counts_matrix,
+    transition_matrix,
+    transition_schooljaren,
+)
+from components.transition_cube import build_transition_cube
+from tests.conftest import SMALL_COHORT, make_dataset
+
+
+def test_transition_counts_matrix(small_cube):
+    states, counts = transition_counts_matrix(small_cube, 2019, 2019)
+
+    def count(source, target):
+        return counts[states.index(source), states.index(target)]
+
+    assert count('h3', 'h4') == count('h3', 'h3_doublure') == count('h3', 't4') == 1
+    assert count('h4', 'h5') == 1
+    # Four transitions start in 2019
+    assert counts.sum() == 4
+
+
+def test_transition_matrix_rows_sum_to_one_and_absorb():
+    counts = np.array([[1, 3, 0], [0, 0, 2], [0, 0, 0]])
+
+    matrix = transition_matrix(counts)
+
+    np.testing.assert_allclose(matrix.sum(axis=1), 1)
+    np.testing.assert_allclose(matrix[0], [0.25, 0.75, 0])
+    # A state without outgoing transitions keeps its students
+    np.testing.assert_allclose(matrix[2], [0, 0, 1])
+
+
+def test_bootstrap_keeps_the_row_totals():
+    counts = np.array([[5, 5], [0, 10]])
+
+    matrices = bootstrap_transition_matrices(counts, n_bootstrap=50, seed=0)
+
+    assert matrices.shape == (50, 2, 2)
+    np.testing.assert_allclose(matrices.sum(axis=2), 1)
+    np.testing.assert_allclose(matrices[:, 1], [[0, 1]] * 50)
+
+
+def test_forecast_by_hand(small_cube):
+    forecast = forecast_cohorts(small_cube, 2019, 2020, schooljaar_basis=2020, years=2, n_bootstrap=0)
+    first_year = forecast[forecast['Jaren vooruit'] == 1].set_index('Leerfase (afk)')['Verwacht']
+
+    # 2020: two students in h4, which went to h5 twice and to VO verlater once in 2019-2020
+    assert first_year['h5'] == pytest.approx(2 * 2 / 3)
+    assert first_year['VO verlater'] == pytest.approx(2 / 3)
+    assert first_year['Geslaagd'] == pytest.approx(1)
+    # Nobody leaves the projection: every year holds the five students of 2020
+    assert forecast.groupby('Jaren vooruit')['Verwacht'].sum().tolist() == pytest.approx([5, 5])
+    assert forecast['Schooljaar'].unique().tolist() == [2021, 2022]
+    assert (forecast['Ondergrens'] == forecast['Verwacht']).all()
+
+
+def test_forecast_interval_is_reproducible(small_cube):
+    first = forecast_cohorts(small_cube, 2019, 2020, schooljaar_basis=2020, years=3, n_bootstrap=200, seed=1)
+
+    assert first.equals(forecast_cohorts(small_cube, 2019, 2020, schooljaar_basis=2020, years=3, n_bootstrap=200, seed=1))
+    assert (first['Ondergrens'] <= first['Verwacht'] + 1e-9).all()
+    assert (first['Bovengrens'] >= first['Verwacht'] - 1e-9).all()
+
+
+def test_transition_years_stop_before_a_year_of_only_status_labels(small_cube):
+    assert transition_schooljaren(small_cube) == [2019, 2020, 2021]
+
+    # A last school year with only the outcomes of the year before, as in the export
+    outcomes = [(leerlingnummer, 2023, 'Doorstroom', 0, None) for leerlingnummer in [2, 6]]
+    cube = build_transition_cube(make_dataset(SMALL_COHORT + outcomes))
+    assert transition_schooljaren(cube) == [2019, 2020, 2021]
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from components.leerfase_ordering import (
+    LEERFASE_LOOKUP,
+    LEERFASE_ORDERING,
+    compile_leerfase_lookup,
+    leerfase_numeric_value,
+    numeric_values,
+)
+
+CODES = ['h4', 'hv1', 'v6', 't2_doublure', 'Geslaagd', 'VO verlater', 'MBO', 'th1', 'h12', ' h4', None]
+
+
+def test_lookup_matches_the_rules():
+    values = numeric_values(pd.Series(CODES, dtype=object), LEERFASE_LOOKUP, LEERFASE_ORDERING)
+    expected = [leerfase_numeric_value(code, LEERFASE_ORDERING) for code in CODES]
+
+    np.testing.assert_array_equal(values, expected)
+    # The longest prefix wins, the suffix is stripped and unknown codes have no value
+    assert values[:4].tolist() == [24.0, 16.0, 36.0, 12.0]
+    assert np.isnan(values[6]) and np.isnan(values[-1])
+    # A leerjaar above the compiled table is still ranked by the rules
+    assert values[8] == 32.0
+
+
+def test_compiled_table_covers_every_prefix_and_suffix():
+    lookup = compile_leerfase_lookup(LEERFASE_ORDERING, max_leerjaar=3)
+
+    assert {'t1', 'hv3', 'v2_doublure', 'Geslaagd'} <= set(lookup.index)
+    assert 'h4' not in lookup.index
+    assert lookup.index.is_unique
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from components.policy_simulation import (
+    BEVORDERD,
+    NIET_BEVORDERD,
+    SIMULATION_OUTCOMES,
+    policy_what_if,
+    simulate_trajectories,
+    transition_pools,
+)
+
+
+def test_promotion_decisions(small_cube):
+    pools = transition_pools(small_cube, 2019, 2021)
+
+    # Promoted: h3 -> h4, h4 -> h5 (three times), h3_doublure -> h4 and v1 -> v2;
+    # not promoted: h3 -> h3_doublure, h3 -> t4 and h5 -> h5_doublure
+    assert (pools['decision'] == BEVORDERD).sum() == 6
+    assert (pools['decision'] == NIET_BEVORDERD).sum() == 3
+    assert pools['terminal'][pools['states'].get_indexer(['Geslaagd', 'VO verlater', 'Uitstroom'])].all()
+
+
+@pytest.mark.parametrize('max_tekortpunten, changed', [(5, 0), (9, 1), (20, 2)])
+def test_changed_decisions(small_cube, max_tekortpunten, changed):
+    result = policy_what_if(small_cube, 2019, 2021, 'h3', max_tekortpunten, n_trajectories=100)
+
+    # Student 2 (8 tekortpunten, doublure) and student 3 (11, afstroom) would be promoted under a looser norm
+    assert result['cohort'] == 3
+    assert result['changed'] == changed
+
+
+def test_norm_decides_every_promotion(small_cube):
+    pools = transition_pools(small_cube, 2019, 2021)
+    leerfases, tekortpunten = np.array(['h3', 'h3', 'h3'], dtype=object), np.array([2.0, 8.0, 11.0])
+
+    everyone = simulate_trajectories(pools, leerfases, tekortpunten, max_tekortpunten=100, years=1,
+                                     n_trajectories=2000, seed=0)
+    nobody = simulate_trajectories(pools, leerfases, tekortpunten, max_tekortpunten=-1, years=1,
+                                   n_trajectories=2000, seed=0)
+
+    assert everyone.loc[0, 'Doublure (%)'] == everyone.loc[0, 'Afstroom (%)'] == 0
+    assert nobody.loc[0, 'Doublure (%)'] + nobody.loc[0, 'Afstroom (%)'] == pytest.approx(100)
+
+
+def test_simulation_is_reproducible(small_cube):
+    first = policy_what_if(small_cube, 2019, 2021, 'h3', 6, n_trajectories=1000, seed=3)
+    again = policy_what_if(small_cube, 2019, 2021, 'h3', 6, n_trajectories=1000, seed=3)
+
+    assert first['huidig'].equals(again['huidig'])
+    assert first['norm'].equals(again['norm'])
+    assert first['huidig'].columns.tolist() == ['Jaren'] + [f'{outcome} (%)' for outcome in SIMULATION_OUTCOMES]
+    # Outcomes are cumulative
+    assert (first['huidig'].drop(columns='Jaren').diff().dropna() >= 0).all().all()
+
+
+def test_empty_cohort(small_cube):
+    assert policy_what_if(small_cube, 2019, 2021, 'v6', 6)['cohort'] == 0
@@ -0,0 +1,39 @@
+from contextlib import nullcontext
+
+from components.progressive import completed, render_as_completed, submit
+
+
+class Placeholder:
+    """Records what a panel shows instead of drawing it."""
+
+    def __init__(self):
+        self.shown = []
+
+    def caption(self, text):
+        self.shown.append(('caption', text))
+
+    def error(self, text):
+        self.shown.append(('error', text))
+
+    def container(self):
+        return nullcontext()
+
+
+def _failing():
+    raise ValueError('kapot')
+
+
+def test_a_failed_analysis_does_not_stop_the_other_panels():
+    failed, slow_ok, done = Placeholder(), Placeholder(), Placeholder()
+    drawn = []
+
+    render_as_completed([
+        (failed, submit(_failing), drawn.append),
+        (slow_ok, submit(sum, [1, 2, 3]), drawn.append),
+        (done, completed('klaar'), drawn.append),
+    ])
+
+    assert sorted(drawn, key=str) == [6, 'klaar']
+    assert failed.shown[-1][0] == 'error'
+    assert 'kapot' in failed.shown[-1][1]
+    assert not any(kind == 'error' for kind, _ in slow_ok.shown + done.shown)
@@ -0,0 +1,68 @@
+import os
+import time
+
+import pytest
+
+from components import sankey_cache
+from components.doorstroom_functions import (
+    analyze_next_leerfase_per_category,
+    analyze_three_year_leerfase_transitions,
+    prepare_sankey_data,
+)
+from components.sankey_cache import (
+    _prune_disk_cache,
+    category_sankey_title,
+    details_sankey_title,
+    popular_diagrams,
+    sankey_cache_key,
+    sankey_figure_json,
+    warm_sankey_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_memory_cache(monkeypatch):
+    # Every test starts without figures in memory, so they are written to its own cache_dir
+    monkeypatch.setattr(sankey_cache, '_memory_cache', type(sankey_cache._memory_cache)())
+
+
+def _page_key(transition_counts, title):
+    labels, source, target, value = prepare_sankey_data(transition_counts)
+    return sankey_cache_key(labels, source, target, value, title)
+
+
+def test_warmed_diagrams_are_the_ones_page_9_asks_for(small_dataset, tmp_path):
+    warm_sankey_cache(popular_diagrams(small_dataset, [2019], ['h3']), cache_dir=str(tmp_path))
+
+    # Page 9 for 2019-2019 and h3
+    transition_counts = analyze_three_year_leerfase_transitions(small_dataset, schooljaar_start=2019, schooljaar_eind=2019,
+                                                                leerfase_start='h3', bucket_paths=False)
+    key = _page_key(transition_counts, details_sankey_title('h3', 2019, 2019))
+    assert (tmp_path / f'{key}.json').exists()
+
+
+def test_warmed_diagrams_are_the_ones_page_3_asks_for(small_dataset, tmp_path):
+    warm_sankey_cache(popular_diagrams(small_dataset, [2019], ['h3']), cache_dir=str(tmp_path))
+
+    # Page 3 for 2019-2019 and h3 with all tekortpunten buckets selected
+    buckets = sorted(small_dataset['Tekortpunten_Bucket'].dropna().unique().tolist())
+    _, _, students_by_category = analyze_next_leerfase_per_category(small_dataset, 2019, 2019, 'h3',
+                                                                    tekortpunten_bucket_filter=buckets)
+    for category in ['Doorstroom', 'Doublure', 'Afstroom']:
+        transition_counts = analyze_three_year_leerfase_transitions(
+            small_dataset, schooljaar_start=2019, schooljaar_eind=2019, leerfase_start='h3',
+            leerlingnummer_filter=students_by_category[category], bucket_paths=False)
+        key = _page_key(transition_counts, category_sankey_title('h3', 2019, 2019, category))
+        assert (tmp_path / f'{key}.json').exists()
+
+
+def test_disk_cache_keeps_the_most_recently_used_files(tmp_path):
+    for i in range(5):
+        sankey_figure_json(['a', 'b'], [0], [1], [i + 1], title=f'diagram {i}', cache_dir=str(tmp_path))
+        time.sleep(0.01)
+    recent = sankey_cache_key(['a', 'b'], [0], [1], [5], 'diagram 4')
+
+    _prune_disk_cache(str(tmp_path), max_files=2)
+
+    assert len(os.listdir(tmp_path)) == 2
+    assert (tmp_path / f'{recent}.json').exists()
@@ -0,0 +1,47 @@
+import pandas as pd
+
+from components.significance import bootstrap_share_intervals, compare_groups, permutation_p_values
+
+CATEGORIES = ['Doorstroom', 'Afstroom', 'Doublure']
+
+
+def test_bootstrap_interval_contains_the_share():
+    counts = pd.Series([80, 15, 5], index=CATEGORIES)
+
+    intervals = bootstrap_share_intervals(counts, n_resamples=2000, seed=0)
+
+    shares = counts / counts.sum() * 100
+    assert (intervals['Ondergrens'] <= shares).all()
+    assert (intervals['Bovengrens'] >= shares).all()
+    assert (intervals['Bovengrens'] - intervals['Ondergrens'] < 20).all()
+
+
+def test_bootstrap_interval_of_an_empty_group_is_missing():
+    intervals = bootstrap_share_intervals(pd.Series([0, 0, 0], index=CATEGORIES), seed=0)
+
+    assert intervals.isna().all().all()
+
+
+def test_permutation_p_values():
+    same = permutation_p_values(pd.Series([50, 30, 20], index=CATEGORIES),
+                                pd.Series([50, 30, 20], index=CATEGORIES), n_resamples=2000, seed=0)
+    different = permutation_p_values(pd.Series([90, 5, 5], index=CATEGORIES),
+                                     pd.Series([40, 40, 20], index=CATEGORIES), n_resamples=2000, seed=0)
+
+    assert (same > 0.5).all()
+    assert different['Doorstroom'] < 0.01
+    assert different['Afstroom'] < 0.01
+    # The smallest possible p-value of 2000 permutations
+    assert (different >= 1 / 2001).all()
+
+
+def test_compare_groups_is_reproducible():
+    counts_a = pd.Series([60, 25, 15], index=CATEGORIES)
+    counts_b = pd.Series([40, 35, 25], index=CATEGORIES)
+
+    first = compare_groups(counts_a, counts_b, n_resamples=1000)
+
+    pd.testing.assert_frame_equal(first, compare_groups(counts_a, counts_b, n_resamples=1000))
+    assert first.index.tolist() == CATEGORIES
+    assert first['Analyse groep'].tolist() == ['60%', '25%', '15%']
+    assert first['Verschil (%-punt)'].tolist() == [20, -10, -10]
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from components import metrics
+from components.single_flight import in_flight, run_once, shared_future
+
+
+def _hits():
+    table = metrics.cache_table().set_index('Cache')
+    return int(table.loc['single_flight', 'Hits']) if 'single_flight' in table.index else 0
+
+
+def _wait_for_hits(target, timeout=5):
+    # Until the followers joined the running computation
+    deadline = time.monotonic() + timeout
+    while _hits() < target and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_computation():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        started.set()
+        release.wait(5)
+        return value * 2
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(run_once(('test', 'shared'), compute, 21)))
+    leader.start()
+    started.wait(5)
+    hits = _hits()
+    followers = [threading.Thread(target=lambda: results.append(run_once(('test', 'shared'), compute, 21)))
+                 for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    _wait_for_hits(hits + 3)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert calls == [21]
+    assert results == [42] * 4
+    assert in_flight() == 0
+
+
+def test_the_key_is_free_after_the_computation():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert run_once(('test', 'sequential'), compute) == 1
+    assert run_once(('test', 'sequential'), compute) == 2
+
+
+def test_errors_reach_every_caller_and_free_the_key():
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError('kapot')
+
+    errors = []
+
+    def call():
+        try:
+            run_once(('test', 'failing'), failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    hits = _hits()
+    follower = threading.Thread(target=call)
+    follower.start()
+    _wait_for_hits(hits + 1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert errors == ['kapot', 'kapot']
+    assert run_once(('test', 'failing'), lambda: 'hersteld') == 'hersteld'
+
+
+def test_shared_future_returns_the_running_future():
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        return 'klaar'
+
+    first = shared_future(('test', 'future'), compute)
+    assert shared_future(('test', 'future'), compute) is first
+    release.set()
+    assert first.result(5) == 'klaar'
+    with pytest.raises(ZeroDivisionError):
+        shared_future(('test', 'future'), lambda: 1 / 0).result(5)
@@ -0,0 +1,38 @@
+from components.student_index import TIMELINE_COLUMNS, build_student_index, student_timeline
+from components.transition_cube import build_transition_cube
+from tests.conftest import make_dataset
+
+
+def test_timeline_of_a_student(small_cube):
+    index = build_student_index(small_cube)
+
+    timeline = student_timeline(index, 2)
+    assert timeline.columns.tolist() == TIMELINE_COLUMNS
+    assert timeline['Schooljaar'].tolist() == [2019, 2020, 2021, 2022]
+    assert timeline['Leerfase (afk)'].tolist() == ['h3', 'h3_doublure', 'h4', 'h5']
+    assert student_timeline(index, 6)['Leerfase (afk)'].tolist() == ['v1', 'v2']
+
+
+def test_missing_and_out_of_range_numbers_are_empty():
+    # Leerlingnummers 10, 12 and 15: 11, 13 and 14 fall inside the range without rows
+    cube = build_transition_cube(make_dataset([
+        (10, 2020, 'h4', 0, 'Doorstroom'),
+        (12, 2020, 'h3', 2, 'Doorstroom'),
+        (12, 2021, 'h4', 1, None),
+        (15, 2021, 'v2', 0, None),
+    ]))
+    index = build_student_index(cube)
+
+    for leerlingnummer in [11, 13, 14, 9, 16, 0, -5, 10_000]:
+        timeline = student_timeline(index, leerlingnummer)
+        assert timeline.empty
+        assert timeline.columns.tolist() == TIMELINE_COLUMNS
+    assert student_timeline(index, 10)['Leerfase (afk)'].tolist() == ['h4']
+    assert student_timeline(index, 12)['Leerfase (afk)'].tolist() == ['h3', 'h4']
+    assert student_timeline(index, 15)['Leerfase (afk)'].tolist() == ['v2']
+
+
+def test_empty_cube(small_cube):
+    index = build_student_index(small_cube.iloc[0:0])
+
+    assert student_timeline(index, 1).empty
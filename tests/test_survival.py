@@ -0,0 +1,59 @@
+import numpy as np
+
+from components.student_index import build_student_index
+from components.survival import event_durations, kaplan_meier, median_time, survival_curves
+
+
+def test_kaplan_meier_by_hand():
+    # Years 1, 2, 2 and 3; the second student of year 2 is censored
+    curve = kaplan_meier([1, 2, 2, 3], [True, False, True, True])
+
+    assert curve['Jaren'].tolist() == [1, 2, 3]
+    assert curve['Onder observatie'].tolist() == [4, 3, 1]
+    assert curve['Gebeurtenissen'].tolist() == [1, 1, 1]
+    assert curve['Gecensureerd'].tolist() == [0, 1, 0]
+    # Survival 3/4, then 3/4 * 2/3 = 1/2, then 0
+    assert curve['Cumulatief (%)'].tolist() == [25.0, 50.0, 100.0]
+    assert (curve['Ondergrens (%)'] <= curve['Cumulatief (%)']).all()
+    assert (curve['Bovengrens (%)'] >= curve['Cumulatief (%)']).all()
+    assert median_time(curve) == 2
+
+
+def test_kaplan_meier_without_events():
+    curve = kaplan_meier([2, 3], [False, False])
+
+    assert curve['Cumulatief (%)'].tolist() == [0.0, 0.0, 0.0]
+    assert median_time(curve) is None
+
+
+def test_event_durations_observed_and_censored(small_cube):
+    index = build_student_index(small_cube)
+    starts = np.flatnonzero(((small_cube['Schooljaar'] == 2019) & (small_cube['Leerfase (afk)'] == 'h3')).to_numpy())
+
+    durations, observed = event_durations(small_cube, index, starts, 'Geslaagd')
+
+    # Student 1 graduates after 3 years, student 2 is still in school in the last year (2022),
+    # student 3 graduates after 2 years
+    assert durations.tolist() == [3, 3, 2]
+    assert observed.tolist() == [True, False, True]
+
+
+def test_event_durations_censors_lost_students_at_their_last_year(small_cube):
+    index = build_student_index(small_cube)
+    starts = np.flatnonzero(((small_cube['Schooljaar'] == 2019) & (small_cube['Leerfase (afk)'] == 'h4')).to_numpy())
+
+    durations, observed = event_durations(small_cube, index, starts, 'VO verlater')
+
+    # Student 5 is last seen in 2021 without a status label
+    assert durations.tolist() == [2]
+    assert observed.tolist() == [False]
+
+
+def test_survival_curves_groups(small_cube):
+    curves = survival_curves(small_cube, build_student_index(small_cube), 'h3', 2019, 2019, events=['Geslaagd'])
+
+    all_buckets = curves[curves['Tekortpunten_Bucket'] == 'Alle']
+    assert all_buckets['Aantal'].unique().tolist() == [3]
+    assert all_buckets['Cumulatief (%)'].tolist() == [0.0, 33.3, 66.7]
+    assert set(curves['Tekortpunten_Bucket']) == {'Alle', '0-3', '7-9', '10+'}
+    assert survival_curves(small_cube, build_student_index(small_cube), 'h3', 2021, 2022).empty
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.tekortpunten import (
+    PROGRESSION_CATEGORIES,
+    build_tekortpunten_index,
+    rates_by_threshold,
+    rates_per_bucket,
+    rates_per_tekortpunt,
+)
+
+
+def _groupby_counts(cube, schooljaar_start, schooljaar_eind, leerfase, groups):
+    """The same counts with a plain filter and groupby on the cube."""
+    transitions = cube[
+        cube['consecutive_1'] &
+        (cube['Schooljaar'] >= schooljaar_start) &
+        (cube['Schooljaar'] <= schooljaar_eind) &
+        (cube['Leerfase (afk)'] == leerfase)
+    ]
+    return (transitions.groupby([groups(transitions['Tekortpunten']), transitions['Progression']])
+            .size().unstack(fill_value=0).reindex(columns=PROGRESSION_CATEGORIES, fill_value=0))
+
+
+@pytest.fixture(scope='module')
+def index(random_cube):
+    return build_tekortpunten_index(random_cube)
+
+
+@pytest.mark.parametrize('schooljaar_start, schooljaar_eind', [(2016, 2016), (2016, 2019), (2018, 2021), (2020, 2030)])
+@pytest.mark.parametrize('leerfase', ['h3', 'v2', 't4', 'hv1'])
+def test_rates_per_tekortpunt_match_groupby(random_cube, index, schooljaar_start, schooljaar_eind, leerfase):
+    rates = rates_per_tekortpunt(index, schooljaar_start, schooljaar_eind, leerfase)
+    expected = _groupby_counts(random_cube, schooljaar_start, schooljaar_eind, leerfase, lambda tekortpunten: tekortpunten)
+
+    assert rates.index.tolist() == expected.index.tolist()
+    assert rates['Aantal'].tolist() == expected.sum(axis=1).tolist()
+    for category in PROGRESSION_CATEGORIES:
+        shares = (expected[category] / expected.sum(axis=1) * 100).round(1)
+        assert rates[f'{category} (%)'].tolist() == shares.tolist()
+
+
+@pytest.mark.parametrize('bucket_starts', [[0, 4, 7, 10], [0, 1], [0, 5, 6, 12]])
+def test_rates_per_bucket_match_groupby(random_cube, index, bucket_starts):
+    rates = rates_per_bucket(index, 2016, 2021, 'h3', bucket_starts)
+
+    bins = bucket_starts + [np.inf]
+    expected = _groupby_counts(random_cube, 2016, 2021, 'h3',
+                               lambda tekortpunten: pd.cut(tekortpunten, bins=bins, right=False, labels=False))
+    expected = expected.reindex(range(len(bucket_starts)), fill_value=0)
+    assert rates['Aantal'].tolist() == expected.sum(axis=1).tolist()
+    assert rates.index[-1] == f'{bucket_starts[-1]}+'
+
+
+def test_rates_by_threshold_split_the_total(random_cube, index):
+    rates = rates_by_threshold(index, 2016, 2021, 'h4', threshold=6)
+    total = rates_per_tekortpunt(index, 2016, 2021, 'h4')['Aantal']
+
+    assert rates['Aantal'].tolist() == [total[total.index <= 6].sum(), total[total.index > 6].sum()]
+
+
+def test_unknown_leerfase_and_empty_range(index):
+    assert rates_per_tekortpunt(index, 2016, 2021, 'onbekend').empty
+    assert rates_per_bucket(index, 2021, 2016, 'h3', [0, 4])['Aantal'].tolist() == [0, 0]